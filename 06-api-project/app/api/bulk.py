@@ -0,0 +1,89 @@
+"""
+Execução de lotes (bulk) compartilhada pelas rotas de users e posts
+Similar a um handler de "batch" no Express que processa um array de operações
+"""
+
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel, ValidationError
+
+from app.models.bulk import BulkRequest
+from app.storage import DuplicateKeyError
+
+
+def _validate(model: Type[BaseModel], data: Dict[str, Any]):
+    """Valida um item; devolve (modelo, None) ou (None, erros)"""
+    try:
+        return model.model_validate(data), None
+    except ValidationError as e:
+        # Sem o input: o item rejeitado voltaria na resposta (senha inclusa)
+        return None, e.errors(include_url=False, include_context=False, include_input=False)
+
+
+def apply_bulk(
+    request: BulkRequest,
+    service,
+    create_model: Type[BaseModel],
+    update_model: Type[BaseModel]
+) -> Dict[str, List[dict]]:
+    """
+    Valida o lote em uma passada e aplica cada seção com uma única
+    operação do service (bulk_create, bulk_update e bulk_delete)
+
+    Cada item recebe seu próprio status (201, 200, 204, 404, 409 ou 422),
+    então um item inválido não derruba o lote inteiro.
+    """
+    results: Dict[str, List[dict]] = {"create": [], "update": [], "delete": []}
+
+    # Create: validar todos, criar os válidos de uma vez
+    valid, positions = [], []
+    for index, data in enumerate(request.create):
+        item, errors = _validate(create_model, data)
+        if errors:
+            results["create"].append({"index": index, "status": 422, "error": errors})
+        else:
+            valid.append(item)
+            positions.append(index)
+
+    if valid:
+        for index, created in zip(positions, service.bulk_create(valid)):
+            if isinstance(created, DuplicateKeyError):
+                results["create"].append({"index": index, "status": 409, "error": str(created)})
+            else:
+                results["create"].append(
+                    {"index": index, "id": created.id, "status": 201, "data": created}
+                )
+    results["create"].sort(key=lambda result: result["index"])
+
+    # Update: validar os patches, atualizar os válidos de uma vez
+    patches, invalid = {}, {}
+    for record_id, data in request.update.items():
+        patch, errors = _validate(update_model, data)
+        if errors:
+            invalid[record_id] = errors
+        else:
+            patches[record_id] = patch
+
+    updated = service.bulk_update(patches) if patches else {}
+    for index, record_id in enumerate(request.update):
+        if record_id in invalid:
+            result = {"status": 422, "error": invalid[record_id]}
+        elif updated.get(record_id) is None:
+            result = {"status": 404, "error": f"{record_id} not found"}
+        elif isinstance(updated[record_id], DuplicateKeyError):
+            result = {"status": 409, "error": str(updated[record_id])}
+        else:
+            result = {"status": 200, "data": updated[record_id]}
+        results["update"].append({"index": index, "id": record_id, **result})
+
+    # Delete: uma única operação para todos os IDs
+    deleted = service.bulk_delete(request.delete) if request.delete else []
+    for index, (record_id, success) in enumerate(zip(request.delete, deleted)):
+        results["delete"].append({
+            "index": index,
+            "id": record_id,
+            "status": 204 if success else 404,
+            "error": None if success else f"{record_id} not found"
+        })
+
+    return results
@@ -0,0 +1,182 @@
+"""
+Compressão das respostas (gzip/deflate)
+Similar ao middleware `compression` do Express
+
+Middleware ASGI: escolhe o formato pelo Accept-Encoding do cliente,
+deixa passar corpos pequenos (comprimir poucos bytes custa CPU e quase não
+economiza) e comprime respostas em streaming pedaço a pedaço, sem esperar
+o corpo inteiro.
+"""
+
+import zlib
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# wbits do zlib: gzip (cabeçalho gzip) e deflate (formato zlib, como no HTTP)
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Accept-Encoding -> "gzip", "deflate" ou None
+
+    Respeita os pesos (q=0 recusa); no empate, gzip.
+    Ex: "deflate, gzip;q=0.5" -> "deflate"
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip()] = q
+
+    wildcard = weights.get("*", 0.0)
+    best = max(
+        ("gzip", "deflate"),
+        key=lambda name: (weights.get(name, wildcard), name == "gzip")
+    )
+    return best if weights.get(best, wildcard) > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    Comprime respostas com gzip ou deflate
+
+    - minimum_size: corpos menores passam sem compressão (em streaming, o
+      início do corpo é guardado até decidir)
+    - level: 1 (mais rápido) a 9 (menor)
+    - respostas que já têm Content-Encoding passam intactas
+    - o ETag vira fraco (W/): o corpo comprimido não é byte a byte o mesmo
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, level=6)
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, level: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(send, encoding, self.minimum_size, self.level)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Estado de uma resposta: guarda o início do corpo e decide se comprime"""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int, level: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.level = level
+        self._start: Optional[Message] = None
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+        self._compressor = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self._passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if "content-encoding" in headers or message["status"] in (204, 304):
+                self._passthrough = True
+                if message["status"] == 304 and "content-encoding" not in headers:
+                    # O 304 leva os mesmos validadores e Vary do 200 comprimido
+                    # que ele revalida (RFC 9110): senão um cache atualiza os
+                    # cabeçalhos guardados com um ETag forte sobre o corpo gzip
+                    self._vary_and_weaken(MutableHeaders(raw=message["headers"]))
+                await self._send(message)
+            else:
+                self._start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._compressor is not None:
+            await self._send_compressed(body, more_body)
+            return
+
+        # Ainda decidindo: acumula até atingir o limite ou o corpo acabar
+        if body:
+            self._pending.append(body)
+            self._pending_size += len(body)
+
+        if self._pending_size < self.minimum_size:
+            if more_body:
+                return
+            await self._flush_uncompressed()
+            return
+
+        self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS[self.encoding])
+        body = b"".join(self._pending)
+        self._pending.clear()
+
+        headers = MutableHeaders(raw=self._start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        self._vary_and_weaken(headers)
+
+        if more_body:
+            # Tamanho final desconhecido: chunked
+            if "content-length" in headers:
+                del headers["content-length"]
+            await self._send(self._start)
+            await self._send_compressed(body, more_body=True)
+            return
+
+        compressed = self._compressor.compress(body) + self._compressor.flush()
+        headers["Content-Length"] = str(len(compressed))
+        await self._send(self._start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    @staticmethod
+    def _vary_and_weaken(headers: MutableHeaders) -> None:
+        """Vary: Accept-Encoding e ETag fraco (o corpo comprimido não é byte a byte o original)"""
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    async def _send_compressed(self, body: bytes, more_body: bool) -> None:
+        """Comprime um pedaço do stream (Z_SYNC_FLUSH: o cliente já pode ler)"""
+        compressor = self._compressor
+        if more_body:
+            data = compressor.compress(body) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        else:
+            data = compressor.compress(body) + compressor.flush()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def _flush_uncompressed(self) -> None:
+        """Corpo menor que o limite: envia como veio"""
+        self._passthrough = True
+        # Com outro corpo a resposta sairia comprimida: o Vary vale igual
+        MutableHeaders(raw=self._start["headers"]).add_vary_header("Accept-Encoding")
+        await self._send(self._start)
+        await self._send({"type": "http.response.body", "body": b"".join(self._pending)})
+        self._pending.clear()
+
@@ -0,0 +1,87 @@
+"""
+GET condicional (ETag / Last-Modified -> 304 Not Modified)
+Similar ao `fresh` do Express (req.fresh) ou ao etag do Next.js
+
+O cliente reenvia o ETag (If-None-Match) ou a data (If-Modified-Since) da
+versão que já tem. Se nada mudou, a resposta é um 304 sem corpo: a
+checagem usa só os validadores, antes de montar o modelo e serializar.
+
+- If-None-Match tem precedência sobre If-Modified-Since (RFC 9110)
+- Last-Modified tem resolução de segundos (formato de data HTTP)
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from app.services.cache import FreshCheck
+
+
+def _etags(header: str) -> set:
+    """'W/"a", "b"' -> {'"a"', '"b"'} (comparação fraca: ignora W/)"""
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def _http_date(value: datetime) -> datetime:
+    """Data em UTC truncada em segundos (datas sem fuso são horário local)"""
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def fresh_check(request: Request) -> Optional[FreshCheck]:
+    """
+    Checagem condicional do request, ou None se não houver headers condicionais
+
+    A checagem recebe (etag, last_modified) do registro e diz se a versão
+    do cliente ainda é a atual.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etags = _etags(if_none_match)
+        return lambda etag, last_modified: "*" in etags or etag in etags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return None
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return None  # data inválida: o header é ignorado
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    return lambda etag, last_modified: (
+        last_modified is not None and _http_date(last_modified) <= since
+    )
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """Headers ETag e Last-Modified da resposta"""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_http_date(last_modified), usegmt=True)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """304 sem corpo, repetindo os validadores"""
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+def collection_not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    304 se o cliente já tem esta versão da coleção (If-None-Match), senão None
+
+    Para listagens: o ETag vem do contador de versão do store, lido antes
+    de buscar a página.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return None
+
+    etags = _etags(if_none_match)
+    if "*" in etags or etag in etags:
+        return not_modified_response(etag)
+    return None
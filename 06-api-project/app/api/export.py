@@ -0,0 +1,84 @@
+"""
+Exportação em streaming (NDJSON ou CSV)
+Similar a fazer pipe de um Readable stream para a resposta no Node.js
+
+O service entrega os registros em lotes e cada lote vira um pedaço da
+resposta assim que é lido: a memória não cresce com o tamanho da tabela
+e o cliente começa a receber antes do fim da exportação.
+"""
+
+import csv
+import io
+from typing import Iterable, Iterator, List, Literal, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.api.profiling import profiled_iter
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def ndjson_chunks(batches: Iterable[List[BaseModel]], adapter: TypeAdapter) -> Iterator[bytes]:
+    """Um objeto JSON por linha; um pedaço da resposta por lote"""
+    for batch in batches:
+        yield b"".join(adapter.dump_json(item) + b"\n" for item in batch)
+
+
+def csv_chunks(batches: Iterable[List[BaseModel]], model: Type[BaseModel]) -> Iterator[bytes]:
+    """
+    Cabeçalho com os campos do modelo e uma linha por registro
+
+    Listas (ex: tags) viram valores separados por ";"; datas em ISO 8601.
+    """
+    fields = list(model.model_fields)
+    # Um dump por lote (serializador em Rust) em vez de model_dump por linha
+    rows_adapter = TypeAdapter(List[model])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> bytes:
+        chunk = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    # O cabeçalho sai antes do primeiro lote: a resposta começa na hora
+    writer.writerow(fields)
+    yield flush()
+
+    for batch in batches:
+        writer.writerows(
+            [
+                ";".join(value) if isinstance(value, list) else value
+                for value in (row[field] for field in fields)
+            ]
+            for row in rows_adapter.dump_python(batch, mode="json")
+        )
+        yield flush()
+
+
+def export_response(
+    batches: Iterable[List[BaseModel]],
+    export_format: ExportFormat,
+    model: Type[BaseModel],
+    adapter: TypeAdapter,
+    filename: str
+) -> StreamingResponse:
+    """StreamingResponse com os lotes no formato pedido (como anexo para download)"""
+    if export_format == "csv":
+        chunks = csv_chunks(batches, model)
+    else:
+        chunks = ndjson_chunks(batches, adapter)
+
+    return StreamingResponse(
+        # Consumido no threadpool: profiled_iter põe essas threads no profile
+        profiled_iter(chunks),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
@@ -0,0 +1,107 @@
+"""
+Import em streaming de NDJSON (um registro JSON por linha)
+Similar a ler o req como stream com readline no Node.js
+
+O corpo é lido em pedaços e quebrado em linhas; cada linha é validada
+ao chegar e os registros válidos são gravados em blocos, cada bloco com
+uma única operação do service. Só um bloco fica em memória por vez,
+então o pico não depende do tamanho do upload.
+"""
+
+from typing import AsyncIterator, Awaitable, Callable, List, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from app.models.bulk import IMPORT_MAX_ERRORS, ImportLineError, ImportSummary
+
+# Linhas validadas e gravadas por vez
+IMPORT_BATCH_SIZE = 1000
+# Linhas maiores que isso são recusadas sem ficar em memória
+MAX_LINE_BYTES = 1 << 20
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Pedaços do corpo -> (número da linha, linha), ignorando linhas vazias
+
+    Uma linha acima de MAX_LINE_BYTES é devolvida como b"" (recusada por
+    quem consome) e o resto dela é descartado até o próximo "\\n".
+    """
+    buffer = b""
+    number = 0
+    skipping = False
+
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+
+        while True:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                break
+            line = buffer[start:end]
+            start = end + 1
+            number += 1
+
+            if skipping:
+                skipping = False
+                continue
+            if len(line) > MAX_LINE_BYTES:
+                yield number, b""
+            elif line.strip():
+                yield number, line
+
+        buffer = buffer[start:]
+        if len(buffer) > MAX_LINE_BYTES and not skipping:
+            yield number + 1, b""
+            skipping = True
+        if skipping:
+            buffer = b""
+
+    if buffer.strip() and not skipping:
+        yield number + 1, buffer
+
+
+async def import_ndjson(
+    chunks: AsyncIterator[bytes],
+    model: Type[BaseModel],
+    write_batch: Callable[[List[BaseModel]], Awaitable[int]]
+) -> ImportSummary:
+    """
+    Valida cada linha com `model` e grava os válidos em blocos
+
+    - write_batch(itens) grava um bloco e devolve quantos foram criados
+    - linhas inválidas (JSON ou validação) entram no resumo com o número
+      da linha; as válidas do mesmo bloco são gravadas normalmente
+    """
+    summary = ImportSummary()
+    batch: List[BaseModel] = []
+
+    def reject(line: int, error) -> None:
+        summary.rejected += 1
+        if len(summary.errors) < IMPORT_MAX_ERRORS:
+            summary.errors.append(ImportLineError(line=line, error=error))
+        else:
+            summary.errors_truncated = True
+
+    async for number, line in iter_lines(chunks):
+        summary.lines += 1
+
+        if not line:
+            reject(number, f"Line longer than {MAX_LINE_BYTES} bytes")
+            continue
+
+        try:
+            batch.append(model.model_validate_json(line))
+        except ValidationError as e:
+            reject(number, e.errors(include_url=False, include_context=False, include_input=False))
+            continue
+
+        if len(batch) == IMPORT_BATCH_SIZE:
+            summary.created += await write_batch(batch)
+            batch = []
+
+    if batch:
+        summary.created += await write_batch(batch)
+
+    return summary
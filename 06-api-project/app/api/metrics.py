@@ -0,0 +1,229 @@
+"""
+Métricas das requisições no formato de texto do Prometheus
+Similar ao prom-client (+ express-prom-bundle) no Node.js
+
+O middleware mede cada requisição e agrupa pelo *template* da rota
+("/api/posts/{post_id}", não "/api/posts/42": o número de séries fica
+limitado ao número de rotas):
+
+- http_requests_total: contagem por método, rota e status
+- http_request_duration_seconds: histograma de latência por rota
+- http_request_duration_recent_seconds: p50/p95/p99 das últimas
+  requisições de cada rota (janela deslizante)
+- http_requests_in_flight: requisições em andamento, por método
+- http_metrics_overhead_seconds_total: tempo gasto pelo próprio middleware
+
+Os gauges da aplicação (tamanho dos stores, contadores dos caches) são
+lidos só na hora do scrape (GET /metrics).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Limites dos buckets do histograma (segundos), como no prom-client
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Requisições que não casaram com nenhuma rota (404 de caminhos quaisquer)
+UNMATCHED = "unmatched"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (sufixo do nome, labels, valor); sufixo: "", "_bucket", "_sum" ou "_count"
+Sample = Tuple[str, Dict[str, str], float]
+# (nome, tipo, ajuda, amostras)
+Family = Tuple[str, str, str, List[Sample]]
+
+
+class _RouteStats:
+    """Contadores de uma rota (método + template)"""
+
+    __slots__ = ("statuses", "buckets", "total", "count", "recent")
+
+    def __init__(self, buckets: int, window: int):
+        self.statuses: Dict[int, int] = {}
+        # Contagem por bucket (não acumulada; a soma é feita no scrape)
+        self.buckets = [0] * (buckets + 1)
+        self.total = 0.0
+        self.count = 0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+
+class Metrics:
+    """
+    Registro das métricas HTTP de um processo
+
+    - buckets: limites do histograma de latência (segundos)
+    - window: requisições recentes por rota usadas nos percentis
+
+    Com vários workers, cada processo tem os seus números (o Prometheus
+    soma as séries de cada um).
+    """
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS, window: int = 1024):
+        self.bounds = tuple(buckets)
+        self.window = window
+        self._routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.overhead = 0.0
+
+    def start(self, method: str) -> None:
+        with self._lock:
+            self._in_flight[method] = self._in_flight.get(method, 0) + 1
+
+    def finish(self, method: str, route: str, status: int, seconds: float) -> None:
+        """Registra uma requisição concluída"""
+        key = (method, route)
+        with self._lock:
+            self._in_flight[method] -= 1
+
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = _RouteStats(len(self.bounds), self.window)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.buckets[bisect_left(self.bounds, seconds)] += 1
+            stats.total += seconds
+            stats.count += 1
+            stats.recent.append(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self.overhead = 0.0
+
+    def families(self) -> List[Family]:
+        """Cópia consistente das métricas HTTP, pronta para render()"""
+        with self._lock:
+            routes = [
+                (method, route, dict(stats.statuses), list(stats.buckets), stats.total,
+                 stats.count, list(stats.recent))
+                for (method, route), stats in self._routes.items()
+            ]
+            in_flight = dict(self._in_flight)
+            overhead = self.overhead
+
+        requests, histogram, recent = [], [], []
+        for method, route, statuses, buckets, total, count, samples in sorted(routes):
+            labels = {"method": method, "route": route}
+
+            for status, value in sorted(statuses.items()):
+                requests.append(("", {**labels, "status": str(status)}, value))
+
+            cumulative = 0
+            for bound, value in zip(self.bounds, buckets):
+                cumulative += value
+                histogram.append(("_bucket", {**labels, "le": _format(bound)}, cumulative))
+            histogram.append(("_bucket", {**labels, "le": "+Inf"}, count))
+            histogram.append(("_sum", labels, total))
+            histogram.append(("_count", labels, count))
+
+            samples.sort()
+            for quantile in QUANTILES:
+                value = samples[min(len(samples) - 1, int(quantile * len(samples)))]
+                recent.append(("", {**labels, "quantile": _format(quantile)}, value))
+            recent.append(("_sum", labels, sum(samples)))
+            recent.append(("_count", labels, len(samples)))
+
+        return [
+            ("http_requests_total", "counter",
+             "Requisições por método, rota e status", requests),
+            ("http_request_duration_seconds", "histogram",
+             "Latência das requisições (até o fim do corpo)", histogram),
+            ("http_request_duration_recent_seconds", "summary",
+             f"Percentis das últimas {self.window} requisições de cada rota", recent),
+            ("http_requests_in_flight", "gauge",
+             "Requisições em andamento",
+             [("", {"method": method}, value) for method, value in sorted(in_flight.items())]),
+            ("http_metrics_overhead_seconds_total", "counter",
+             "Tempo gasto pelo middleware de métricas", [("", {}, overhead)]),
+        ]
+
+
+def render(families: Iterable[Family]) -> bytes:
+    """Famílias de métricas -> formato de texto do Prometheus (0.0.4)"""
+    lines = []
+    for name, kind, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+        for suffix, labels, value in samples:
+            sample = name + suffix
+            if labels:
+                pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+                sample = f"{sample}{{{pairs}}}"
+            lines.append(f"{sample} {_format(value)}")
+
+    lines.append("")
+    return "\n".join(lines).encode()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsMiddleware:
+    """
+    Mede cada requisição HTTP (latência até o último pedaço do corpo)
+
+    A rota vem de scope["route"], preenchido pelo roteador do FastAPI ao
+    casar a requisição: nenhum trabalho extra para descobrir o template.
+    O tempo do próprio middleware (antes e depois da chamada da app) é
+    somado em `metrics.overhead`.
+
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        metrics = self.metrics
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.start(method)
+        app_start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            app_end = time.perf_counter()
+            route = scope.get("route")
+            path = getattr(route, "path_format", None) or UNMATCHED
+            metrics.finish(method, path, status, app_end - start)
+            metrics.overhead += (app_start - start) + (time.perf_counter() - app_end)
+
+
+def gauge(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> Family:
+    """Família de gauges da aplicação (ex: tamanho dos stores), de (labels, valor)"""
+    return name, "gauge", help_text, [("", labels, value) for labels, value in samples]
+
+
+def counter(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> Family:
+    """Família de contadores da aplicação (ex: hits dos caches), de (labels, valor)"""
+    return name, "counter", help_text, [("", labels, value) for labels, value in samples]
@@ -0,0 +1,216 @@
+"""
+Schema OpenAPI servido como bytes prontos, com ETag
+Similar a gerar o swagger.json no build (swagger-jsdoc) em vez de a cada boot
+
+O FastAPI monta o schema no primeiro GET /openapi.json (percorre todas
+as rotas e models) e serializa o dict de novo a cada requisição. Aqui o
+JSON é gerado uma vez e guardado em bytes; o ETag permite ao /docs e a
+outros clientes revalidar com If-None-Match (304, sem corpo).
+
+Com Settings.LAZY_ROUTERS os routers ainda não foram importados na
+subida, então o schema vem do arquivo gerado no build:
+
+    python -m app.api.openapi                 # grava Settings.OPENAPI_SCHEMA_FILE
+    python -m app.api.openapi --output schema.json
+
+O arquivo leva em info["x-source-fingerprint"] um hash do código que
+define rotas e models (SOURCES) e das versões do FastAPI e do Pydantic.
+Sem o arquivo, ou com um gerado a partir de outro código, o schema é
+montado no primeiro GET /openapi.json, depois de importar todos os
+routers, e o arquivo é regravado (com um aviso no log: o build esqueceu
+de gerá-lo de novo).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Callable, Optional, Tuple
+
+import fastapi
+import pydantic
+from fastapi import FastAPI, Request, Response
+
+CACHE_CONTROL = "no-cache"
+FINGERPRINT_KEY = "x-source-fingerprint"
+
+# Código que muda o schema (relativo à raiz do projeto)
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SOURCES = ("main.py", "app/api", "app/models", "app/config")
+
+logger = logging.getLogger(__name__)
+
+
+def source_fingerprint(root: str = ROOT) -> str:
+    """
+    Hash dos arquivos .py de SOURCES e das versões do FastAPI e do Pydantic
+
+    Não importa nada: no modo LAZY_ROUTERS dá para conferir o arquivo do
+    build sem carregar os routers (só lê alguns KB de código).
+    """
+    digest = hashlib.sha256(f"{fastapi.__version__} {pydantic.VERSION}".encode())
+    for source in SOURCES:
+        path = os.path.join(root, source)
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = sorted(
+                os.path.join(directory, name)
+                for directory, _, names in os.walk(path)
+                for name in names if name.endswith(".py")
+            )
+        for file_path in files:
+            digest.update(os.path.relpath(file_path, root).encode() + b"\0")
+            with open(file_path, "rb") as file:
+                digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+
+def build_schema(app: FastAPI) -> bytes:
+    """
+    Schema da app em JSON compacto (o conteúdo do /openapi.json do FastAPI,
+    com o fingerprint do código em info)
+    """
+    schema = app.openapi()
+    schema = {**schema, "info": {**schema["info"], FINGERPRINT_KEY: source_fingerprint()}}
+    return json.dumps(schema, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def write_schema(app: FastAPI, path: str) -> int:
+    """Grava o schema em `path` (passo de build); devolve o tamanho em bytes"""
+    return write_body(build_schema(app), path)
+
+
+def write_body(body: bytes, path: str) -> int:
+    """Grava o schema já serializado (arquivo temporário + rename)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(body)
+    os.replace(temporary, path)
+    return len(body)
+
+
+class OpenAPISchema:
+    """
+    Bytes do schema e ETag, calculados uma vez por processo
+
+    - path: arquivo gerado no build (usado se veio do mesmo código; se não,
+      é regravado)
+    - prepare: chamado antes de montar o schema pela app (ex: incluir os
+      routers pendentes)
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        path: Optional[str] = None,
+        prepare: Optional[Callable[[], None]] = None
+    ):
+        self.app = app
+        self.path = path
+        self.prepare = prepare
+        self.source: Optional[str] = None
+        self._cached: Optional[Tuple[bytes, str]] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Tuple[bytes, str]:
+        """(corpo, etag)"""
+        cached = self._cached
+        if cached is None:
+            with self._lock:
+                if self._cached is None:
+                    body = self._read_file()
+                    if body is None:
+                        if self.prepare is not None:
+                            self.prepare()
+                        body = build_schema(self.app)
+                        self.source = "app"
+                        if self.path:
+                            self._write_file(body)
+                    digest = hashlib.sha256(body).hexdigest()[:16]
+                    self._cached = body, f'"openapi-{digest}"'
+                cached = self._cached
+        return cached
+
+    def _read_file(self) -> Optional[bytes]:
+        if not self.path or not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as file:
+            body = file.read()
+        try:
+            fingerprint = json.loads(body)["info"].get(FINGERPRINT_KEY)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            fingerprint = None
+        # Arquivo de outro código: montar de novo em vez de servir a doc errada
+        expected = source_fingerprint()
+        if fingerprint != expected:
+            logger.warning(
+                "%s foi gerado a partir de outro código (fingerprint %s, esperado %s): "
+                "o schema será montado pela app. Rode `python -m app.api.openapi` no build.",
+                self.path, fingerprint, expected
+            )
+            return None
+        self.source = self.path
+        return body
+
+    def _write_file(self, body: bytes) -> None:
+        """Regrava o arquivo do build (a próxima subida já o encontra válido)"""
+        try:
+            write_body(body, self.path)
+        except OSError as e:
+            logger.warning("Não foi possível regravar %s: %s", self.path, e)
+
+    def response(self, request: Request) -> Response:
+        body, etag = self.get()
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+        # Mesma comparação fraca de conditional._etags (aquele módulo importa
+        # os services, que o modo LAZY_ROUTERS ainda não carregou)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in etags or etag in etags:
+                return Response(status_code=304, headers=headers)
+
+        return Response(body, media_type="application/json", headers=headers)
+
+
+def install(app: FastAPI, schema: OpenAPISchema) -> None:
+    """
+    Troca a rota do FastAPI em app.openapi_url pela do schema em cache
+
+    /docs e /redoc continuam os do FastAPI (eles só apontam para a URL).
+    """
+    app.router.routes[:] = [
+        route for route in app.router.routes
+        if getattr(route, "path", None) != app.openapi_url
+    ]
+
+    async def openapi(request: Request) -> Response:
+        return schema.response(request)
+
+    app.add_route(app.openapi_url, openapi, include_in_schema=False)
+
+
+def main():
+    import argparse
+
+    from app.config.settings import get_settings
+
+    parser = argparse.ArgumentParser(description="Gera o schema OpenAPI da API (passo de build)")
+    parser.add_argument("--output", default=get_settings().OPENAPI_SCHEMA_FILE)
+    args = parser.parse_args()
+
+    # Todos os routers importados já na subida, para o schema sair completo
+    get_settings().LAZY_ROUTERS = False
+    from main import app
+
+    size = write_schema(app, args.output)
+    print(f"Schema OpenAPI gravado em {args.output} ({size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Paginação por cursor (keyset pagination)
+Similar a `starting_after` da API do Stripe ou aos cursores do GraphQL/Relay
+
+O cursor é opaco para o cliente: um base64 da chave de ordenação do último
+item da página. A próxima página começa logo depois dessa chave, então o
+custo não depende da profundidade e remoções não "deslocam" os resultados.
+"""
+
+import base64
+import binascii
+import json
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Response
+
+# Header com o cursor da próxima página (ausente na última página)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(key: Tuple[int, ...]) -> str:
+    """Chave de ordenação -> cursor opaco"""
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[int, ...]]:
+    """Cursor opaco -> chave de ordenação (400 se o cursor for inválido)"""
+    if cursor is None:
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(400, "Invalid cursor")
+
+    if not isinstance(key, list) or not key or not all(type(part) is int for part in key):
+        raise HTTPException(400, "Invalid cursor")
+
+    return tuple(key)
+
+
+def set_next_cursor(response: Response, next_key: Optional[Tuple[int, ...]]) -> None:
+    """Expõe o cursor da próxima página no header da resposta"""
+    if next_key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_key)
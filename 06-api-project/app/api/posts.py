@@ -3,43 +3,180 @@ Rotas de Posts
 Similar a pages/api/posts no Next.js
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional
-from app.models.post import PostCreate, PostUpdate, PostResponse
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from pydantic import TypeAdapter
+from app.api.bulk import apply_bulk
+from app.api.conditional import (
+    collection_not_modified, fresh_check, not_modified_response, validator_headers
+)
+from app.api.export import ExportFormat, export_response
+from app.api.imports import import_ndjson
+from app.api.pagination import decode_cursor, set_next_cursor
+from app.api.profiling import ProfiledRoute
+from app.api.serialization import json_response, raw_json_response
+from app.models.bulk import BulkRequest, BulkResponse, ImportSummary
+from app.models.post import PostCreate, PostUpdate, PostResponse, TagCount
+from app.services.async_service import async_post_service
 from app.services.post_service import post_service
+from app.storage import IndexNotReady
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 def get_post_service():
     """Dependency para injetar service"""
     return post_service
 
+async def get_import_service():
+    """Dependency do import: service async (lê o corpo como stream no event loop)"""
+    return async_post_service
+
+# Serializadores pré-montados (JSON direto em bytes, sem revalidar)
+post_json = TypeAdapter(PostResponse)
+post_list_json = TypeAdapter(List[PostResponse])
+tag_counts_json = TypeAdapter(List[TagCount])
+
 @router.get("", response_model=List[PostResponse])
 def list_posts(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     author_id: Optional[int] = Query(None),
+    tag: Optional[List[str]] = Query(None, max_length=10, description="Posts com todas as tags (?tag=x&tag=y)"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (header X-Next-Cursor)"),
     service = Depends(get_post_service)
 ):
-    """Lista posts"""
-    posts = service.get_all(skip=skip, limit=limit, author_id=author_id)
-    return posts
+    """
+    Lista posts (paginação por cursor via header X-Next-Cursor)
+    
+    - Filtros por autor e por tags (?tag=x&tag=y: posts com todas) usam índices
+    - ETag pela versão da coleção: If-None-Match igual -> 304
+    """
+    etag = service.collection_etag()
+    not_modified = collection_not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    try:
+        posts, next_key = service.get_page(
+            skip=skip, limit=limit, author_id=author_id, tags=tag,
+            after=decode_cursor(cursor)
+        )
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    
+    response = json_response(post_list_json, posts, headers={"ETag": etag})
+    set_next_cursor(response, next_key)
+    return response
+
+@router.get("/tags", response_model=List[TagCount])
+def list_tags(request: Request, service = Depends(get_post_service)):
+    """
+    Quantidade de posts por tag (mais usadas primeiro)
+    
+    - Contagens lidas do índice de tags: custo proporcional ao número de tags
+    - ETag pela versão da coleção: If-None-Match igual -> 304
+    """
+    etag = service.collection_etag()
+    not_modified = collection_not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    return json_response(tag_counts_json, service.tag_counts(), headers={"ETag": etag})
+
+@router.get("/search", response_model=List[PostResponse])
+def search_posts(
+    q: str = Query(..., min_length=1, max_length=200, description="Termos da busca"),
+    operator: Literal["and", "or"] = Query("and", description="and: todos os termos; or: qualquer termo"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (header X-Next-Cursor)"),
+    service = Depends(get_post_service)
+):
+    """
+    Busca textual em título, conteúdo e tags (mais relevantes primeiro)
+    
+    - Usa um índice invertido: não percorre todos os posts
+    - Ignora maiúsculas, acentos e palavras comuns ("de", "the", ...)
+    """
+    try:
+        posts, next_key = service.search(
+            q, operator=operator, skip=skip, limit=limit, after=decode_cursor(cursor)
+        )
+    except IndexNotReady:
+        # Subida com muitos posts: o índice ainda está sendo montado
+        raise HTTPException(503, "Search index is loading", headers={"Retry-After": "1"})
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    
+    response = json_response(post_list_json, posts)
+    set_next_cursor(response, next_key)
+    return response
+
+@router.get("/export", response_class=StreamingResponse)
+def export_posts(
+    export_format: ExportFormat = Query("ndjson", alias="format", description="ndjson ou csv"),
+    author_id: Optional[int] = Query(None),
+    tag: Optional[List[str]] = Query(None, max_length=10, description="Posts com todas as tags (?tag=x&tag=y)"),
+    service = Depends(get_post_service)
+):
+    """
+    Exporta todos os posts (com os mesmos filtros da listagem) em streaming
+    
+    - NDJSON (um post por linha) ou CSV (tags separadas por ";")
+    - Memória constante: os posts são lidos e enviados em lotes
+    """
+    return export_response(
+        service.export(author_id=author_id, tags=tag),
+        export_format, PostResponse, post_json, "posts"
+    )
+
+@router.post("/import", response_model=ImportSummary)
+async def import_posts(request: Request, service = Depends(get_import_service)):
+    """
+    Importa posts de um corpo NDJSON (um PostCreate por linha) em streaming
+    
+    - O corpo é lido aos pedaços: o pico de memória não depende do upload
+    - Posts válidos são gravados em blocos; linhas inválidas não param o import
+    - Resumo com contagens e os números das linhas recusadas
+    """
+    return await import_ndjson(request.stream(), PostCreate, service.bulk_import)
+
+@router.post("/bulk", response_model=BulkResponse[PostResponse])
+def bulk_posts(request: BulkRequest[PostCreate, PostUpdate], service = Depends(get_post_service)):
+    """
+    Cria, atualiza e deleta posts em lote
+    
+    - create: lista de PostCreate
+    - update: mapa id -> PostUpdate
+    - delete: lista de IDs
+    - Cada item retorna seu próprio status e erro
+    """
+    return apply_bulk(request, service, PostCreate, PostUpdate)
 
 @router.get("/{post_id}", response_model=PostResponse)
-def get_post(post_id: int, service = Depends(get_post_service)):
-    """Busca post por ID"""
-    post = service.get_by_id(post_id)
+def get_post(post_id: int, request: Request, service = Depends(get_post_service)):
+    """
+    Busca post por ID (JSON servido do cache de respostas quando possível)
     
-    if not post:
+    - ETag/Last-Modified: If-None-Match ou If-Modified-Since atual -> 304
+    """
+    entry = service.get_json_by_id(post_id, fresh_check(request))
+    
+    if entry is None:
         raise HTTPException(404, f"Post {post_id} not found")
     
-    return post
+    if entry.body is None:
+        return not_modified_response(entry.etag, entry.last_modified)
+    
+    return raw_json_response(entry.body, headers=validator_headers(entry.etag, entry.last_modified))
 
 @router.post("", response_model=PostResponse, status_code=201)
 def create_post(post_data: PostCreate, service = Depends(get_post_service)):
     """Cria novo post"""
     post = service.create(post_data)
-    return post
+    return json_response(post_json, post, status_code=201)
 
 @router.put("/{post_id}", response_model=PostResponse)
 def update_post(
@@ -53,7 +190,7 @@ def update_post(
     if not post:
         raise HTTPException(404, f"Post {post_id} not found")
     
-    return post
+    return json_response(post_json, post)
 
 @router.delete("/{post_id}", status_code=204)
 def delete_post(post_id: int, service = Depends(get_post_service)):
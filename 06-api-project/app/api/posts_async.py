@@ -0,0 +1,140 @@
+"""
+Rotas de Posts (modo async)
+Similar a handlers `async (req, res) => {...}` no Express
+
+Mesmas rotas de app/api/posts.py, mas com `async def`.
+Ativado por Settings.ASYNC_ROUTES.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from typing import List, Literal, Optional
+from app.api import posts
+from app.api.conditional import (
+    collection_not_modified, fresh_check, not_modified_response, validator_headers
+)
+from app.api.pagination import decode_cursor, set_next_cursor
+from app.api.routing import add_fallback_routes
+from app.api.serialization import json_response, raw_json_response
+from app.api.posts import post_json, post_list_json, tag_counts_json
+from app.models.post import PostCreate, PostUpdate, PostResponse, TagCount
+from app.services.async_service import async_post_service
+from app.storage import IndexNotReady
+
+router = APIRouter()
+
+async def get_post_service():
+    """
+    Dependency para injetar o service async
+    
+    `async def`: resolvida no event loop (uma dependency `def` iria para o
+    threadpool a cada requisição, mesmo com a rota async)
+    """
+    return async_post_service
+
+@router.get("", response_model=List[PostResponse])
+async def list_posts(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    author_id: Optional[int] = Query(None),
+    tag: Optional[List[str]] = Query(None, max_length=10, description="Posts com todas as tags (?tag=x&tag=y)"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (header X-Next-Cursor)"),
+    service = Depends(get_post_service)
+):
+    """Lista posts (paginação por cursor via header X-Next-Cursor e ETag)"""
+    etag = await service.collection_etag()
+    not_modified = collection_not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    try:
+        posts_page, next_key = await service.get_page(
+            skip=skip, limit=limit, author_id=author_id, tags=tag,
+            after=decode_cursor(cursor)
+        )
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    
+    response = json_response(post_list_json, posts_page, headers={"ETag": etag})
+    set_next_cursor(response, next_key)
+    return response
+
+@router.get("/tags", response_model=List[TagCount])
+async def list_tags(request: Request, service = Depends(get_post_service)):
+    """Quantidade de posts por tag (mais usadas primeiro)"""
+    etag = await service.collection_etag()
+    not_modified = collection_not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    return json_response(tag_counts_json, await service.tag_counts(), headers={"ETag": etag})
+
+@router.get("/search", response_model=List[PostResponse])
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200, description="Termos da busca"),
+    operator: Literal["and", "or"] = Query("and", description="and: todos os termos; or: qualquer termo"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (header X-Next-Cursor)"),
+    service = Depends(get_post_service)
+):
+    """Busca textual em título, conteúdo e tags (mais relevantes primeiro)"""
+    try:
+        posts_page, next_key = await service.search(
+            q, operator=operator, skip=skip, limit=limit, after=decode_cursor(cursor)
+        )
+    except IndexNotReady:
+        # Subida com muitos posts: o índice ainda está sendo montado
+        raise HTTPException(503, "Search index is loading", headers={"Retry-After": "1"})
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    
+    response = json_response(post_list_json, posts_page)
+    set_next_cursor(response, next_key)
+    return response
+
+@router.get("/{post_id}", response_model=PostResponse)
+async def get_post(post_id: int, request: Request, service = Depends(get_post_service)):
+    """Busca post por ID (com ETag/Last-Modified e 304)"""
+    entry = await service.get_json_by_id(post_id, fresh_check(request))
+    
+    if entry is None:
+        raise HTTPException(404, f"Post {post_id} not found")
+    
+    if entry.body is None:
+        return not_modified_response(entry.etag, entry.last_modified)
+    
+    return raw_json_response(entry.body, headers=validator_headers(entry.etag, entry.last_modified))
+
+@router.post("", response_model=PostResponse, status_code=201)
+async def create_post(post_data: PostCreate, service = Depends(get_post_service)):
+    """Cria novo post"""
+    post = await service.create(post_data)
+    return json_response(post_json, post, status_code=201)
+
+@router.put("/{post_id}", response_model=PostResponse)
+async def update_post(
+    post_id: int,
+    post_update: PostUpdate,
+    service = Depends(get_post_service)
+):
+    """Atualiza post"""
+    post = await service.update(post_id, post_update)
+    
+    if not post:
+        raise HTTPException(404, f"Post {post_id} not found")
+    
+    return json_response(post_json, post)
+
+@router.delete("/{post_id}", status_code=204)
+async def delete_post(post_id: int, service = Depends(get_post_service)):
+    """Deleta post"""
+    success = await service.delete(post_id)
+    
+    if not success:
+        raise HTTPException(404, f"Post {post_id} not found")
+    
+    return None
+
+# Demais rotas (ex: /bulk) continuam as do router síncrono
+add_fallback_routes(router, posts.router)
@@ -0,0 +1,379 @@
+"""
+Profiling sob demanda de requisições individuais
+Similar a rodar o `node --cpu-prof` só para um request
+
+Desligado por padrão (Settings.PROFILING_ENABLED). Ligado, uma requisição
+é perfilada quando traz o cabeçalho Settings.PROFILING_HEADER ou cai na
+amostragem (PROFILING_SAMPLE_RATE). Para cada uma, em PROFILING_DIR:
+
+- <id>.prof: formato do pstats (python -m pstats, snakeviz)
+- <id>.collapsed: pilhas "a;b;c N" (flamegraph.pl, speedscope)
+- <id>.json: rota, status, duração e o tempo por fase
+
+O id volta no cabeçalho X-Profile-Id da resposta.
+
+O profiler é por amostragem: uma thread lê as pilhas a cada
+PROFILING_INTERVAL segundos. O cProfile só enxerga a thread que o ligou,
+e as rotas `def` rodam no threadpool; a amostragem vê o event loop e as
+threads do threadpool juntos, e só conta as amostras desta requisição
+(requisições simultâneas não entram no profile).
+
+No threadpool, a thread se anuncia: endpoints `def` (rotas criadas com
+ProfiledRoute) e iteradores de streaming (profiled_iter) leem a
+requisição perfilada de uma ContextVar (copiada para o threadpool) e
+registram a thread e o próprio frame enquanto rodam.
+
+Fases (pela função mais interna reconhecida na pilha):
+- encoding: montagem e serialização da resposta, compressão
+- service: services e stores
+- depends: resolução dos `Depends` e validação da entrada
+- router: o resto (middlewares, roteamento, corpo do endpoint)
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import marshal
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+import anyio
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Função na pilha: (arquivo, linha da definição, nome), a chave do pstats
+Function = Tuple[str, int, str]
+
+PHASES = ("router", "depends", "service", "encoding")
+
+_ENCODING_FUNCTIONS = frozenset({
+    "serialize_response", "jsonable_encoder", "render", "dump_json",
+    "_to_json", "_to_response", "_to_responses",
+})
+_ENCODING_FILES = ("serialization.py", "compression.py", "export.py")
+_SERVICE_DIRS = (os.path.join("app", "services"), os.path.join("app", "storage"))
+
+# Pilha sintética das amostras do threadpool (no lugar da pilha da thread)
+_THREADPOOL: Function = ("~", 0, "<threadpool>")
+
+
+class RequestThreads:
+    """Threads do threadpool trabalhando agora para a requisição perfilada (id -> frame raiz)"""
+
+    def __init__(self):
+        self.roots: Dict[int, Any] = {}
+
+    def run(self, call: Callable, *args, **kwargs):
+        """Executa `call` nesta thread, registrada enquanto ele roda"""
+        ident = threading.get_ident()
+        # Thread já registrada (ex: iterador dentro do endpoint): a raiz de fora vale
+        if ident in self.roots:
+            return call(*args, **kwargs)
+        self.roots[ident] = sys._getframe()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            del self.roots[ident]
+
+
+# Requisição perfilada no contexto (anyio copia o contexto para o threadpool)
+_profiled: contextvars.ContextVar = contextvars.ContextVar("profiled_request", default=None)
+
+
+def profiled(call: Callable) -> Callable:
+    """Envolve uma função `def` que roda no threadpool (a thread entra no profile da requisição)"""
+    if getattr(call, "__profiled__", False):
+        return call
+
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        threads = _profiled.get()
+        if threads is None:
+            return call(*args, **kwargs)
+        return threads.run(call, *args, **kwargs)
+
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+_END = object()
+
+
+def profiled_iter(iterable: Iterable) -> Iterator:
+    """
+    Iterador de streaming (StreamingResponse o consome no threadpool, um
+    item por vez): cada next() entra no profile da requisição
+    """
+    threads = _profiled.get()
+    if threads is None:
+        return iter(iterable)
+    iterator = iter(iterable)
+    return iter(functools.partial(threads.run, next, iterator, _END), _END)
+
+
+class ProfiledRoute(APIRoute):
+    """
+    APIRoute cujo endpoint `def` aparece no profile da requisição
+
+    router = APIRouter(route_class=ProfiledRoute)
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        if not asyncio.iscoroutinefunction(endpoint):
+            endpoint = profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def classify(stack: List[Function], dependencies: FrozenSet[Function]) -> str:
+    """Fase de uma amostra: a função reconhecida mais interna decide"""
+    for function in reversed(stack):
+        filename, _, name = function
+        if name in _ENCODING_FUNCTIONS or filename.endswith(_ENCODING_FILES):
+            return "encoding"
+        if any(directory in filename for directory in _SERVICE_DIRS):
+            return "service"
+        if name == "solve_dependencies" or function in dependencies:
+            return "depends"
+    return "router"
+
+
+def _function(frame) -> Function:
+    code = frame.f_code
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+class RequestSampler:
+    """
+    Amostra as pilhas de uma requisição em uma thread à parte
+
+    - root: frame da coroutine do middleware (amostras do event loop só
+      contam se passam por ele)
+    - threads: valor de _profiled na requisição; as threads do threadpool
+      que rodam o endpoint ou o streaming desta requisição se registram
+      nele (com o frame a partir do qual a pilha conta)
+
+    Enquanto houver requisição perfilada, o intervalo de troca de threads
+    do interpretador (sys.setswitchinterval) cai para `interval`: sem
+    isso, com o GIL ocupado, a amostragem só acontece a cada 5 ms.
+    """
+
+    _active = 0
+    _active_lock = threading.Lock()
+    _switch_interval = 0.0
+
+    def __init__(self, root, threads: RequestThreads, interval: float):
+        self.root = root
+        self.threads = threads
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        cls = type(self)
+        with cls._active_lock:
+            if not cls._active:
+                cls._switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(cls._switch_interval, self.interval))
+            cls._active += 1
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        cls = type(self)
+        with cls._active_lock:
+            cls._active -= 1
+            if not cls._active:
+                sys.setswitchinterval(cls._switch_interval)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        last = time.perf_counter()
+
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            # Peso pelo tempo real desde a última amostra (o GIL atrasa a thread)
+            weight, last = now - last, now
+
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if ident == self._loop_thread:
+                    stack = self._loop_stack(frame)
+                else:
+                    root = self.threads.roots.get(ident)
+                    stack = self._threadpool_stack(frame, root) if root is not None else None
+                if stack:
+                    self.samples[tuple(stack)] += weight
+
+    def _loop_stack(self, frame) -> Optional[List[Function]]:
+        """Pilha do event loop a partir do middleware, se estiver nesta requisição"""
+        stack = []
+        while frame is not None:
+            stack.append(_function(frame))
+            if frame is self.root:
+                return stack[::-1]
+            frame = frame.f_back
+        return None
+
+    def _threadpool_stack(self, frame, root) -> Optional[List[Function]]:
+        """Pilha de uma thread registrada, acima do frame em que ela se registrou"""
+        stack = []
+        while frame is not None:
+            if frame is root:
+                return [_THREADPOOL, *stack[::-1]] if stack else None
+            stack.append(_function(frame))
+            frame = frame.f_back
+        # A thread já saiu do registro (a pilha é de outra coisa)
+        return None
+
+
+def dependency_functions(route) -> FrozenSet[Function]:
+    """Funções dos `Depends` da rota (as async aparecem na pilha do event loop)"""
+    functions, pending = set(), list(getattr(getattr(route, "dependant", None), "dependencies", ()))
+    while pending:
+        dependant = pending.pop()
+        code = getattr(dependant.call, "__code__", None)
+        if code is not None:
+            functions.add((code.co_filename, code.co_firstlineno, code.co_name))
+        pending.extend(dependant.dependencies)
+    return frozenset(functions)
+
+
+def write_profile(
+    directory: str,
+    profile_id: str,
+    samples: Counter,
+    dependencies: FrozenSet[Function],
+    info: Dict
+) -> Dict[str, float]:
+    """Grava .prof (pstats), .collapsed (flamegraph) e .json; devolve o tempo por fase"""
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, profile_id)
+
+    # pstats: {função: (cc, nc, tt, ct, {chamadora: (nc, cc, tt, ct)})}
+    stats: Dict[Function, list] = {}
+    phases = dict.fromkeys(PHASES, 0.0)
+
+    for stack, weight in samples.items():
+        phases[classify(list(stack), dependencies)] += weight
+
+        seen = set()
+        for position, function in enumerate(stack):
+            entry = stats.setdefault(function, [0, 0, 0.0, 0.0, {}])
+            if function not in seen:
+                # Recursão: cada amostra conta uma vez no tempo acumulado
+                seen.add(function)
+                entry[0] += 1
+                entry[1] += 1
+                entry[3] += weight
+            if position:
+                caller = stack[position - 1]
+                nc, cc, tt, ct = entry[4].get(caller, (0, 0, 0.0, 0.0))
+                inner = weight if position == len(stack) - 1 else 0.0
+                entry[4][caller] = (nc + 1, cc + 1, tt + inner, ct + weight)
+        stats[stack[-1]][2] += weight
+
+    # Requisição mais curta que o intervalo: só o .json (o pstats não lê um profile vazio)
+    if samples:
+        with open(f"{base}.prof", "wb") as file:
+            marshal.dump({function: tuple(entry) for function, entry in stats.items()}, file)
+
+        with open(f"{base}.collapsed", "w") as file:
+            for stack, weight in samples.items():
+                names = ";".join(
+                    f"{name} ({os.path.basename(path)}:{line})" for path, line, name in stack
+                )
+                # Contagens inteiras em µs (o formato espera inteiros)
+                file.write(f"{names} {max(1, round(weight * 1e6))}\n")
+
+    with open(f"{base}.json", "w") as file:
+        json.dump({**info, "phases": phases, "sampled": sum(samples.values())}, file, indent=2)
+
+    return phases
+
+
+class ProfilingMiddleware:
+    """
+    Perfila requisições marcadas pelo cabeçalho ou pela amostragem
+
+    - header: cabeçalho que liga o profiling da requisição (qualquer valor)
+    - sample_rate: fração das requisições perfiladas sem o cabeçalho (0 a 1)
+    - interval: segundos entre amostras
+    - directory: pasta dos arquivos gerados
+
+    app.add_middleware(ProfilingMiddleware, header="X-Profile", directory="./profiles")
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        header: str = "X-Profile",
+        sample_rate: float = 0.0,
+        interval: float = 0.001,
+        directory: str = "./profiles"
+    ):
+        self.app = app
+        self.header = header.lower()
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.directory = directory
+        self._sequence = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._sequence += 1
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._sequence}"
+        status = 500
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        threads = RequestThreads()
+        reset = _profiled.set(threads)
+        sampler = RequestSampler(sys._getframe(), threads, self.interval)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            elapsed = time.perf_counter() - start
+            sampler.stop()
+            _profiled.reset(reset)
+            route = scope.get("route")
+            write = functools.partial(
+                write_profile, self.directory, profile_id, sampler.samples,
+                dependency_functions(route), {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path_format", None),
+                    "status": status,
+                    "elapsed": elapsed,
+                    "interval": self.interval,
+                }
+            )
+            # Gravação no threadpool (o event loop segue atendendo); com o
+            # cliente desconectado (cancelamento) o profile é gravado igual
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(write)
+
+    def _selected(self, scope: Scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        return self.header in Headers(scope=scope)
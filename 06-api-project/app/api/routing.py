@@ -0,0 +1,127 @@
+"""
+Utilitários de roteamento
+Similar a compor routers no Express (router.use(outroRouter))
+"""
+
+import importlib
+import threading
+from typing import Any, Dict, List, Tuple
+
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+def add_fallback_routes(router: APIRouter, fallback: APIRouter) -> None:
+    """
+    Completa `router` com as rotas de `fallback` que ele não define
+
+    Usado pelos routers async: eles reimplementam as rotas CRUD e herdam
+    as demais (ex: /bulk) do router síncrono, sem duplicar rotas na doc.
+    A ordem final segue a do `fallback`, para que rotas fixas (ex: /bulk)
+    continuem antes das rotas com parâmetro (ex: /{user_id}).
+    """
+    overrides = {
+        (route.path, method): route
+        for route in router.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+
+    merged = []
+    for route in fallback.routes:
+        if isinstance(route, APIRoute):
+            route = next(
+                (overrides[(route.path, m)] for m in route.methods if (route.path, m) in overrides),
+                route
+            )
+        merged.append(route)
+
+    # Rotas que só existem no router principal
+    merged.extend(route for route in router.routes if route not in merged)
+    router.routes[:] = merged
+
+
+class LazyRouters:
+    """
+    Routers incluídos só no primeiro acesso ao prefixo de cada um
+    Similar a React.lazy(() => import("./Users")) ou a um require() dentro da rota
+
+    O módulo do router (e, com ele, models, services e stores) só é
+    importado quando chega a primeira requisição para o prefixo: a subida
+    do processo fica mais curta, e quem paga a importação é essa primeira
+    requisição.
+
+    lazy = LazyRouters(app)
+    lazy.add("/api/users", "app.api.users", tags=["users"])
+    app.add_middleware(LazyRoutersMiddleware, routers=lazy)
+    """
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        # prefixo -> (módulo, opções do include_router)
+        self.pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        # Prefixos na ordem do add() e as rotas já incluídas de cada um
+        self._order: List[str] = []
+        self._loaded: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def add(self, prefix: str, module: str, **options: Any) -> None:
+        """Registra o router `module.router` para ser incluído em `prefix`"""
+        self.pending[prefix] = (module, options)
+        self._order.append(prefix)
+
+    def load(self, prefix: str) -> None:
+        """Importa e inclui o router do prefixo (nada se já foi incluído)"""
+        with self._lock:
+            entry = self.pending.get(prefix)
+            if entry is None:
+                return
+            module, options = entry
+            router = importlib.import_module(module).router
+            routes = self.app.router.routes
+            start = len(routes)
+            self.app.include_router(router, prefix=prefix, **options)
+
+            # Rotas na ordem do add(), não na dos primeiros acessos: o
+            # schema (e a doc) sai igual ao do modo normal
+            added = routes[start:]
+            del routes[start:]
+            later = self._order[self._order.index(prefix) + 1:]
+            position = len(routes) - sum(len(self._loaded.get(other, ())) for other in later)
+            routes[position:position] = added
+            self._loaded[prefix] = added
+            # O schema OpenAPI do FastAPI (se já montado) não tem as rotas novas
+            self.app.openapi_schema = None
+            del self.pending[prefix]
+
+    def load_all(self) -> None:
+        for prefix in list(self.pending):
+            self.load(prefix)
+
+    def match(self, path: str):
+        """Prefixo pendente que atende `path`, ou None"""
+        for prefix in self.pending:
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix
+        return None
+
+
+class LazyRoutersMiddleware:
+    """
+    Inclui o router pendente antes de a requisição chegar ao roteamento
+
+    Depois que todos os routers foram incluídos, o custo por requisição é
+    o de um dicionário vazio.
+    """
+
+    def __init__(self, app: ASGIApp, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.routers.pending and scope["type"] in ("http", "websocket"):
+            prefix = self.routers.match(scope["path"])
+            if prefix is not None:
+                self.routers.load(prefix)
+        await self.app(scope, receive, send)
@@ -0,0 +1,38 @@
+"""
+Serialização rápida das respostas
+Similar a usar um JSON.stringify pré-compilado (ex: fast-json-stringify no Fastify)
+
+As rotas declaram `response_model=` (para a documentação), mas devolvem um
+Response já serializado: o FastAPI então não revalida o objeto, e o JSON é
+gerado direto em bytes pelo serializador do Pydantic (em Rust), montado
+uma única vez por tipo.
+"""
+
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def json_response(
+    adapter: TypeAdapter,
+    value: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Serializa `value` com o TypeAdapter pré-montado e devolve os bytes"""
+    return raw_json_response(adapter.dump_json(value), status_code, headers)
+
+
+def raw_json_response(
+    body: bytes,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Devolve JSON já serializado (ex: vindo do cache de respostas)"""
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
@@ -3,46 +3,136 @@ Rotas de Usuários
 Similar a pages/api/users no Next.js ou routes/users.js no Express
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+from pydantic import TypeAdapter
+from app.api.bulk import apply_bulk
+from app.api.conditional import (
+    collection_not_modified, fresh_check, not_modified_response, validator_headers
+)
+from app.api.export import ExportFormat, export_response
+from app.api.pagination import decode_cursor, set_next_cursor
+from app.api.profiling import ProfiledRoute
+from app.api.serialization import json_response, raw_json_response
+from app.models.bulk import BulkRequest, BulkResponse
 from app.models.user import UserCreate, UserUpdate, UserResponse, UserRole
 from app.services.user_service import user_service
+from app.storage import DuplicateKeyError
 
-# Criar router (similar a const router = express.Router())
-router = APIRouter()
+# Criar router (similar a const router = express.Router()); ProfiledRoute: endpoints
+# `def` aparecem no profile (PROFILING_ENABLED)
+router = APIRouter(route_class=ProfiledRoute)
 
 # Dependency injection (similar a middleware ou context no React/Express)
 def get_user_service():
     """Dependency para injetar service (similar a useContext no React)"""
     return user_service
 
+# Serializadores pré-montados (JSON direto em bytes, sem revalidar)
+user_json = TypeAdapter(UserResponse)
+user_list_json = TypeAdapter(List[UserResponse])
+
 @router.get("", response_model=List[UserResponse])
 def list_users(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     role: Optional[UserRole] = Query(None),
+    min_age: Optional[int] = Query(None, ge=0),
+    max_age: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (header X-Next-Cursor)"),
     service = Depends(get_user_service)
 ):
     """
     Lista usuários (similar a GET /api/users no React/Express)
     
     - Query parameters (similar a req.query)
+    - Filtros por role e faixa de idade (min_age/max_age) usam índices
+    - Paginação por cursor: envie o X-Next-Cursor da resposta anterior
+    - ETag pela versão da coleção: If-None-Match igual -> 304
     - Dependency injection do service
     """
-    users = service.get_all(skip=skip, limit=limit, role=role)
-    return users
+    etag = service.collection_etag()
+    not_modified = collection_not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    try:
+        users, next_key = service.get_page(
+            skip=skip, limit=limit, role=role, min_age=min_age, max_age=max_age,
+            after=decode_cursor(cursor)
+        )
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    
+    response = json_response(user_list_json, users, headers={"ETag": etag})
+    set_next_cursor(response, next_key)
+    return response
+
+@router.get("/export", response_class=StreamingResponse)
+def export_users(
+    export_format: ExportFormat = Query("ndjson", alias="format", description="ndjson ou csv"),
+    role: Optional[UserRole] = Query(None),
+    min_age: Optional[int] = Query(None, ge=0),
+    max_age: Optional[int] = Query(None, ge=0),
+    service = Depends(get_user_service)
+):
+    """
+    Exporta todos os usuários em streaming (similar a pipe de um stream no Express)
+    
+    - NDJSON (um usuário por linha) ou CSV
+    - Mesmos filtros da listagem (role, min_age, max_age)
+    - Memória constante: os usuários são lidos e enviados em lotes
+    """
+    return export_response(
+        service.export(role=role, min_age=min_age, max_age=max_age),
+        export_format, UserResponse, user_json, "users"
+    )
+
+@router.post("/bulk", response_model=BulkResponse[UserResponse])
+def bulk_users(request: BulkRequest[UserCreate, UserUpdate], service = Depends(get_user_service)):
+    """
+    Cria, atualiza e deleta usuários em lote (similar a um endpoint de batch)
+    
+    - create: lista de UserCreate
+    - update: mapa id -> UserUpdate
+    - delete: lista de IDs
+    - Cada item retorna seu próprio status e erro
+    """
+    return apply_bulk(request, service, UserCreate, UserUpdate)
+
+@router.get("/by-email/{email}", response_model=UserResponse)
+def get_user_by_email(email: str, service = Depends(get_user_service)):
+    """
+    Busca usuário por email (similar a GET /api/users/by-email/:email)
+    
+    - Lido do índice único de email (sem diferenciar maiúsculas)
+    """
+    user = service.get_by_email(email)
+    
+    if not user:
+        raise HTTPException(404, f"User with email {email} not found")
+    
+    return json_response(user_json, user)
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, service = Depends(get_user_service)):
+def get_user(user_id: int, request: Request, service = Depends(get_user_service)):
     """
     Busca usuário por ID (similar a GET /api/users/:id)
+    
+    - JSON servido do cache de respostas quando possível
+    - ETag/Last-Modified: If-None-Match ou If-Modified-Since atual -> 304
     """
-    user = service.get_by_id(user_id)
+    entry = service.get_json_by_id(user_id, fresh_check(request))
     
-    if not user:
+    if entry is None:
         raise HTTPException(404, f"User {user_id} not found")
     
-    return user
+    if entry.body is None:
+        return not_modified_response(entry.etag, entry.last_modified)
+    
+    return raw_json_response(entry.body, headers=validator_headers(entry.etag, entry.last_modified))
 
 @router.post("", response_model=UserResponse, status_code=201)
 def create_user(user_data: UserCreate, service = Depends(get_user_service)):
@@ -50,9 +140,14 @@ def create_user(user_data: UserCreate, service = Depends(get_user_service)):
     Cria novo usuário (similar a POST /api/users)
     
     - Request body é validado automaticamente pelo Pydantic
+    - 409 se o email já estiver cadastrado
     """
-    user = service.create(user_data)
-    return user
+    try:
+        user = service.create(user_data)
+    except DuplicateKeyError:
+        raise HTTPException(409, f"Email {user_data.email} already registered")
+    
+    return json_response(user_json, user, status_code=201)
 
 @router.put("/{user_id}", response_model=UserResponse)
 def update_user(
@@ -62,13 +157,18 @@ def update_user(
 ):
     """
     Atualiza usuário (similar a PUT /api/users/:id)
+    
+    - 409 se o novo email já for de outro usuário
     """
-    user = service.update(user_id, user_update)
+    try:
+        user = service.update(user_id, user_update)
+    except DuplicateKeyError:
+        raise HTTPException(409, f"Email {user_update.email} already registered")
     
     if not user:
         raise HTTPException(404, f"User {user_id} not found")
     
-    return user
+    return json_response(user_json, user)
 
 @router.delete("/{user_id}", status_code=204)
 def delete_user(user_id: int, service = Depends(get_user_service)):
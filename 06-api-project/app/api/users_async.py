@@ -0,0 +1,125 @@
+"""
+Rotas de Usuários (modo async)
+Similar a handlers `async (req, res) => {...}` no Express
+
+Mesmas rotas de app/api/users.py, mas com `async def`: a requisição é
+atendida no event loop, sem pular para o threadpool.
+Ativado por Settings.ASYNC_ROUTES.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from typing import List, Optional
+from app.api import users
+from app.api.conditional import (
+    collection_not_modified, fresh_check, not_modified_response, validator_headers
+)
+from app.api.pagination import decode_cursor, set_next_cursor
+from app.api.routing import add_fallback_routes
+from app.api.serialization import json_response, raw_json_response
+from app.api.users import user_json, user_list_json
+from app.models.user import UserCreate, UserUpdate, UserResponse, UserRole
+from app.services.async_service import async_user_service
+from app.storage import DuplicateKeyError
+
+router = APIRouter()
+
+async def get_user_service():
+    """
+    Dependency para injetar o service async
+    
+    `async def`: resolvida no event loop (uma dependency `def` iria para o
+    threadpool a cada requisição, mesmo com a rota async)
+    """
+    return async_user_service
+
+@router.get("", response_model=List[UserResponse])
+async def list_users(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    role: Optional[UserRole] = Query(None),
+    min_age: Optional[int] = Query(None, ge=0),
+    max_age: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (header X-Next-Cursor)"),
+    service = Depends(get_user_service)
+):
+    """Lista usuários (filtros por índice, paginação por cursor e ETag)"""
+    etag = await service.collection_etag()
+    not_modified = collection_not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    try:
+        users_page, next_key = await service.get_page(
+            skip=skip, limit=limit, role=role, min_age=min_age, max_age=max_age,
+            after=decode_cursor(cursor)
+        )
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    
+    response = json_response(user_list_json, users_page, headers={"ETag": etag})
+    set_next_cursor(response, next_key)
+    return response
+
+@router.get("/by-email/{email}", response_model=UserResponse)
+async def get_user_by_email(email: str, service = Depends(get_user_service)):
+    """Busca usuário por email"""
+    user = await service.get_by_email(email)
+    
+    if not user:
+        raise HTTPException(404, f"User with email {email} not found")
+    
+    return json_response(user_json, user)
+
+@router.get("/{user_id}", response_model=UserResponse)
+async def get_user(user_id: int, request: Request, service = Depends(get_user_service)):
+    """Busca usuário por ID (com ETag/Last-Modified e 304)"""
+    entry = await service.get_json_by_id(user_id, fresh_check(request))
+    
+    if entry is None:
+        raise HTTPException(404, f"User {user_id} not found")
+    
+    if entry.body is None:
+        return not_modified_response(entry.etag, entry.last_modified)
+    
+    return raw_json_response(entry.body, headers=validator_headers(entry.etag, entry.last_modified))
+
+@router.post("", response_model=UserResponse, status_code=201)
+async def create_user(user_data: UserCreate, service = Depends(get_user_service)):
+    """Cria novo usuário"""
+    try:
+        user = await service.create(user_data)
+    except DuplicateKeyError:
+        raise HTTPException(409, f"Email {user_data.email} already registered")
+    
+    return json_response(user_json, user, status_code=201)
+
+@router.put("/{user_id}", response_model=UserResponse)
+async def update_user(
+    user_id: int,
+    user_update: UserUpdate,
+    service = Depends(get_user_service)
+):
+    """Atualiza usuário"""
+    try:
+        user = await service.update(user_id, user_update)
+    except DuplicateKeyError:
+        raise HTTPException(409, f"Email {user_update.email} already registered")
+    
+    if not user:
+        raise HTTPException(404, f"User {user_id} not found")
+    
+    return json_response(user_json, user)
+
+@router.delete("/{user_id}", status_code=204)
+async def delete_user(user_id: int, service = Depends(get_user_service)):
+    """Deleta usuário"""
+    success = await service.delete(user_id)
+    
+    if not success:
+        raise HTTPException(404, f"User {user_id} not found")
+    
+    return None
+
+# Demais rotas (ex: /bulk) continuam as do router síncrono
+add_fallback_routes(router, users.router)
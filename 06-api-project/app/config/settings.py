@@ -22,6 +22,68 @@ class Settings(BaseModel):
     
     # Database (em produção, use variáveis de ambiente)
     DATABASE_URL: str = "sqlite:///./app.db"
+    # "memory" (dados somem ao reiniciar), "sqlite" (usa DATABASE_URL) ou
+    # "journal" (memória + journal e snapshots em JOURNAL_DIR) ou "shared"
+    # (um processo à parte guarda os dados para todos os workers)
+    STORAGE_BACKEND: str = "memory"
+    
+    # Backend "journal": pasta dos arquivos, modo de fsync e compactação
+    JOURNAL_DIR: str = "./data"
+    # "commit" (escrita espera o fsync, agrupado entre escritas concorrentes),
+    # "batch" (fsync em segundo plano a cada JOURNAL_FSYNC_INTERVAL) ou "off"
+    JOURNAL_FSYNC: str = "batch"
+    JOURNAL_FSYNC_INTERVAL: float = 0.05
+    # Snapshot (e descarte dos segmentos antigos) quando o journal passa disso
+    JOURNAL_SNAPSHOT_BYTES: int = 64 * 1024 * 1024
+    # Registros do snapshot decodificados mantidos em memória (LRU, por tabela)
+    JOURNAL_READ_CACHE: int = 100_000
+    
+    # Backend "shared": socket Unix do processo do store e o backend que ele
+    # usa por dentro ("memory", "journal" ou "sqlite")
+    SHARED_STORE_SOCKET: str = "./data/store.sock"
+    SHARED_STORE_BACKEND: str = "memory"
+    # Processos do uvicorn em `python main.py` (mais de 1 exige "shared")
+    WORKERS: int = 1
+    
+    # Subida rápida (autoscaling/serverless): routers, models e services só
+    # são importados no primeiro acesso ao prefixo de cada router
+    LAZY_ROUTERS: bool = False
+    # Schema OpenAPI gerado no build (python -m app.api.openapi), servido
+    # pronto no modo LAZY_ROUTERS (sem ele, montado no primeiro acesso)
+    OPENAPI_SCHEMA_FILE: str = "./openapi.json"
+    
+    # Rotas CRUD com `async def` (event loop) em vez de `def` (threadpool)
+    ASYNC_ROUTES: bool = False
+    
+    # Cache das respostas de GET /{id} (JSON pronto); 0 entradas desliga
+    CACHE_MAX_ENTRIES: int = 10_000
+    # Segundos até uma entrada expirar (0: só expira por update/delete/LRU)
+    CACHE_TTL_SECONDS: float = 30.0
+    # Backend "shared": segundos entre consultas às alterações dos outros
+    # workers (uma resposta alterada por outro worker vale até esse tempo)
+    CACHE_SYNC_INTERVAL: float = 0.1
+    
+    # Compressão gzip/deflate das respostas (Accept-Encoding)
+    # Nível de 1 (mais rápido) a 9 (menor); 0 desliga
+    COMPRESSION_LEVEL: int = 6
+    # Corpos menores que isso (bytes) vão sem compressão
+    COMPRESSION_MIN_SIZE: int = 1024
+    
+    # Métricas das requisições em /metrics (formato do Prometheus)
+    METRICS_ENABLED: bool = True
+    # Requisições recentes por rota usadas nos percentis p50/p95/p99
+    METRICS_WINDOW: int = 1024
+    
+    # Profiling de requisições (desligado: não use sem necessidade em produção)
+    PROFILING_ENABLED: bool = False
+    # Requisições com este cabeçalho são perfiladas (ex: X-Profile: 1)
+    PROFILING_HEADER: str = "X-Profile"
+    # Fração das demais requisições perfiladas por amostragem (0 a 1)
+    PROFILING_SAMPLE_RATE: float = 0.0
+    # Segundos entre amostras das pilhas
+    PROFILING_INTERVAL: float = 0.001
+    # Pasta dos arquivos .prof/.collapsed/.json gerados
+    PROFILING_DIR: str = "./profiles"
     
     # Security
     SECRET_KEY: str = "dev-secret-key-change-in-production"
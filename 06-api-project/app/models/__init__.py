@@ -1,6 +1,7 @@
 """Models module"""
 from .user import UserBase, UserCreate, UserUpdate, UserResponse, UserRole
 from .post import PostBase, PostCreate, PostUpdate, PostResponse
+from .bulk import BulkRequest, BulkItemResult, BulkResponse
 
 __all__ = [
     "UserBase",
@@ -11,6 +12,9 @@ __all__ = [
     "PostBase",
     "PostCreate",
     "PostUpdate",
-    "PostResponse"
+    "PostResponse",
+    "BulkRequest",
+    "BulkItemResult",
+    "BulkResponse"
 ]
 
@@ -0,0 +1,66 @@
+"""
+Modelos de operações em lote (bulk)
+Similar a um endpoint de "batch" no Express que recebe um array de operações
+"""
+
+from pydantic import BaseModel, Field, SkipValidation
+from typing import Any, Dict, Generic, List, Optional, TypeVar, Union
+
+# Limite de itens por seção do lote
+BULK_MAX_ITEMS = 1000
+# Erros detalhados no resumo de um import (os demais só entram na contagem)
+IMPORT_MAX_ERRORS = 100
+
+T = TypeVar("T")
+# Models dos itens de create e update (ex: UserCreate, UserUpdate)
+C = TypeVar("C")
+U = TypeVar("U")
+
+class BulkRequest(BaseModel, Generic[C, U]):
+    """
+    Lote de operações (aplicadas na ordem: create, update, delete)
+    Similar a um DTO genérico BulkRequest<CreateDto, UpdateDto> no TypeScript
+    
+    Os itens de create/update são validados um a um pelo endpoint, para que
+    um item inválido gere erro só nele, e não no lote inteiro: aqui eles
+    chegam crus (SkipValidation), mas a doc mostra o schema de C e U.
+    
+    BulkRequest[UserCreate, UserUpdate]
+    """
+    create: List[SkipValidation[C]] = Field(default_factory=list, max_length=BULK_MAX_ITEMS)
+    update: Dict[int, SkipValidation[U]] = Field(default_factory=dict, max_length=BULK_MAX_ITEMS)
+    delete: List[int] = Field(default_factory=list, max_length=BULK_MAX_ITEMS)
+
+class BulkItemResult(BaseModel, Generic[T]):
+    """Resultado de um item do lote (similar a uma resposta HTTP individual)"""
+    index: int
+    id: Optional[int] = None
+    status: int
+    data: Optional[T] = None
+    error: Optional[Union[str, List[Dict[str, Any]]]] = None
+
+class BulkResponse(BaseModel, Generic[T]):
+    """Resultados por item, na mesma ordem do lote"""
+    create: List[BulkItemResult[T]] = []
+    update: List[BulkItemResult[T]] = []
+    delete: List[BulkItemResult[T]] = []
+
+class ImportLineError(BaseModel):
+    """Linha rejeitada em um import NDJSON (numeração a partir de 1)"""
+    line: int
+    error: Union[str, List[Dict[str, Any]]]
+
+class ImportSummary(BaseModel):
+    """
+    Resumo de um import NDJSON
+    
+    - lines: linhas não vazias lidas
+    - created / rejected: registros gravados e linhas recusadas
+    - errors: as primeiras IMPORT_MAX_ERRORS linhas recusadas (errors_truncated
+      indica que houve mais)
+    """
+    lines: int = 0
+    created: int = 0
+    rejected: int = 0
+    errors: List[ImportLineError] = []
+    errors_truncated: bool = False
@@ -33,3 +33,7 @@ class PostResponse(PostBase):
     class Config:
         from_attributes = True
 
+class TagCount(BaseModel):
+    """Quantidade de posts com uma tag"""
+    tag: str
+    count: int
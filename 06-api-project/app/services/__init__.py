@@ -1,6 +1,21 @@
 """Services module"""
 from .user_service import user_service, UserService
 from .post_service import post_service, PostService
+from .async_service import (
+    async_user_service,
+    AsyncUserService,
+    async_post_service,
+    AsyncPostService
+)
 
-__all__ = ["user_service", "UserService", "post_service", "PostService"]
+__all__ = [
+    "user_service",
+    "UserService",
+    "post_service",
+    "PostService",
+    "async_user_service",
+    "AsyncUserService",
+    "async_post_service",
+    "AsyncPostService"
+]
 
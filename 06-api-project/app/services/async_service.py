@@ -0,0 +1,159 @@
+"""
+Versões async dos services
+Similar a trocar chamadas síncronas por async/await no Node.js
+
+- Store em memória: a operação leva microssegundos e não faz I/O, então
+  roda direto no event loop (sem pular para o threadpool)
+- Store SQLite (ou journal com fsync a cada commit): a operação faz I/O
+  bloqueante, então vai para uma thread do threadpool para não travar o
+  event loop (ver `store.blocking`)
+"""
+
+from typing import List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.models.post import PostCreate, PostUpdate, PostResponse, TagCount
+from app.models.user import UserCreate, UserUpdate, UserResponse, UserRole
+from .cache import CachedResponse, FreshCheck
+from .post_service import PostService, post_service, fake_posts_db
+from .user_service import UserService, user_service, fake_users_db
+
+
+class _AsyncService:
+    """Base: executa o método síncrono inline ou no threadpool"""
+
+    def __init__(self, service, store):
+        self._service = service
+        self._blocking = store.blocking
+
+    async def _run(self, method, *args, **kwargs):
+        if self._blocking:
+            return await run_in_threadpool(method, *args, **kwargs)
+        return method(*args, **kwargs)
+
+
+class AsyncUserService(_AsyncService):
+    """UserService com async/await (similar a async function useUsers())"""
+
+    def __init__(self, service: UserService = user_service, store=fake_users_db):
+        super().__init__(service, store)
+
+    async def get_page(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        role: Optional[UserRole] = None,
+        min_age: Optional[int] = None,
+        max_age: Optional[int] = None,
+        after: Optional[Tuple[int, ...]] = None
+    ) -> Tuple[List[UserResponse], Optional[Tuple[int, ...]]]:
+        """Busca uma página de usuários e a chave da próxima"""
+        return await self._run(
+            self._service.get_page,
+            skip=skip, limit=limit, role=role,
+            min_age=min_age, max_age=max_age, after=after
+        )
+
+    async def get_by_id(self, user_id: int) -> Optional[UserResponse]:
+        """Busca usuário por ID"""
+        return await self._run(self._service.get_by_id, user_id)
+
+    async def get_json_by_id(
+        self, user_id: int, is_fresh: Optional[FreshCheck] = None
+    ) -> Optional[CachedResponse]:
+        """Busca usuário por ID já serializado (com cache e checagem condicional)"""
+        return await self._run(self._service.get_json_by_id, user_id, is_fresh)
+
+    async def collection_etag(self) -> str:
+        """ETag da listagem (versão da coleção)"""
+        return await self._run(self._service.collection_etag)
+
+    async def get_by_email(self, email: str) -> Optional[UserResponse]:
+        """Busca usuário por email"""
+        return await self._run(self._service.get_by_email, email)
+
+    async def create(self, user_data: UserCreate) -> UserResponse:
+        """Cria novo usuário"""
+        return await self._run(self._service.create, user_data)
+
+    async def update(self, user_id: int, user_update: UserUpdate) -> Optional[UserResponse]:
+        """Atualiza usuário"""
+        return await self._run(self._service.update, user_id, user_update)
+
+    async def delete(self, user_id: int) -> bool:
+        """Deleta usuário"""
+        return await self._run(self._service.delete, user_id)
+
+
+class AsyncPostService(_AsyncService):
+    """PostService com async/await (similar a async function usePosts())"""
+
+    def __init__(self, service: PostService = post_service, store=fake_posts_db):
+        super().__init__(service, store)
+
+    async def get_page(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        author_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        after: Optional[Tuple[int, ...]] = None
+    ) -> Tuple[List[PostResponse], Optional[Tuple[int, ...]]]:
+        """Busca uma página de posts e a chave da próxima"""
+        return await self._run(
+            self._service.get_page,
+            skip=skip, limit=limit, author_id=author_id, tags=tags, after=after
+        )
+
+    async def search(
+        self,
+        query: str,
+        operator: str = "and",
+        skip: int = 0,
+        limit: int = 10,
+        after: Optional[Tuple[int, ...]] = None
+    ) -> Tuple[List[PostResponse], Optional[Tuple[int, ...]]]:
+        """Busca textual em posts e a chave da próxima página"""
+        return await self._run(
+            self._service.search,
+            query, operator=operator, skip=skip, limit=limit, after=after
+        )
+
+    async def tag_counts(self) -> List[TagCount]:
+        """Quantidade de posts por tag"""
+        return await self._run(self._service.tag_counts)
+
+    async def get_by_id(self, post_id: int) -> Optional[PostResponse]:
+        """Busca post por ID"""
+        return await self._run(self._service.get_by_id, post_id)
+
+    async def get_json_by_id(
+        self, post_id: int, is_fresh: Optional[FreshCheck] = None
+    ) -> Optional[CachedResponse]:
+        """Busca post por ID já serializado (com cache e checagem condicional)"""
+        return await self._run(self._service.get_json_by_id, post_id, is_fresh)
+
+    async def collection_etag(self) -> str:
+        """ETag da listagem (versão da coleção)"""
+        return await self._run(self._service.collection_etag)
+
+    async def create(self, post_data: PostCreate) -> PostResponse:
+        """Cria novo post"""
+        return await self._run(self._service.create, post_data)
+
+    async def bulk_import(self, items: List[PostCreate]) -> int:
+        """Grava um bloco de posts do import (no threadpool com SQLite)"""
+        return await self._run(self._service.bulk_import, items)
+
+    async def update(self, post_id: int, post_update: PostUpdate) -> Optional[PostResponse]:
+        """Atualiza post"""
+        return await self._run(self._service.update, post_id, post_update)
+
+    async def delete(self, post_id: int) -> bool:
+        """Deleta post"""
+        return await self._run(self._service.delete, post_id)
+
+
+async_user_service = AsyncUserService()
+async_post_service = AsyncPostService()
@@ -0,0 +1,223 @@
+"""
+Cache de respostas já serializadas (read-through, LRU + TTL)
+Similar a um lru-cache (npm) na frente do banco, guardando o JSON pronto
+
+Um GET /{id} quente não vai ao store nem serializa de novo: devolve os
+bytes guardados (com ETag e Last-Modified). update/delete invalidam a
+chave do registro alterado.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, NamedTuple, Optional, Tuple
+
+
+class CachedResponse(NamedTuple):
+    """JSON de um registro e seus validadores HTTP"""
+    body: Optional[bytes]  # None: o cliente já tem esta versão (304)
+    etag: str
+    last_modified: Optional[datetime]
+
+
+# Checagem condicional do cliente: (etag, last_modified) -> ainda válido?
+FreshCheck = Callable[[str, Optional[datetime]], bool]
+
+
+def record_validators(record_id: int, modified: datetime) -> Tuple[str, datetime]:
+    """
+    ETag e Last-Modified de um registro, sem serializar nada
+
+    O ETag combina o ID e o instante da última alteração (em µs): muda a
+    cada update, e dois registros nunca compartilham o mesmo.
+    """
+    return f'"{record_id:x}-{int(modified.timestamp() * 1e6):x}"', modified
+
+
+class ResponseCache:
+    """
+    Cache LRU com expiração (TTL) de respostas já serializadas
+
+    - max_entries: quantidade máxima de entradas (0 desliga o cache)
+    - ttl: segundos até uma entrada expirar (0: sem expiração)
+    - contadores de hits, misses, evictions (LRU) e expirations
+
+    Invalidação precisa: quem vai carregar um valor pega um "carimbo"
+    (versão) antes de ler o store. Se a chave for invalidada depois do
+    carimbo, o valor lido pode ser antigo e não entra no cache.
+
+    - changes: chaves alteradas em outros processos desde a chamada
+      anterior (None: descartar tudo), para um worker não servir o que
+      outro worker já alterou
+    - changes_interval: segundos entre consultas a `changes` (é uma ida e
+      volta ao processo do store); uma alteração feita em outro worker
+      pode ser servida do cache por até esse tempo. 0: a cada leitura
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: float = 30.0,
+        changes: Optional[Callable[[], Optional[Iterable[Hashable]]]] = None,
+        changes_interval: float = 0.0
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._changes = changes
+        self.changes_interval = changes_interval
+        self._synced_at = float("-inf")
+        self._sync_lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[CachedResponse, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Versão global e a versão da última invalidação de cada chave
+        self._version = 0
+        self._invalidated: Dict[Hashable, int] = {}
+        # Carimbos abaixo deste piso são recusados (após podar _invalidated)
+        self._floor = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Valor em cache (e marca como usado recentemente) ou None"""
+        if self._changes is not None:
+            self._sync()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _sync(self) -> None:
+        """Invalida as chaves alteradas fora deste processo (no máximo a cada changes_interval)"""
+        start = time.monotonic()
+        if start - self._synced_at < self.changes_interval:
+            return
+        # Uma thread consulta por vez; as outras não esperam a ida e volta
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            changed = self._changes()
+            self._synced_at = start
+        finally:
+            self._sync_lock.release()
+
+        if changed is None:
+            self.clear()
+            return
+        for key in changed:
+            self.invalidate(key)
+
+    def stamp(self) -> int:
+        """Carimbo a pegar antes de ler o valor do store"""
+        return self._version
+
+    def put(self, key: Hashable, value: CachedResponse, stamp: int) -> None:
+        """Guarda o valor, a menos que a chave tenha sido invalidada após `stamp`"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if stamp < self._floor or self._invalidated.get(key, -1) > stamp:
+                return
+
+            expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        load: Callable[[], Optional[Any]],
+        validators: Callable[[Any], Tuple[str, Optional[datetime]]],
+        serialize: Callable[[Any], bytes],
+        is_fresh: Optional[FreshCheck] = None
+    ) -> Optional[CachedResponse]:
+        """
+        Read-through: devolve do cache ou carrega, serializa e guarda
+
+        - load(): registro do store (ou None se não existir)
+        - validators(registro): (etag, last_modified), sem serializar
+        - is_fresh: checagem condicional do cliente, feita antes de montar
+          o modelo e serializar; se passar, devolve a resposta sem corpo
+        """
+        if self.enabled:
+            cached = self.get(key)
+            if cached is not None:
+                if is_fresh is not None and is_fresh(cached.etag, cached.last_modified):
+                    return cached._replace(body=None)
+                return cached
+
+        stamp = self.stamp()
+        record = load()
+        if record is None:
+            return None
+
+        etag, last_modified = validators(record)
+        if is_fresh is not None and is_fresh(etag, last_modified):
+            return CachedResponse(None, etag, last_modified)
+
+        response = CachedResponse(serialize(record), etag, last_modified)
+        self.put(key, response, stamp)
+        return response
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove a chave (chamar depois de gravar a alteração no store)"""
+        with self._lock:
+            self._version += 1
+            self._entries.pop(key, None)
+            self._invalidated[key] = self._version
+
+            # Mantém o registro de invalidações limitado: acima do limite,
+            # recusa todos os carimbos anteriores e recomeça
+            if len(self._invalidated) > max(self.max_entries, 1024):
+                self._floor = self._version
+                self._invalidated.clear()
+
+    def clear(self) -> None:
+        """Esvazia o cache (os contadores continuam)"""
+        with self._lock:
+            self._version += 1
+            self._floor = self._version
+            self._entries.clear()
+            self._invalidated.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Contadores e ocupação do cache"""
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
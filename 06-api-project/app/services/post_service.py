@@ -3,79 +3,317 @@ Post Service - Lógica de negócio para posts
 Similar a Custom Hook usePosts no React
 """
 
-from typing import List, Optional
-from app.models.post import PostCreate, PostUpdate, PostResponse
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import TypeAdapter
+from app.config.settings import get_settings
+from app.models.post import PostCreate, PostUpdate, PostResponse, TagCount
+from app.storage import create_search_index, create_store, HashIndex, MultiIndex, Record
 from datetime import datetime
+from .cache import CachedResponse, FreshCheck, ResponseCache, record_validators
 
-# Banco de dados simulado
-fake_posts_db: List[dict] = []
-next_post_id = 1
+class PostRecord(Record):
+    """Post como guardado no store (compacto, só vira PostResponse na API)"""
+    columns = {
+        "title": str,
+        "content": str,
+        "author_id": int,
+        "tags": list,
+        "created_at": datetime,
+        "updated_at": datetime
+    }
+    __slots__ = tuple(columns)
+
+# Banco de dados simulado (em memória ou SQLite, conforme Settings.STORAGE_BACKEND)
+fake_posts_db = create_store(
+    "posts",
+    PostRecord,
+    indexes=[HashIndex("author_id"), MultiIndex("tags")],
+    sql_indexes=["created_at"]
+)
+
+# Busca textual (título vale mais que tags, que valem mais que o conteúdo)
+# Com SQLite/journal os posts já existem na subida: o índice é montado a
+# partir deles em segundo plano (a API já atende; a busca responde 503 até lá)
+post_search = create_search_index("posts", {"title": 3, "tags": 2, "content": 1}, fake_posts_db)
+
+# Cache do JSON de GET /api/posts/{id} (invalidado em update/delete)
+post_cache = ResponseCache(
+    get_settings().CACHE_MAX_ENTRIES,
+    get_settings().CACHE_TTL_SECONDS,
+    # Backend "shared": alterações feitas pelos outros workers
+    changes=getattr(fake_posts_db, "changes", None),
+    changes_interval=get_settings().CACHE_SYNC_INTERVAL
+)
+
+# Conversão em lote registro -> PostResponse (uma chamada ao validador em Rust)
+_post_list = TypeAdapter(List[PostResponse])
+_post_json = TypeAdapter(PostResponse)
 
 class PostService:
     """Service de posts (similar a usePosts hook no React)"""
     
-    def get_all(self, skip: int = 0, limit: int = 10, author_id: Optional[int] = None) -> List[PostResponse]:
+    def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        author_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        after: Optional[Tuple[int, ...]] = None
+    ) -> List[PostResponse]:
         """Busca todos os posts"""
-        posts = fake_posts_db.copy()
+        posts, _ = self.get_page(
+            skip=skip, limit=limit, author_id=author_id, tags=tags, after=after
+        )
+        return posts
+    
+    def get_page(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        author_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        after: Optional[Tuple[int, ...]] = None
+    ) -> Tuple[List[PostResponse], Optional[Tuple[int, ...]]]:
+        """
+        Busca uma página de posts (em ordem de ID) e a chave da próxima
+        
+        - tags: posts com todas as tags (interseção no índice de tags)
+        - after: chave (id,) do último post da página anterior (cursor)
+        """
+        if after is not None and len(after) != 1:
+            raise ValueError("Cursor does not match the requested ordering")
+        
+        after_id = after[0] if after else None
+        posts = self._filtered(author_id, tags, after_id)
         
+        # Um item a mais indica se existe próxima página
+        page = list(islice(posts, skip, skip + limit + 1))
+        
+        next_key = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_key = (page[-1].id,)
+        
+        return self._to_responses(page), next_key
+    
+    def export(
+        self,
+        author_id: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        batch_size: int = 500
+    ) -> Iterator[List[PostResponse]]:
+        """
+        Todos os posts filtrados, em lotes (para exportação em streaming)
+        
+        Cada lote é uma consulta curta que continua do último ID do lote
+        anterior: memória constante, e nenhuma leitura fica aberta entre
+        um lote e outro (o gerador pode ser consumido por threads diferentes).
+        """
+        after_id = None
+        while True:
+            batch = list(islice(self._filtered(author_id, tags, after_id), batch_size))
+            if not batch:
+                return
+            yield self._to_responses(batch)
+            after_id = batch[-1].id
+    
+    def _filtered(
+        self,
+        author_id: Optional[int],
+        tags: Optional[List[str]],
+        after_id: Optional[int]
+    ) -> Iterator[PostRecord]:
+        """Posts com os filtros, em ordem de ID, a partir de after_id (pelos índices)"""
+        if tags:
+            # Interseção das tags pelo índice; autor filtrado no caminho
+            posts = fake_posts_db.find_all("tags", tags, after=after_id)
+            
+            if author_id:
+                posts = (p for p in posts if p.author_id == author_id)
+            return posts
         if author_id:
-            posts = [p for p in posts if p.get("author_id") == author_id]
+            return fake_posts_db.find("author_id", author_id, after=after_id)
+        return fake_posts_db.scan(after=after_id)
+    
+    def search(
+        self,
+        query: str,
+        operator: str = "and",
+        skip: int = 0,
+        limit: int = 10,
+        after: Optional[Tuple[int, ...]] = None
+    ) -> Tuple[List[PostResponse], Optional[Tuple[int, ...]]]:
+        """
+        Busca textual em título, conteúdo e tags, do mais relevante ao menos
+        
+        - operator: "and" (todos os termos) ou "or" (qualquer termo)
+        - after: chave (pontos, id) do último post da página anterior (cursor)
+        """
+        if after is not None and len(after) != 2:
+            raise ValueError("Cursor does not match the requested ordering")
         
-        paginated = posts[skip:skip + limit]
-        return [PostResponse(**post) for post in paginated]
+        # Um item a mais indica se existe próxima página
+        hits = post_search.search(query, operator, limit=skip + limit + 1, after=after)[skip:]
+        
+        next_key = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_key = hits[-1]
+        
+        posts = [fake_posts_db.get(post_id) for _, post_id in hits]
+        # Um delete concorrente pode ter removido o post depois da busca
+        return self._to_responses([post for post in posts if post]), next_key
+    
+    def tag_counts(self) -> List[TagCount]:
+        """Quantidade de posts por tag (lida do índice, sem varrer os posts)"""
+        counts = fake_posts_db.counts("tags")
+        return [
+            TagCount(tag=tag, count=count)
+            for tag, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        ]
     
     def get_by_id(self, post_id: int) -> Optional[PostResponse]:
         """Busca post por ID"""
-        post = next((p for p in fake_posts_db if p.get("id") == post_id), None)
+        post = fake_posts_db.get(post_id)
         
         if not post:
             return None
         
-        return PostResponse(**post)
+        return self._to_response(post)
     
-    def create(self, post_data: PostCreate) -> PostResponse:
-        """Cria novo post"""
-        global next_post_id
+    def get_json_by_id(
+        self, post_id: int, is_fresh: Optional[FreshCheck] = None
+    ) -> Optional[CachedResponse]:
+        """
+        Busca post por ID já serializado em JSON (read-through no cache)
         
-        post_dict = {
-            "id": next_post_id,
-            "title": post_data.title,
-            "content": post_data.content,
-            "author_id": post_data.author_id,
-            "tags": post_data.tags,
-            "created_at": datetime.now(),
-            "updated_at": None
-        }
+        - is_fresh: checagem If-None-Match/If-Modified-Since, feita antes
+          de montar o PostResponse; se passar, body vem None (304)
+        """
+        return post_cache.get_or_load(
+            post_id,
+            lambda: fake_posts_db.get(post_id),
+            self._validators,
+            self._to_json,
+            is_fresh
+        )
+    
+    def collection_etag(self) -> str:
+        """
+        ETag das listagens: muda a cada escrita em qualquer post
         
-        fake_posts_db.append(post_dict)
-        next_post_id += 1
+        Ler antes dos dados da página: uma escrita no meio muda a versão
+        e o próximo request não recebe um 304 indevido.
+        """
+        return f'"posts-{fake_posts_db.version():x}"'
+    
+    def create(self, post_data: PostCreate) -> PostResponse:
+        """Cria novo post"""
+        post = fake_posts_db.insert(self._new_record(post_data))
+        self._reindex([post.id])
         
-        return PostResponse(**post_dict)
+        return self._to_response(post)
     
     def update(self, post_id: int, post_update: PostUpdate) -> Optional[PostResponse]:
         """Atualiza post"""
-        post = next((p for p in fake_posts_db if p.get("id") == post_id), None)
+        post = fake_posts_db.update(post_id, self._changes(post_update))
         
         if not post:
             return None
         
-        update_data = post_update.model_dump(exclude_unset=True)
-        post.update(update_data)
-        post["updated_at"] = datetime.now()
-        
-        return PostResponse(**post)
+        self._reindex([post_id])
+        post_cache.invalidate(post_id)
+        return self._to_response(post)
     
     def delete(self, post_id: int) -> bool:
         """Deleta post"""
-        global fake_posts_db
+        success = fake_posts_db.delete(post_id)
+        post_cache.invalidate(post_id)
         
-        post = next((p for p in fake_posts_db if p.get("id") == post_id), None)
+        if success:
+            self._reindex([post_id])
         
-        if not post:
-            return False
+        return success
+    
+    def bulk_create(self, items: List[PostCreate]) -> List[PostResponse]:
+        """Cria vários posts em uma única operação do store"""
+        posts = fake_posts_db.insert_many([self._new_record(item) for item in items])
+        self._reindex(post.id for post in posts)
+        return self._to_responses(posts)
+    
+    def bulk_import(self, items: List[PostCreate]) -> int:
+        """
+        Grava um bloco de posts já validados (import), sem montar as respostas
         
-        fake_posts_db.remove(post)
-        return True
+        Devolve quantos posts foram criados
+        """
+        posts = fake_posts_db.insert_many([self._new_record(item) for item in items])
+        self._reindex(post.id for post in posts)
+        return len(posts)
+    
+    def bulk_update(self, updates: Dict[int, PostUpdate]) -> Dict[int, Optional[PostResponse]]:
+        """Atualiza vários posts (id -> patch); None para IDs inexistentes"""
+        posts = fake_posts_db.update_many(
+            {post_id: self._changes(patch) for post_id, patch in updates.items()}
+        )
+        self._reindex(post_id for post_id, post in posts.items() if post)
+        for post_id in posts:
+            post_cache.invalidate(post_id)
+        return {
+            post_id: self._to_response(post) if post else None
+            for post_id, post in posts.items()
+        }
+    
+    def bulk_delete(self, post_ids: List[int]) -> List[bool]:
+        """Deleta vários posts; False para IDs inexistentes (mesma ordem)"""
+        results = fake_posts_db.delete_many(post_ids)
+        for post_id in post_ids:
+            post_cache.invalidate(post_id)
+        self._reindex(post_id for post_id, deleted in zip(post_ids, results) if deleted)
+        return results
+    
+    def _reindex(self, post_ids: Iterable[int]) -> None:
+        """Atualiza a busca textual com o estado atual dos posts no store"""
+        for post_id in post_ids:
+            post_search.refresh(post_id, fake_posts_db.get)
+    
+    def _to_response(self, post: PostRecord) -> PostResponse:
+        """Registro do store -> PostResponse"""
+        return PostResponse.model_validate(post)
+    
+    def _to_json(self, post: PostRecord) -> bytes:
+        return _post_json.dump_json(self._to_response(post))
+    
+    def _validators(self, post: PostRecord) -> Tuple[str, datetime]:
+        """ETag e Last-Modified a partir do registro (sem montar o modelo)"""
+        return record_validators(post.id, post.updated_at or post.created_at)
+    
+    def _to_responses(self, posts: List[PostRecord]) -> List[PostResponse]:
+        """
+        Registros do store -> PostResponse, em lote
+        
+        A rota devolve o JSON já serializado, então esta é a única validação
+        da resposta (antes eram duas: aqui e no response_model)
+        """
+        return _post_list.validate_python(posts, from_attributes=True)
+    
+    def _new_record(self, post_data: PostCreate) -> dict:
+        """Monta o registro de um post novo (sem o ID)"""
+        return {
+            "title": post_data.title,
+            "content": post_data.content,
+            "author_id": post_data.author_id,
+            "tags": post_data.tags,
+            "created_at": datetime.now(),
+            "updated_at": None
+        }
+    
+    def _changes(self, post_update: PostUpdate) -> dict:
+        """Campos alterados por um patch (sempre atualiza updated_at)"""
+        update_data = post_update.model_dump(exclude_unset=True)
+        update_data["updated_at"] = datetime.now()
+        return update_data
 
 post_service = PostService()
 
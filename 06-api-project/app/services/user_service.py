@@ -3,13 +3,54 @@ User Service - Lógica de negócio
 Similar a Custom Hooks no React (useUsers, useUserById, etc.)
 """
 
-from typing import List, Optional
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from pydantic import TypeAdapter
+from app.config.settings import get_settings
 from app.models.user import UserCreate, UserUpdate, UserResponse, UserRole
+from app.storage import create_store, DuplicateKeyError, HashIndex, Record, SortedIndex, UniqueIndex
 from datetime import datetime
+from .cache import CachedResponse, FreshCheck, ResponseCache, record_validators
+
+class UserRecord(Record):
+    """
+    Usuário como guardado no store (compacto, só vira UserResponse na API)
+    Similar a uma interface interna, diferente do DTO de resposta
+    
+    updated_at é interno (Last-Modified/ETag): não aparece no UserResponse
+    """
+    columns = {
+        "name": str,
+        "email": str,
+        "age": int,
+        "role": str,
+        "created_at": datetime,
+        "updated_at": datetime
+    }
+    interned = ("role",)
+    __slots__ = tuple(columns)
 
 # Banco de dados simulado (em produção, use PostgreSQL, MongoDB, etc.)
-fake_users_db: List[dict] = []
-next_user_id = 1
+# Em memória (indexado por ID, similar a um Map no JavaScript) ou SQLite,
+# conforme Settings.STORAGE_BACKEND
+# Índices secundários: role (igualdade), age (faixa) e email (único, sem
+# diferenciar maiúsculas: "Ana@x.com" e "ana@x.com" são o mesmo email)
+fake_users_db = create_store(
+    "users",
+    UserRecord,
+    indexes=[HashIndex("role"), SortedIndex("age"), UniqueIndex("email", ignore_case=True)],
+    sql_indexes=["created_at"]
+)
+
+# Cache do JSON de GET /api/users/{id} (invalidado em update/delete)
+user_cache = ResponseCache(
+    get_settings().CACHE_MAX_ENTRIES,
+    get_settings().CACHE_TTL_SECONDS,
+    # Backend "shared": alterações feitas pelos outros workers
+    changes=getattr(fake_users_db, "changes", None),
+    changes_interval=get_settings().CACHE_SYNC_INTERVAL
+)
+_user_json = TypeAdapter(UserResponse)
 
 class UserService:
     """
@@ -23,81 +64,269 @@ class UserService:
     }
     """
     
-    def get_all(self, skip: int = 0, limit: int = 10, role: Optional[UserRole] = None) -> List[UserResponse]:
+    def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        role: Optional[UserRole] = None,
+        min_age: Optional[int] = None,
+        max_age: Optional[int] = None,
+        after: Optional[Tuple[int, ...]] = None
+    ) -> List[UserResponse]:
         """
         Busca todos os usuários (similar a fetch('/api/users') no React)
         """
-        users = fake_users_db.copy()
+        users, _ = self.get_page(
+            skip=skip, limit=limit, role=role,
+            min_age=min_age, max_age=max_age, after=after
+        )
+        return users
+    
+    def get_page(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        role: Optional[UserRole] = None,
+        min_age: Optional[int] = None,
+        max_age: Optional[int] = None,
+        after: Optional[Tuple[int, ...]] = None
+    ) -> Tuple[List[UserResponse], Optional[Tuple[int, ...]]]:
+        """
+        Busca uma página de usuários e a chave para buscar a próxima
         
-        # Filtro por role
-        if role:
-            users = [u for u in users if u.get("role") == role.value]
+        - Filtros são lidos direto dos índices (sem varrer todos os usuários)
+        - Sem filtro de idade a ordem é por ID e a chave é (id,)
+        - Com filtro de idade a ordem é por idade e a chave é (age, id)
+        - after: chave do último usuário da página anterior (cursor)
+        """
+        by_age = min_age is not None or max_age is not None
+        
+        if after is not None and len(after) != (2 if by_age else 1):
+            raise ValueError("Cursor does not match the requested ordering")
+        
+        users = self._filtered(role, min_age, max_age, after)
         
-        # Paginação
-        paginated = users[skip:skip + limit]
+        # Paginação: um item a mais indica se existe próxima página
+        page = list(islice(users, skip, skip + limit + 1))
+        
+        next_key = None
+        if len(page) > limit:
+            page = page[:limit]
+            last = page[-1]
+            next_key = (last.age, last.id) if by_age else (last.id,)
         
         # Converter para UserResponse
-        return [UserResponse(**user) for user in paginated]
+        return self._to_responses(page), next_key
+    
+    def export(
+        self,
+        role: Optional[UserRole] = None,
+        min_age: Optional[int] = None,
+        max_age: Optional[int] = None,
+        batch_size: int = 500
+    ) -> Iterator[List[UserResponse]]:
+        """
+        Todos os usuários filtrados, em lotes (para exportação em streaming)
+        
+        Cada lote continua da chave do último usuário do lote anterior, como
+        a paginação por cursor: memória constante e nenhuma leitura aberta
+        entre lotes.
+        """
+        by_age = min_age is not None or max_age is not None
+        after = None
+        while True:
+            batch = list(islice(self._filtered(role, min_age, max_age, after), batch_size))
+            if not batch:
+                return
+            yield self._to_responses(batch)
+            last = batch[-1]
+            after = (last.age, last.id) if by_age else (last.id,)
+    
+    def _filtered(
+        self,
+        role: Optional[UserRole],
+        min_age: Optional[int],
+        max_age: Optional[int],
+        after: Optional[Tuple[int, ...]]
+    ) -> Iterator[UserRecord]:
+        """
+        Usuários com os filtros, a partir da chave `after` (pelos índices)
+        
+        Ordem por (age, id) com filtro de idade, senão por ID
+        """
+        if min_age is not None or max_age is not None:
+            # Faixa de idade pelo índice ordenado; role filtrado no caminho
+            users = fake_users_db.range("age", min_age, max_age, after=after)
+            
+            if role:
+                users = (u for u in users if u.role == role.value)
+            return users
+        
+        after_id = after[0] if after else None
+        if role:
+            # Filtro por role pelo índice de igualdade
+            return fake_users_db.find("role", role.value, after=after_id)
+        return fake_users_db.scan(after=after_id)
     
     def get_by_id(self, user_id: int) -> Optional[UserResponse]:
         """
         Busca usuário por ID (similar a fetch(`/api/users/${id}`) no React)
         """
-        user = next((u for u in fake_users_db if u.get("id") == user_id), None)
+        user = fake_users_db.get(user_id)
         
         if not user:
             return None
         
-        return UserResponse(**user)
+        return self._to_response(user)
     
-    def create(self, user_data: UserCreate) -> UserResponse:
+    def get_json_by_id(
+        self, user_id: int, is_fresh: Optional[FreshCheck] = None
+    ) -> Optional[CachedResponse]:
         """
-        Cria novo usuário (similar a POST /api/users no React)
+        Busca usuário por ID já serializado em JSON (read-through no cache)
+        
+        - is_fresh: checagem If-None-Match/If-Modified-Since, feita antes
+          de montar o UserResponse; se passar, body vem None (304)
+        """
+        return user_cache.get_or_load(
+            user_id,
+            lambda: fake_users_db.get(user_id),
+            self._validators,
+            self._to_json,
+            is_fresh
+        )
+    
+    def collection_etag(self) -> str:
+        """
+        ETag da listagem: muda a cada escrita em qualquer usuário
+        (ler antes dos dados da página)
+        """
+        return f'"users-{fake_users_db.version():x}"'
+    
+    def get_by_email(self, email: str) -> Optional[UserResponse]:
+        """
+        Busca usuário por email pelo índice único (O(1), sem varrer a tabela)
         """
-        global next_user_id
+        user = next(fake_users_db.find("email", email), None)
         
-        user_dict = {
-            "id": next_user_id,
-            "name": user_data.name,
-            "email": user_data.email,
-            "age": user_data.age,
-            "role": user_data.role,
-            "created_at": datetime.now()
-        }
+        if not user:
+            return None
         
-        fake_users_db.append(user_dict)
-        next_user_id += 1
+        return self._to_response(user)
+    
+    def create(self, user_data: UserCreate) -> UserResponse:
+        """
+        Cria novo usuário (similar a POST /api/users no React)
+        
+        - DuplicateKeyError se o email já estiver cadastrado
+        """
+        user_dict = fake_users_db.insert(self._new_record(user_data))
         
-        return UserResponse(**user_dict)
+        return self._to_response(user_dict)
     
     def update(self, user_id: int, user_update: UserUpdate) -> Optional[UserResponse]:
         """
         Atualiza usuário (similar a PUT /api/users/:id no React)
+        
+        - DuplicateKeyError se o novo email já for de outro usuário
         """
-        user = next((u for u in fake_users_db if u.get("id") == user_id), None)
+        user = fake_users_db.update(user_id, self._changes(user_update))
         
         if not user:
             return None
         
-        # Atualizar apenas campos fornecidos
-        update_data = user_update.model_dump(exclude_unset=True)
-        user.update(update_data)
+        user_cache.invalidate(user_id)
         
-        return UserResponse(**user)
+        return self._to_response(user)
     
     def delete(self, user_id: int) -> bool:
         """
         Deleta usuário (similar a DELETE /api/users/:id no React)
         """
-        global fake_users_db
-        
-        user = next((u for u in fake_users_db if u.get("id") == user_id), None)
+        success = fake_users_db.delete(user_id)
+        user_cache.invalidate(user_id)
+        return success
+    
+    def bulk_create(self, items: List[UserCreate]) -> List[Union[UserResponse, DuplicateKeyError]]:
+        """
+        Cria vários usuários em uma única operação do store
+        (similar a Promise.all de vários POST, mas em uma só chamada)
         
-        if not user:
-            return False
+        - DuplicateKeyError no lugar dos itens com email já cadastrado
+        """
+        users = fake_users_db.insert_many([self._new_record(item) for item in items])
+        return [
+            self._to_response(user) if isinstance(user, UserRecord) else user
+            for user in users
+        ]
+    
+    def bulk_update(
+        self, updates: Dict[int, UserUpdate]
+    ) -> Dict[int, Union[UserResponse, DuplicateKeyError, None]]:
+        """
+        Atualiza vários usuários (id -> patch); None para IDs inexistentes
+        e DuplicateKeyError para emails já usados por outro usuário
+        """
+        users = fake_users_db.update_many(
+            {user_id: self._changes(patch) for user_id, patch in updates.items()}
+        )
+        for user_id in users:
+            user_cache.invalidate(user_id)
+        return {
+            user_id: self._to_response(user) if isinstance(user, UserRecord) else user
+            for user_id, user in users.items()
+        }
+    
+    def bulk_delete(self, user_ids: List[int]) -> List[bool]:
+        """
+        Deleta vários usuários; False para IDs inexistentes (mesma ordem)
+        """
+        results = fake_users_db.delete_many(user_ids)
+        for user_id in user_ids:
+            user_cache.invalidate(user_id)
+        return results
+    
+    def _to_response(self, user: UserRecord) -> UserResponse:
+        """
+        Registro do store -> UserResponse sem revalidar
         
-        fake_users_db.remove(user)
-        return True
+        Os dados já foram validados na entrada, e revalidar o EmailStr
+        (email-validator, em Python puro) é o custo dominante da listagem.
+        A rota devolve o JSON já serializado, então o response_model
+        também não revalida.
+        """
+        fields = user.to_dict()
+        del fields["updated_at"]
+        fields["role"] = UserRole(fields["role"])
+        return UserResponse.model_construct(**fields)
+    
+    def _to_json(self, user: UserRecord) -> bytes:
+        return _user_json.dump_json(self._to_response(user))
+    
+    def _validators(self, user: UserRecord) -> Tuple[str, datetime]:
+        """ETag e Last-Modified a partir do registro (sem montar o modelo)"""
+        return record_validators(user.id, user.updated_at or user.created_at)
+    
+    def _to_responses(self, users: List[UserRecord]) -> List[UserResponse]:
+        """Registros do store -> UserResponse, em lote"""
+        return [self._to_response(user) for user in users]
+    
+    def _new_record(self, user_data: UserCreate) -> dict:
+        """Monta o registro de um usuário novo (sem o ID e sem a senha)"""
+        return {
+            "name": user_data.name,
+            "email": user_data.email,
+            "age": user_data.age,
+            "role": user_data.role.value,
+            "created_at": datetime.now(),
+            "updated_at": None
+        }
+    
+    def _changes(self, user_update: UserUpdate) -> dict:
+        """Campos alterados por um patch (apenas os fornecidos, mais updated_at)"""
+        update_data = user_update.model_dump(exclude_unset=True)
+        update_data["updated_at"] = datetime.now()
+        return update_data
 
 # Instância singleton (similar a export const userService no Node.js)
 user_service = UserService()
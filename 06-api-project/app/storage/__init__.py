@@ -0,0 +1,32 @@
+"""Storage module"""
+from .indexes import (
+    DuplicateKeyError, HashIndex, MultiIndex, SortedIndex, SortedIds, UniqueIndex
+)
+from .records import Record
+from .search import IndexNotReady, SearchIndex, tokenize
+from .memory import MemoryStore
+from .journal import JournaledStore
+from .sqlite import SqliteStore
+from .shared import RemoteSearchIndex, RemoteStore
+from .factory import Store, create_search_index, create_store
+
+__all__ = [
+    "MemoryStore",
+    "JournaledStore",
+    "SqliteStore",
+    "RemoteStore",
+    "RemoteSearchIndex",
+    "Store",
+    "Record",
+    "create_store",
+    "create_search_index",
+    "HashIndex",
+    "MultiIndex",
+    "UniqueIndex",
+    "DuplicateKeyError",
+    "SortedIndex",
+    "SortedIds",
+    "SearchIndex",
+    "IndexNotReady",
+    "tokenize"
+]
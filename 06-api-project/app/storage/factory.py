@@ -0,0 +1,118 @@
+"""
+Criação dos stores conforme as configurações
+Similar a escolher o "adapter" do banco por variável de ambiente no Node.js
+"""
+
+from typing import Dict, Iterable, Mapping, Optional, Type, Union
+
+from app.config.settings import Settings, get_settings
+
+from .indexes import HashIndex
+from .journal import JournaledStore
+from .memory import MemoryStore
+from .records import Record
+from .search import SearchIndex
+from .shared import RemoteSearchIndex, RemoteStore
+from .sqlite import SqliteStore, sqlite_path
+
+Store = Union[MemoryStore, JournaledStore, SqliteStore, RemoteStore]
+
+# Stores e índices de busca criados neste processo, por tabela (o servidor
+# do store compartilhado atende os workers a partir deles)
+_stores: Dict[str, Store] = {}
+_search_indexes: Dict[str, SearchIndex] = {}
+
+
+def create_store(
+    table: str,
+    record_type: Type[Record],
+    indexes: Iterable[HashIndex] = (),
+    sql_indexes: Iterable[str] = (),
+) -> Store:
+    """
+    Cria o store de uma tabela usando Settings.STORAGE_BACKEND
+
+    - record_type: classe do registro (colunas e tipos em record_type.columns)
+    - indexes: índices secundários (mantidos em memória ou como índices SQL)
+    - sql_indexes: campos indexados apenas em backends SQL (ex: created_at)
+
+    Com "shared" o store é um cliente do processo que guarda os dados,
+    dividido entre todos os workers do uvicorn.
+    """
+    settings = get_settings()
+
+    if settings.STORAGE_BACKEND == "shared":
+        # Os índices vivem no processo do store (python -m app.storage.shared)
+        return RemoteStore(settings.SHARED_STORE_SOCKET, table, record_type)
+
+    store = _local_store(settings, table, record_type, indexes, sql_indexes)
+    _stores[table] = store
+    return store
+
+
+def _local_store(
+    settings: Settings,
+    table: str,
+    record_type: Type[Record],
+    indexes: Iterable[HashIndex],
+    sql_indexes: Iterable[str],
+) -> Store:
+    if settings.STORAGE_BACKEND == "memory":
+        return MemoryStore(record_type, indexes=indexes)
+
+    if settings.STORAGE_BACKEND == "sqlite":
+        return SqliteStore(
+            sqlite_path(settings.DATABASE_URL),
+            table,
+            record_type,
+            indexes=indexes,
+            sql_indexes=sql_indexes,
+        )
+
+    if settings.STORAGE_BACKEND == "journal":
+        return JournaledStore(
+            settings.JOURNAL_DIR,
+            table,
+            record_type,
+            indexes=indexes,
+            fsync=settings.JOURNAL_FSYNC,
+            fsync_interval=settings.JOURNAL_FSYNC_INTERVAL,
+            snapshot_bytes=settings.JOURNAL_SNAPSHOT_BYTES,
+            read_cache=settings.JOURNAL_READ_CACHE,
+        )
+
+    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+
+
+def create_search_index(
+    table: str, fields: Mapping[str, int], store: Store
+) -> Union[SearchIndex, RemoteSearchIndex]:
+    """
+    Cria a busca textual de uma tabela (campo -> peso)
+
+    Nos backends locais o índice é montado a partir dos registros que o
+    store já tem, em segundo plano (a busca levanta IndexNotReady até lá).
+    No "shared" ele vive no processo do store, junto com os registros.
+    """
+    if isinstance(store, RemoteStore):
+        return RemoteSearchIndex(store)
+
+    index = SearchIndex(fields)
+    if isinstance(store, MemoryStore):
+        # Só IDs e peek(): com o journal, os registros do snapshot são
+        # decodificados para o índice e descartados (não enchem o cache)
+        index.rebuild_in_background(store.ids(), store.peek)
+    else:
+        index.rebuild_in_background((record.id for record in store.scan()), store.get)
+    _search_indexes[table] = index
+    return index
+
+
+def registered_store(table: str) -> Optional[Store]:
+    """Store local da tabela criado neste processo (ou None)"""
+    return _stores.get(table)
+
+
+def registered_search_index(table: str) -> Optional[SearchIndex]:
+    """Índice de busca local da tabela criado neste processo (ou None)"""
+    return _search_indexes.get(table)
@@ -0,0 +1,361 @@
+"""
+Índices secundários para o MemoryStore
+Similar a índices de banco de dados (CREATE INDEX) ou a um Map<valor, Set<id>> no JavaScript
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+
+class DuplicateKeyError(Exception):
+    """Valor já usado por outro registro em um índice único"""
+
+    def __init__(self, field: str, value: Any):
+        super().__init__(f"Duplicate value for '{field}': {value!r}")
+        self.field = field
+        self.value = value
+
+
+class SortedIds:
+    """
+    Conjunto de IDs mantido em ordem crescente
+
+    - add em O(1) quando o ID é o maior (caso comum: IDs novos)
+    - discard em O(1) amortizado: o ID é só marcado como removido e a
+      lista é compactada quando metade dela já foi removida
+    - iteração em ordem de ID, sem copiar a lista
+    - frozen(): IDs prontos (ex: fatia de um snapshot em mmap), copiados
+      para a lista e o set só na primeira escrita
+    """
+
+    def __init__(self):
+        self._ids: Sequence[int] = []
+        # None: congelado, todos os IDs de _ids estão vivos
+        self._live: Optional[Set[int]] = set()
+
+    @classmethod
+    def frozen(cls, ids: Sequence[int]) -> "SortedIds":
+        """IDs já em ordem crescente e sem repetição, usados sem cópia"""
+        sorted_ids = cls.__new__(cls)
+        sorted_ids._ids = ids
+        sorted_ids._live = None
+        return sorted_ids
+
+    def __len__(self) -> int:
+        return len(self._ids) if self._live is None else len(self._live)
+
+    def __contains__(self, record_id: int) -> bool:
+        if self._live is None:
+            pos = bisect_left(self._ids, record_id)
+            return pos < len(self._ids) and self._ids[pos] == record_id
+        return record_id in self._live
+
+    def __iter__(self) -> Iterator[int]:
+        return self.iter_from()
+
+    def _thaw(self) -> None:
+        # A lista antes do set: quem lê vê (lista, None) ou (lista, set), ambos válidos
+        self._ids = list(self._ids)
+        self._live = set(self._ids)
+
+    def add(self, record_id: int) -> None:
+        if self._live is None:
+            self._thaw()
+        if record_id in self._live:
+            return
+
+        ids = self._ids
+        if not ids or record_id > ids[-1]:
+            ids.append(record_id)
+        else:
+            pos = bisect_left(ids, record_id)
+            # O ID pode ainda estar na lista como removido
+            if pos == len(ids) or ids[pos] != record_id:
+                ids.insert(pos, record_id)
+
+        self._live.add(record_id)
+
+    def discard(self, record_id: int) -> None:
+        if self._live is None:
+            self._thaw()
+        self._live.discard(record_id)
+
+        if len(self._ids) > 2 * len(self._live) + 32:
+            self._ids = [i for i in self._ids if i in self._live]
+
+    def iter_from(self, after: Optional[int] = None) -> Iterator[int]:
+        """Itera os IDs em ordem, começando depois de `after`"""
+        ids, live = self._ids, self._live
+        start = 0 if after is None else bisect_right(ids, after)
+
+        if live is None:
+            yield from ids[start:]
+            return
+
+        for pos in range(start, len(ids)):
+            # Compactação durante a iteração troca a lista: paramos na antiga
+            record_id = ids[pos]
+            if record_id in live:
+                yield record_id
+
+
+class HashIndex:
+    """
+    Índice por igualdade: valor -> IDs (em ordem de ID)
+
+    Escritas usam o lock do próprio índice; leituras não travam.
+
+    Similar a: CREATE INDEX idx_users_role ON users(role)
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self._buckets: Dict[Hashable, SortedIds] = {}
+        self._lock = threading.Lock()
+
+    def add(self, value: Hashable, record_id: int) -> None:
+        with self._lock:
+            self._add(value, record_id)
+
+    def remove(self, value: Hashable, record_id: int) -> None:
+        with self._lock:
+            self._remove(value, record_id)
+
+    def _add(self, value: Hashable, record_id: int) -> None:
+        bucket = self._buckets.get(value)
+        if bucket is None:
+            bucket = self._buckets[value] = SortedIds()
+        bucket.add(record_id)
+
+    def _remove(self, value: Hashable, record_id: int) -> None:
+        bucket = self._buckets.get(value)
+        if bucket is None:
+            return
+
+        bucket.discard(record_id)
+        if not bucket:
+            del self._buckets[value]
+
+    def count(self, value: Hashable) -> int:
+        bucket = self._buckets.get(value)
+        return len(bucket) if bucket else 0
+
+    def counts(self) -> Dict[Hashable, int]:
+        """Quantidade de IDs por valor, em O(valores distintos)"""
+        with self._lock:
+            return {value: len(bucket) for value, bucket in self._buckets.items()}
+
+    def key(self, value: Any) -> Hashable:
+        """Valor como guardado no índice (subclasses podem normalizar)"""
+        return value
+
+    @property
+    def spec(self) -> Tuple[Any, ...]:
+        """Tipo e configuração: um snapshot só serve para um índice igual"""
+        return (type(self).__name__, self.field)
+
+    def keys_for(self, value: Any) -> Iterable[Hashable]:
+        """Chaves em que um registro com este valor aparece (ex: ao gravar um snapshot)"""
+        return (value,)
+
+    def load(self, keys: List[Hashable], bounds: Sequence[int], ids: Sequence[int]) -> None:
+        """
+        Substitui o conteúdo por buckets prontos: keys[i] -> ids[bounds[i]:bounds[i + 1]]
+
+        Os IDs (ex: um memoryview sobre o snapshot) não são copiados.
+        """
+        with self._lock:
+            self._buckets = {
+                key: SortedIds.frozen(ids[bounds[i]:bounds[i + 1]])
+                for i, key in enumerate(keys)
+            }
+
+    def matches(self, field_value: Any, value: Hashable) -> bool:
+        """O valor do campo no registro corresponde ao valor buscado?"""
+        return field_value == value
+
+    def find(self, value: Hashable, after: Optional[int] = None) -> Iterator[int]:
+        """IDs com field == value, em ordem de ID"""
+        bucket = self._buckets.get(value)
+        return bucket.iter_from(after) if bucket else iter(())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SortedIndex(HashIndex):
+    """
+    Índice ordenado: permite consultas por faixa (min <= valor <= max)
+
+    Guarda os valores distintos em uma lista ordenada e, para cada valor,
+    os IDs em ordem. Para campos com poucos valores distintos (ex: idade)
+    inserir e remover custa O(1) amortizado.
+
+    Similar a: CREATE INDEX idx_users_age ON users(age) + WHERE age BETWEEN ...
+    """
+
+    def __init__(self, field: str):
+        super().__init__(field)
+        self._keys: List[Any] = []
+
+    def _add(self, value: Any, record_id: int) -> None:
+        if value not in self._buckets:
+            insort(self._keys, value)
+        super()._add(value, record_id)
+
+    def _remove(self, value: Any, record_id: int) -> None:
+        super()._remove(value, record_id)
+        if value not in self._buckets:
+            pos = bisect_left(self._keys, value)
+            if pos < len(self._keys) and self._keys[pos] == value:
+                del self._keys[pos]
+
+    def range(
+        self,
+        min_value: Any = None,
+        max_value: Any = None,
+        after: Optional[Tuple[Any, int]] = None
+    ) -> Iterator[int]:
+        """
+        IDs com min_value <= field <= max_value, em ordem de (valor, ID)
+
+        - after: continua depois da chave (valor, ID) informada (cursor)
+        """
+        keys = self._keys
+        start = 0 if min_value is None else bisect_left(keys, min_value)
+        stop = len(keys) if max_value is None else bisect_right(keys, max_value)
+
+        if after is not None:
+            after_value, after_id = after
+            start = max(start, bisect_left(keys, after_value))
+
+        for key in keys[start:stop]:
+            if after is not None and key == after_value:
+                yield from self.find(key, after_id)
+            else:
+                yield from self.find(key)
+
+    def load(self, keys: List[Hashable], bounds: Sequence[int], ids: Sequence[int]) -> None:
+        super().load(keys, bounds, ids)
+        self._keys = sorted(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._keys.clear()
+
+
+class MultiIndex(HashIndex):
+    """
+    Índice para campos com vários valores (ex: tags): cada valor -> IDs
+
+    Um registro com tags ("python", "api") aparece nos dois buckets, então
+    filtrar por várias tags é uma interseção dos buckets (sem varrer tudo)
+    e a contagem por tag é o tamanho do bucket.
+
+    Similar a uma tabela de junção post_tags(tag, post_id) com índice em tag
+    """
+
+    def keys_for(self, values: Any) -> Iterable[Hashable]:
+        return values or ()
+
+    def _add(self, values: Any, record_id: int) -> None:
+        for value in values or ():
+            super()._add(value, record_id)
+
+    def _remove(self, values: Any, record_id: int) -> None:
+        for value in values or ():
+            super()._remove(value, record_id)
+
+    def matches(self, field_value: Any, value: Hashable) -> bool:
+        return value in (field_value or ())
+
+    def find_all(self, values: Iterable[Hashable], after: Optional[int] = None) -> Iterator[int]:
+        """IDs que têm todos os valores, em ordem de ID"""
+        buckets = [self._buckets.get(value) for value in set(values)]
+        if not buckets or not all(buckets):
+            return iter(())
+
+        # Percorre o menor bucket e confere os demais em O(1)
+        buckets.sort(key=len)
+        first, rest = buckets[0], buckets[1:]
+        return (
+            record_id for record_id in first.iter_from(after)
+            if all(record_id in bucket for bucket in rest)
+        )
+
+
+class UniqueIndex(HashIndex):
+    """
+    Índice único: valor -> um único ID
+
+    - add recusa (DuplicateKeyError) um valor que já pertence a outro ID,
+      checando e gravando sob o lock do índice (duas escritas simultâneas
+      com o mesmo valor não passam juntas)
+    - ignore_case: compara sem diferenciar maiúsculas (ex: emails)
+
+    Similar a: CREATE UNIQUE INDEX idx_users_email ON users(email COLLATE NOCASE)
+    """
+
+    def __init__(self, field: str, ignore_case: bool = False):
+        super().__init__(field)
+        self.ignore_case = ignore_case
+        self._ids: Dict[Hashable, int] = {}
+
+    def key(self, value: Any) -> Hashable:
+        if self.ignore_case and isinstance(value, str):
+            return value.lower()
+        return value
+
+    @property
+    def spec(self) -> Tuple[Any, ...]:
+        return (*super().spec, self.ignore_case)
+
+    def keys_for(self, value: Any) -> Iterable[Hashable]:
+        return () if value is None else (self.key(value),)
+
+    def load(self, keys: List[Hashable], bounds: Sequence[int], ids: Sequence[int]) -> None:
+        # Um ID por chave: o dict é montado direto dos IDs
+        with self._lock:
+            self._ids = dict(zip(keys, ids))
+
+    def _add(self, value: Any, record_id: int) -> None:
+        if value is None:
+            return
+
+        key = self.key(value)
+        owner = self._ids.get(key)
+        if owner is not None and owner != record_id:
+            raise DuplicateKeyError(self.field, value)
+        self._ids[key] = record_id
+
+    def _remove(self, value: Any, record_id: int) -> None:
+        key = self.key(value)
+        if self._ids.get(key) == record_id:
+            del self._ids[key]
+
+    def get(self, value: Any) -> Optional[int]:
+        """ID dono do valor (ou None), em O(1)"""
+        return self._ids.get(self.key(value))
+
+    def matches(self, field_value: Any, value: Hashable) -> bool:
+        return self.key(field_value) == self.key(value)
+
+    def count(self, value: Hashable) -> int:
+        return 1 if self.get(value) is not None else 0
+
+    def counts(self) -> Dict[Hashable, int]:
+        with self._lock:
+            return dict.fromkeys(self._ids, 1)
+
+    def find(self, value: Hashable, after: Optional[int] = None) -> Iterator[int]:
+        record_id = self.get(value)
+        if record_id is None or (after is not None and record_id <= after):
+            return iter(())
+        return iter((record_id,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
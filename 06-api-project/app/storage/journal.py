@@ -0,0 +1,496 @@
+"""
+Durabilidade para o store em memória: journal + snapshots
+Similar ao AOF + RDB do Redis: leituras na velocidade da RAM, e cada
+escrita também anotada em um arquivo append-only
+
+- cada insert/update/delete vira uma linha JSON no journal (write-ahead:
+  anotada com o lock do registro, na mesma ordem em que fica visível)
+- fsync em lote (group commit): uma chamada de fsync leva todas as
+  escritas acumuladas desde a anterior
+- de tempos em tempos, um snapshot compacto do estado inteiro substitui
+  os segmentos antigos do journal (compactação em segundo plano)
+- na subida: abre o snapshot (mmap, registros lidos sob demanda) e
+  reaplica os segmentos seguintes
+
+Arquivos em `directory`:
+    <tabela>.snapshot            estado até o início do segmento indicado
+    <tabela>.<seq>.journal       segmentos do journal, em ordem
+"""
+
+import atexit
+import gc
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
+
+from .indexes import HashIndex
+from .memory import DEFAULT_SHARDS, MemoryStore
+from .records import Record
+from .snapshot import (
+    READ_CACHE_RECORDS,
+    Snapshot,
+    SnapshotRecords,
+    fsync_dir,
+    read_snapshot,
+    write_snapshot,
+)
+
+# Modos de fsync do journal
+#   "commit": cada escrita só retorna depois do fsync (escritas concorrentes
+#             dividem o mesmo fsync)
+#   "batch":  fsync a cada `fsync_interval` segundos em segundo plano; um
+#             crash perde no máximo esse intervalo
+#   "off":    grava no arquivo sem fsync (o sistema operacional decide)
+FSYNC_MODES = ("commit", "batch", "off")
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot journal value of type {type(value).__name__}")
+
+
+class Journal:
+    """
+    Arquivo append-only de mutações, dividido em segmentos
+
+    append() só anota a linha em memória (rápido, chamado com o lock do
+    registro); sync() grava no arquivo e faz o fsync de tudo o que foi
+    anotado até ali. Enquanto uma thread faz fsync, as outras esperam e a
+    próxima leva de uma vez tudo o que se acumulou (group commit).
+
+    Um fsync que falha é definitivo (`failed`): o SO pode ter descartado as
+    páginas, e um fsync seguinte "bem-sucedido" não as traria de volta.
+    Dali em diante commit() e sync() levantam OSError; os dados voltam a
+    ser confiáveis só reiniciando (recuperação pelo que chegou ao disco).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        table: str,
+        seq: int,
+        fsync: str = "batch",
+        fsync_interval: float = 0.05
+    ):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"Unknown journal fsync mode: {fsync}")
+
+        self.directory = directory
+        self.table = table
+        self.seq = seq
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        # Bytes anotados desde o último rotate (critério da compactação)
+        self.size = 0
+        # Entradas anotadas e fsyncs feitos (group commit: fsyncs < entradas)
+        self.fsyncs = 0
+        # Erro do fsync que falhou (nada mais é confirmado como durável)
+        self.failed: Optional[OSError] = None
+
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._pending: List[bytes] = []
+        self._appended = 0
+        self._synced = 0
+        self._file = open(segment_path(directory, table, seq), "ab")
+        fsync_dir(directory)
+
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name=f"journal-{table}", daemon=True
+        )
+        self._flusher.start()
+
+    def append(self, entry: list) -> None:
+        """Anota uma mutação (ainda não durável: ver commit)"""
+        line = json.dumps(entry, separators=(",", ":"), default=_encode_value).encode() + b"\n"
+        with self._lock:
+            self._pending.append(line)
+            self._appended += 1
+            self.size += len(line)
+
+    @property
+    def entries(self) -> int:
+        return self._appended
+
+    def commit(self) -> None:
+        """No modo "commit", espera as escritas desta thread ficarem duráveis"""
+        if self.fsync == "commit":
+            self.sync()
+        elif self.failed is not None:
+            # Modo "batch": o fsync que falhou foi o da thread de fundo
+            self._raise_failed()
+
+    def sync(self) -> None:
+        """Grava no arquivo (e faz fsync de) tudo o que foi anotado até agora"""
+        with self._lock:
+            target = self._appended
+
+        with self._io_lock:
+            if self.failed is not None:
+                self._raise_failed()
+            # Outra thread já levou estas entradas no fsync dela
+            if self._synced >= target:
+                return
+            self._write_pending(durable=self.fsync != "off")
+
+    def _raise_failed(self) -> None:
+        message = f"Journal '{self.table}' is no longer durable: a previous fsync failed"
+        raise OSError(message) from self.failed
+
+    def _write_pending(self, durable: bool) -> None:
+        """Chamado com _io_lock"""
+        with self._lock:
+            lines, self._pending = self._pending, []
+            upto = self._appended
+
+        if lines:
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            if durable:
+                try:
+                    os.fsync(self._file.fileno())
+                except OSError as error:
+                    # _synced não avança: quem esperava estas entradas também falha
+                    self.failed = error
+                    raise
+                self.fsyncs += 1
+        self._synced = upto
+
+    def rotate(self) -> int:
+        """
+        Fecha o segmento atual (durável) e abre o próximo
+
+        Devolve o número do segmento novo: o snapshot tirado neste ponto
+        cobre todos os anteriores.
+        """
+        with self._io_lock:
+            if self.failed is not None:
+                self._raise_failed()
+            self._write_pending(durable=True)
+            self._file.close()
+            self.seq += 1
+            self._file = open(segment_path(self.directory, self.table, self.seq), "ab")
+            fsync_dir(self.directory)
+            self.size = 0
+        return self.seq
+
+    def remove_segments(self, before: int) -> None:
+        """Apaga os segmentos já cobertos por um snapshot"""
+        for seq in list_segments(self.directory, self.table):
+            if seq < before:
+                os.remove(segment_path(self.directory, self.table, seq))
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        with self._io_lock:
+            # Depois de um fsync que falhou, grava o resto sem tentar de novo
+            self._write_pending(durable=self.failed is None)
+            self._file.close()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.fsync_interval):
+            self.sync()
+
+
+def segment_path(directory: str, table: str, seq: int) -> str:
+    return os.path.join(directory, f"{table}.{seq:08d}.journal")
+
+
+def list_segments(directory: str, table: str) -> List[int]:
+    """Números dos segmentos existentes da tabela, em ordem"""
+    pattern = re.compile(rf"{re.escape(table)}\.(\d+)\.journal$")
+    matches = (pattern.match(name) for name in os.listdir(directory))
+    return sorted(int(match.group(1)) for match in matches if match)
+
+
+def read_segment(path: str) -> Iterator[list]:
+    """
+    Entradas de um segmento, em ordem
+
+    Para na primeira linha incompleta ou inválida: é a escrita que um
+    crash interrompeu (nada depois dela chegou a ser confirmado).
+    """
+    with open(path, "rb") as file:
+        for line in file:
+            if not line.endswith(b"\n"):
+                return
+            try:
+                yield json.loads(line)
+            except ValueError:
+                return
+
+
+class JournaledStore(MemoryStore):
+    """
+    MemoryStore que sobrevive a reinícios (journal + snapshots)
+
+    - mesma interface e mesma velocidade de leitura do MemoryStore
+    - escritas anotadas no journal; fsync conforme `fsync` (ver FSYNC_MODES)
+    - snapshot automático quando o journal passa de `snapshot_bytes`
+      (em uma thread de fundo), ou manual com snapshot()
+    - recuperação na criação: snapshot + segmentos seguintes; tempos e
+      contagens ficam em `recovery`
+
+    Os registros ficam em um SnapshotRecords: os do snapshot são
+    decodificados sob demanda (os mais lidos, até `read_cache`, ficam em um
+    LRU) e as escritas ficam em um dict por cima. O snapshot novo é
+    consistente: as escritas param só enquanto esse dict é copiado (os
+    registros são imutáveis), e a gravação do arquivo acontece com as
+    escritas liberadas.
+
+    Em Node.js seria algo como um Map com um WriteStream de log ao lado.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        table: str,
+        record_type: Type[Record],
+        indexes: Iterable[HashIndex] = (),
+        fsync: str = "batch",
+        fsync_interval: float = 0.05,
+        snapshot_bytes: int = 64 * 1024 * 1024,
+        shards: int = DEFAULT_SHARDS,
+        read_cache: int = READ_CACHE_RECORDS
+    ):
+        super().__init__(record_type, indexes=indexes, shards=shards)
+        self.directory = directory
+        self.table = table
+        self.snapshot_bytes = snapshot_bytes
+        self.read_cache = read_cache
+        # Com fsync a cada commit a escrita espera o disco: rotas async usam o threadpool
+        self.blocking = fsync == "commit"
+
+        self._dates = {name for name, kind in record_type.columns.items() if kind is datetime}
+        self._journal: Optional[Journal] = None
+        self._snapshot_lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self.recovery = self._recover()
+
+        segments = list_segments(directory, table)
+        seq = max(segments[-1] + 1 if segments else 0, self.recovery["segment"])
+        self._journal = Journal(directory, table, seq, fsync=fsync, fsync_interval=fsync_interval)
+
+        self._closed = threading.Event()
+        self._compactor = threading.Thread(
+            target=self._compact_loop, name=f"compactor-{table}", daemon=True
+        )
+        self._compactor.start()
+        atexit.register(self.close)
+
+    def peek(self, record_id: int) -> Optional[Record]:
+        """Decodifica direto do snapshot, sem passar pelo cache de leitura"""
+        return self._records.get(record_id, cache=False)
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, f"{self.table}.snapshot")
+
+    # ------------------------------------------------------------------
+    # Escritas: anotadas no journal com o lock do registro
+    # ------------------------------------------------------------------
+
+    def _on_insert(self, record: Record) -> None:
+        if self._journal is not None:
+            fields = {name: getattr(record, name) for name in record.columns}
+            self._journal.append(["i", record.id, fields])
+
+    def _on_update(self, record_id: int, changes: dict) -> None:
+        if self._journal is not None:
+            self._journal.append(["u", record_id, changes])
+
+    def _on_delete(self, record_id: int) -> None:
+        if self._journal is not None:
+            self._journal.append(["d", record_id])
+
+    def insert(self, data: dict) -> Record:
+        record = super().insert(data)
+        self._journal.commit()
+        return record
+
+    def update(self, record_id: int, changes: dict) -> Optional[Record]:
+        record = super().update(record_id, changes)
+        self._journal.commit()
+        return record
+
+    def delete(self, record_id: int) -> bool:
+        deleted = super().delete(record_id)
+        self._journal.commit()
+        return deleted
+
+    def insert_many(self, items):
+        records = super().insert_many(items)
+        self._journal.commit()
+        return records
+
+    def update_many(self, changes):
+        records = super().update_many(changes)
+        self._journal.commit()
+        return records
+
+    def delete_many(self, record_ids):
+        results = super().delete_many(record_ids)
+        self._journal.commit()
+        return results
+
+    def clear(self) -> None:
+        with self._write_barrier():
+            super().clear()
+            if self._journal is not None:
+                self._journal.append(["c"])
+        if self._journal is not None:
+            self._journal.commit()
+
+    @contextmanager
+    def _write_barrier(self) -> Iterator[None]:
+        """Trava todos os shards: nenhuma escrita acontece (nem é anotada) dentro"""
+        for lock in self._shards:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._shards):
+                lock.release()
+
+    # ------------------------------------------------------------------
+    # Snapshots e compactação
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> None:
+        """
+        Grava o estado atual e apaga os segmentos que ele substitui
+
+        Dentro da barreira só se copiam as escritas feitas desde o snapshot
+        aberto na subida e se troca de segmento; serializar e gravar
+        (registros e índices) acontece com as escritas liberadas.
+        """
+        with self._snapshot_lock:
+            # Adianta o fsync pendente: dentro da barreira sobra pouco a gravar
+            self._journal.sync()
+            with self._write_barrier():
+                rows = self._records.freeze()
+                next_id = self._next_id
+                seq = self._journal.rotate()
+
+            header = {
+                "table": self.table,
+                "columns": list(self.record_type.columns),
+                "next_id": next_id,
+                "segment": seq,
+            }
+            write_snapshot(self.snapshot_path, header, rows, self.indexes.values())
+            self._journal.remove_segments(before=seq)
+
+    def _compact_loop(self) -> None:
+        while not self._closed.wait(1.0):
+            if self._journal.size >= self.snapshot_bytes:
+                self.snapshot()
+
+    def close(self) -> None:
+        """Para a compactação e grava o que faltar do journal (chamado no exit)"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._compactor.join()
+        self._journal.close()
+
+    # ------------------------------------------------------------------
+    # Recuperação
+    # ------------------------------------------------------------------
+
+    def _recover(self) -> Dict[str, Any]:
+        """
+        Abre o snapshot e reaplica o journal (sem anotar nada de novo)
+
+        O snapshot não é carregado: registros e índices são lidos dele sob
+        demanda (mmap), então o tempo de subida depende do journal, não do
+        tamanho da tabela.
+        """
+        start = time.perf_counter()
+        stats = {"snapshot_records": 0, "journal_entries": 0, "segment": 0}
+        next_id = 1
+
+        snapshot = read_snapshot(self.snapshot_path)
+        self._records = SnapshotRecords(snapshot, self.record_type, cache_size=self.read_cache)
+        if snapshot is not None:
+            stats["segment"] = snapshot.meta["segment"]
+            next_id = snapshot.meta["next_id"]
+            stats["snapshot_records"] = len(snapshot)
+            self._load_indexes(snapshot)
+        snapshot_seconds = time.perf_counter() - start
+
+        # Milhões de objetos novos e nenhum lixo: o GC só varreria à toa
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for seq in list_segments(self.directory, self.table):
+                if seq < stats["segment"]:
+                    continue
+                for entry in read_segment(segment_path(self.directory, self.table, seq)):
+                    self._replay(entry)
+                    stats["journal_entries"] += 1
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        # Ordem por ID para os cursores; IDs nunca são reaproveitados
+        self._order = self._records.sorted_ids()
+        self._next_id = max(next_id, self._order[-1] + 1 if self._order else 1, self._next_id)
+
+        stats["snapshot_seconds"] = snapshot_seconds
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+    def _load_indexes(self, snapshot: Snapshot) -> None:
+        """Índices prontos do snapshot; os que mudaram desde ele são refeitos"""
+        stale = []
+        for field, index in self.indexes.items():
+            stored = snapshot.index(field)
+            if stored is not None and stored[0] == index.spec:
+                index.load(*stored[1:])
+            else:
+                stale.append(index)
+
+        # Índice novo (ou de outro tipo): lê todos os registros uma vez, sem
+        # guardá-los (cache=False)
+        if stale:
+            for record_id in snapshot.ids:
+                record = self._records.get(record_id, cache=False)
+                for index in stale:
+                    index.add(getattr(record, index.field), record_id)
+
+    def _decode(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        for name in self._dates:
+            value = fields.get(name)
+            if value is not None:
+                fields[name] = datetime.fromisoformat(value)
+        return fields
+
+    def _replay(self, entry: list) -> None:
+        """Reaplica uma entrada do journal (inserts valem como "upsert")"""
+        op = entry[0]
+
+        if op == "i":
+            record_id, fields = entry[1], self._decode(entry[2])
+            record = self.record_type(id=record_id, **fields)
+            old = self._records.get(record_id)
+            self._reindex(record_id, old, record)
+            self._records[record_id] = record
+            self._next_id = max(self._next_id, record_id + 1)
+        elif op == "u":
+            self._update(entry[1], self._decode(entry[2]))
+        elif op == "d":
+            self._delete(entry[1])
+        elif op == "c":
+            super().clear()
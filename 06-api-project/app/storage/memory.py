@@ -0,0 +1,352 @@
+"""
+Store em memória indexado por ID
+Similar a usar um Map (new Map()) em vez de um array de objetos no JavaScript
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type, Union
+
+from .indexes import DuplicateKeyError, HashIndex, MultiIndex, SortedIndex, UniqueIndex
+from .records import Record
+
+# Número padrão de locks para as escritas por registro
+DEFAULT_SHARDS = 64
+
+
+class MemoryStore:
+    """
+    Tabela em memória com chave primária `id`
+
+    - get, update e delete em O(1) (dict indexado por id)
+    - listagem na ordem de inserção (dicts do Python preservam a ordem)
+    - paginação por cursor: `after=<id>` posiciona a leitura em O(log n)
+    - índices secundários opcionais, atualizados em insert/update/delete
+    - índices únicos (UniqueIndex) recusam valores repetidos com
+      DuplicateKeyError, sem deixar a escrita pela metade
+    - version(): contador que muda a cada escrita (ETag das listagens),
+      nunca repetido entre reinícios do processo
+    - registros compactos (`record_type`, com __slots__) em vez de dicts
+
+    Seguro para várias threads (as rotas `def` rodam no threadpool):
+    - IDs alocados atomicamente junto com a ordem de inserção
+    - update/delete travam só o "shard" do ID (id % shards), não o store
+    - cada índice tem o seu próprio lock
+    - leituras não travam: um update troca o registro inteiro
+      (copy-on-write), então nunca se lê um registro pela metade
+
+    Em JavaScript seria algo como:
+    const users = new Map();  // users.get(id), users.delete(id)
+    """
+
+    # Operações só em memória: as rotas async podem chamá-las no event loop
+    blocking = False
+
+    def __init__(
+        self,
+        record_type: Type[Record],
+        indexes: Iterable[HashIndex] = (),
+        shards: int = DEFAULT_SHARDS
+    ):
+        self.record_type = record_type
+        self._records: Dict[int, Record] = {}
+        self._next_id = 1
+        # IDs em ordem crescente para posicionar cursores (remoção preguiçosa)
+        self._order: List[int] = []
+        self._order_lock = threading.Lock()
+        # IDs já alocados cujo insert ainda não terminou (a compactação da ordem os mantém)
+        self._inflight: Set[int] = set()
+        self._shards = [threading.Lock() for _ in range(shards)]
+        self.indexes: Dict[str, HashIndex] = {index.field: index for index in indexes}
+        # Começa no instante da criação (ns): cada boot usa uma faixa nova
+        self._version = time.time_ns()
+        self._version_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, record_id: int) -> bool:
+        return record_id in self._records
+
+    def __iter__(self) -> Iterator[Record]:
+        return self.scan()
+
+    def _lock_for(self, record_id: int) -> threading.Lock:
+        return self._shards[record_id % len(self._shards)]
+
+    def _allocate_ids(self, n: int) -> List[int]:
+        """Reserva n IDs e os registra na ordem em uma única seção crítica"""
+        with self._order_lock:
+            ids = list(range(self._next_id, self._next_id + n))
+            self._next_id += n
+            self._order.extend(ids)
+            self._inflight.update(ids)
+        return ids
+
+    def version(self) -> int:
+        """
+        Versão da coleção: muda a cada insert/update/delete
+
+        Incrementada depois que a escrita fica visível: quem lê a versão
+        antes dos dados nunca associa uma versão nova a dados antigos.
+
+        O contador não é persistido (nem no journal, que pode perder as
+        últimas escritas com fsync "batch"/"off"): ele parte do relógio
+        na criação do store. Cada escrita leva bem mais que 1 ns, então as
+        versões de um boot ficam abaixo do início do seguinte e um ETag
+        de antes do reinício nunca volta com outros dados.
+        """
+        return self._version
+
+    def _bump(self) -> None:
+        with self._version_lock:
+            self._version += 1
+
+    def get(self, record_id: int) -> Optional[Record]:
+        """Busca registro por ID"""
+        return self._records.get(record_id)
+
+    def peek(self, record_id: int) -> Optional[Record]:
+        """
+        Como get(), para varreduras longas (ex: montar a busca)
+
+        Aqui é o próprio get(); stores com cache de leitura o sobrescrevem
+        para não encher o cache com registros lidos uma única vez.
+        """
+        return self._records.get(record_id)
+
+    def insert(self, data: dict) -> Record:
+        """Insere registro e atribui o próximo ID"""
+        return self._insert(self._allocate_ids(1)[0], data)
+
+    def _insert(self, record_id: int, data: dict) -> Record:
+        try:
+            record = self.record_type(id=record_id, **data)
+
+            # O lock do shard impede um update/delete antes de indexar o registro
+            with self._lock_for(record_id):
+                self._reindex(record_id, None, record)
+                self._records[record_id] = record
+                self._on_insert(record)
+        finally:
+            self._inflight.discard(record_id)
+
+        self._bump()
+        return record
+
+    def update(self, record_id: int, changes: dict) -> Optional[Record]:
+        """Atualiza campos do registro (o ID nunca muda)"""
+        return self._update(record_id, changes)
+
+    def _update(self, record_id: int, changes: dict) -> Optional[Record]:
+        with self._lock_for(record_id):
+            old = self._records.get(record_id)
+
+            if old is None:
+                return None
+
+            record = old.replace(changes)
+            self._reindex(record_id, old, record)
+            self._records[record_id] = record
+            self._on_update(record_id, changes)
+
+        self._bump()
+        return record
+
+    def delete(self, record_id: int) -> bool:
+        """Remove registro por ID"""
+        return self._delete(record_id)
+
+    def _delete(self, record_id: int) -> bool:
+        with self._lock_for(record_id):
+            record = self._records.pop(record_id, None)
+
+            if record is None:
+                return False
+
+            self._reindex(record_id, record, None)
+            self._on_delete(record_id)
+
+        self._bump()
+
+        # Compactar a ordem quando metade dela já foi removida (O(1) amortizado)
+        if len(self._order) > 2 * len(self._records) + 32:
+            with self._order_lock:
+                records, inflight = self._records, self._inflight
+                self._order = [i for i in self._order if i in records or i in inflight]
+
+        return True
+
+    # Ganchos chamados com o lock do registro, logo após cada escrita bem
+    # sucedida (na mesma ordem em que as escritas ficam visíveis). O
+    # JournaledStore os usa para gravar o journal.
+    def _on_insert(self, record: Record) -> None:
+        pass
+
+    def _on_update(self, record_id: int, changes: dict) -> None:
+        pass
+
+    def _on_delete(self, record_id: int) -> None:
+        pass
+
+    def _reindex(self, record_id: int, old: Optional[Record], new: Optional[Record]) -> None:
+        """
+        Atualiza os índices de `old` para `new` (None: registro inexistente)
+
+        Os valores novos dos índices únicos são reservados antes de tudo:
+        um valor repetido cancela a escrita sem ter alterado nenhum índice.
+        """
+        changes = []
+        for field, index in self.indexes.items():
+            old_value = None if old is None else getattr(old, field)
+            value = None if new is None else getattr(new, field)
+            # Reindexar apenas os campos indexados que mudaram
+            if old is None or new is None or index.key(old_value) != index.key(value):
+                changes.append((index, old_value, value))
+
+        claimed = []
+        if new is not None:
+            try:
+                for index, _, value in changes:
+                    if isinstance(index, UniqueIndex):
+                        index.add(value, record_id)
+                        claimed.append((index, value))
+            except DuplicateKeyError:
+                for index, value in claimed:
+                    index.remove(value, record_id)
+                raise
+
+        for index, old_value, value in changes:
+            if old is not None:
+                index.remove(old_value, record_id)
+            if new is not None and not isinstance(index, UniqueIndex):
+                index.add(value, record_id)
+
+    def insert_many(self, items: Iterable[dict]) -> List[Union[Record, DuplicateKeyError]]:
+        """
+        Insere vários registros em uma única operação
+
+        Itens que violam um índice único recebem o DuplicateKeyError no
+        lugar do registro (os demais são inseridos normalmente).
+        """
+        items = list(items)
+        ids = self._allocate_ids(len(items))
+        return [self._try(self._insert, record_id, data) for record_id, data in zip(ids, items)]
+
+    def update_many(
+        self, changes: Dict[int, dict]
+    ) -> Dict[int, Union[Record, DuplicateKeyError, None]]:
+        """
+        Atualiza vários registros (id -> campos); None para IDs inexistentes
+        e DuplicateKeyError para os que violam um índice único
+        """
+        return {
+            record_id: self._try(self._update, record_id, data)
+            for record_id, data in changes.items()
+        }
+
+    @staticmethod
+    def _try(write, record_id: int, data: dict):
+        try:
+            return write(record_id, data)
+        except DuplicateKeyError as error:
+            return error
+
+    def delete_many(self, record_ids: Iterable[int]) -> List[bool]:
+        """Remove vários registros; False para IDs inexistentes (mesma ordem)"""
+        return [self._delete(record_id) for record_id in record_ids]
+
+    def scan(self, skip: int = 0, after: Optional[int] = None) -> Iterator[Record]:
+        """
+        Percorre os registros em ordem de ID, sem copiar a lista
+
+        - after: continua a partir do primeiro ID maior que `after` (cursor)
+        """
+        return islice(self._iter_after(after or 0), skip, None)
+
+    def ids(self) -> Iterator[int]:
+        """IDs em ordem, sem ler os registros"""
+        order, records = self._order, self._records
+        return (record_id for record_id in order if record_id in records)
+
+    def _iter_after(self, after: int) -> Iterator[Record]:
+        # Percorre a lista de IDs (e não o dict), que pode crescer durante a
+        # iteração sem erro; a compactação troca a lista e seguimos na antiga
+        order, records = self._order, self._records
+
+        for pos in range(bisect_right(order, after), len(order)):
+            record = records.get(order[pos])
+            if record is not None:
+                yield record
+
+    def find(self, field: str, value: Any, after: Optional[int] = None) -> Iterator[Record]:
+        """Registros com field == value, lidos direto do índice (em ordem de ID)"""
+        index = self.indexes[field]
+
+        # Confere o valor: um update concorrente pode estar no meio da reindexação
+        return (
+            record for record in self._fetch(index.find(value, after))
+            if index.matches(getattr(record, field), value)
+        )
+
+    def find_all(
+        self, field: str, values: Iterable[Any], after: Optional[int] = None
+    ) -> Iterator[Record]:
+        """Registros cujo campo multivalorado (ex: tags) contém todos os valores"""
+        index = self.indexes[field]
+
+        if not isinstance(index, MultiIndex):
+            raise TypeError(f"Field '{field}' has no multi-value index")
+
+        values = list(values)
+        return (
+            record for record in self._fetch(index.find_all(values, after))
+            if all(index.matches(getattr(record, field), value) for value in values)
+        )
+
+    def counts(self, field: str) -> Dict[Any, int]:
+        """Quantidade de registros por valor do campo, lida direto do índice"""
+        return self.indexes[field].counts()
+
+    def range(
+        self,
+        field: str,
+        min_value: Any = None,
+        max_value: Any = None,
+        after: Optional[Tuple[Any, int]] = None
+    ) -> Iterator[Record]:
+        """
+        Registros com min_value <= field <= max_value, em ordem de (field, id)
+
+        - after: cursor (valor, id) do último registro da página anterior
+        """
+        index = self.indexes[field]
+
+        if not isinstance(index, SortedIndex):
+            raise TypeError(f"Field '{field}' has no sorted index")
+
+        return self._fetch(index.range(min_value, max_value, after))
+
+    def _fetch(self, ids: Iterable[int]) -> Iterator[Record]:
+        """IDs vindos de um índice -> registros (ignora os já removidos)"""
+        records = self._records
+
+        for record_id in ids:
+            record = records.get(record_id)
+            if record is not None:
+                yield record
+
+    def clear(self) -> None:
+        """Remove todos os registros (útil em testes e benchmarks)"""
+        with self._order_lock:
+            self._records.clear()
+            self._order = []
+            self._inflight.clear()
+            self._next_id = 1
+
+            for index in self.indexes.values():
+                index.clear()
+
+        self._bump()
@@ -0,0 +1,98 @@
+"""
+Registros compactos para os stores
+Similar a usar uma classe com campos fixos em vez de objetos literais no JavaScript
+
+Um dict por registro repete as chaves, tem tabela hash própria e guarda
+uma lista (mutável, com folga) para as tags. Com `__slots__` cada registro
+vira um objeto de tamanho fixo, e valores repetidos (tags, role) são
+internados: todos os posts com a tag "python" apontam para a mesma string.
+
+Os registros só viram modelos Pydantic na borda da API (from_attributes).
+"""
+
+import sys
+from typing import Any, ClassVar, Dict, FrozenSet, Sequence, Tuple
+
+
+class Record:
+    """
+    Base dos registros: subclasses definem `columns` e `__slots__`
+
+    class PostRecord(Record):
+        columns = {"title": str, "tags": list}
+        __slots__ = tuple(columns)
+    """
+
+    __slots__ = ("id",)
+
+    # Campo -> tipo Python (sem o id); usado também pelo SqliteStore
+    columns: ClassVar[Dict[str, type]] = {}
+    # Campos de texto com poucos valores distintos (ex: role), internados
+    interned: ClassVar[Tuple[str, ...]] = ()
+    # Campos que precisam de conversão ao gravar (calculado por subclasse)
+    _packed: ClassVar[FrozenSet[str]] = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls._packed = frozenset(
+            name for name, kind in cls.columns.items()
+            if kind is list or name in cls.interned
+        )
+
+    def __init__(self, id: int, **fields: Any):
+        self.id = id
+        packed = self._packed
+        for name in self.columns:
+            value = fields.get(name)
+            setattr(self, name, self._pack(value) if name in packed else value)
+
+    @staticmethod
+    def _pack(value: Any) -> Any:
+        """Listas viram tuplas de strings internadas; textos são internados"""
+        if isinstance(value, (list, tuple)):
+            return tuple(sys.intern(v) if type(v) is str else v for v in value)
+        if type(value) is str:
+            return sys.intern(value)
+        return value
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "Record":
+        """(id, *colunas na ordem de `columns`) -> registro (ex: lido de um snapshot)"""
+        record = object.__new__(cls)
+        record.id = row[0]
+        packed = cls._packed
+
+        for name, value in zip(cls.columns, row[1:]):
+            setattr(record, name, cls._pack(value) if name in packed else value)
+
+        return record
+
+    def to_row(self) -> Tuple[Any, ...]:
+        """Registro -> (id, *colunas), o inverso de from_row"""
+        return (self.id, *(getattr(self, name) for name in self.columns))
+
+    def replace(self, changes: Dict[str, Any]) -> "Record":
+        """Cópia com os campos alterados (o original não muda: copy-on-write)"""
+        record = object.__new__(type(self))
+        record.id = self.id
+        packed = self._packed
+
+        for name in self.columns:
+            if name in changes:
+                value = changes[name]
+                setattr(record, name, self._pack(value) if name in packed else value)
+            else:
+                setattr(record, name, getattr(self, name))
+
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Registro -> dict (id + colunas)"""
+        return {"id": self.id, **{name: getattr(self, name) for name in self.columns}}
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and other.to_dict() == self.to_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.to_dict().items())
+        return f"{type(self).__name__}({fields})"
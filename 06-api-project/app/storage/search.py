@@ -0,0 +1,355 @@
+"""
+Índice invertido para busca textual
+Similar a um mini Elasticsearch/Lunr.js: termo -> documentos que o contêm
+
+Em vez de procurar a substring em todos os registros (O(n) por busca),
+cada registro é quebrado em termos uma única vez, na escrita. A busca só
+visita os documentos das listas dos termos pesquisados.
+"""
+
+import heapq
+import math
+import re
+import sys
+import threading
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .indexes import SortedIds
+
+# Palavras muito comuns não ajudam a ranquear e inflam as listas
+STOPWORDS = frozenset("""
+    a o e de da do das dos em no na nos nas um uma uns umas para por com
+    que se ao aos as os ou mais mas como the an and or of to in on for is
+    it with at by be this that from
+""".split())
+
+# Saturação da frequência do termo (BM25): repetir um termo rende cada vez menos
+K1 = 1.2
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Registros reindexados por vez na montagem em segundo plano (o lock é
+# liberado entre os blocos para as escritas passarem)
+BACKGROUND_BATCH = 1000
+
+
+class IndexNotReady(Exception):
+    """Busca enquanto o índice ainda está sendo montado em segundo plano"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Texto -> termos (minúsculos, sem acento, sem stopwords)"""
+    folded = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode()
+    return [
+        term for term in _WORD.findall(folded)
+        if len(term) > 1 and term not in STOPWORDS
+    ]
+
+
+class SearchIndex:
+    """
+    Índice invertido com ranqueamento BM25 (sem normalização por tamanho)
+
+    - fields: campo -> peso (ex: título vale mais que o conteúdo)
+    - cada termo guarda os IDs agrupados por peso ("faixas"), do maior para
+      o menor: os melhores resultados estão nas primeiras faixas e a busca
+      para assim que nenhum documento não lido pode superar os já achados
+    - AND: candidatos vêm só do termo mais raro
+    - OR: candidatos vêm de todos os termos
+    - pontuação inteira (BM25 x 1000): ordem (pontos desc, id) estável para cursores
+
+    Escritas e buscas usam o lock do índice. Com rebuild_in_background a
+    API sobe antes do índice ficar pronto; até lá search() levanta
+    IndexNotReady.
+
+    Similar a:
+    CREATE VIRTUAL TABLE posts_fts USING fts5(title, content, tags)
+    """
+
+    def __init__(self, fields: Dict[str, int]):
+        self.fields = fields
+        # termo -> peso -> IDs (em ordem de ID)
+        self._tiers: Dict[str, Dict[int, SortedIds]] = {}
+        # termo -> número de documentos
+        self._counts: Dict[str, int] = {}
+        # id -> {termo: peso} do documento: peso de um termo em O(1) na
+        # pontuação e remoção sem precisar do registro antigo
+        self._docs: Dict[int, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._ready.set()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, record_id: int) -> bool:
+        return record_id in self._docs
+
+    def add(self, record: Any) -> None:
+        """Indexa (ou reindexa) um registro"""
+        with self._lock:
+            self._remove(record.id)
+            self._add(record)
+
+    def remove(self, record_id: int) -> None:
+        with self._lock:
+            self._remove(record_id)
+
+    def refresh(self, record_id: int, load: Callable[[int], Optional[Any]]) -> None:
+        """
+        Reindexa o registro lendo o estado atual com `load` (ex: store.get)
+
+        A leitura acontece com o lock do índice: se dois updates do mesmo
+        registro correrem juntos, o último refresh sempre vê a versão final.
+        """
+        with self._lock:
+            self._remove(record_id)
+            record = load(record_id)
+            if record is not None:
+                self._add(record)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def rebuild(self, records: Iterable[Any]) -> None:
+        """Reconstrói o índice do zero (ex: na subida, com o SQLite já populado)"""
+        with self._lock:
+            self._clear()
+            for record in records:
+                self._add(record)
+        self._ready.set()
+
+    def rebuild_in_background(
+        self, ids: Iterable[int], load: Callable[[int], Optional[Any]]
+    ) -> threading.Thread:
+        """
+        Indexa os IDs em uma thread, em blocos, sem parar as escritas
+
+        Cada registro é relido com `load` sob o lock (como em refresh):
+        uma escrita concorrente nunca é desfeita por uma leitura antiga.
+        """
+        self._ready.clear()
+
+        def run() -> None:
+            batch: List[int] = []
+            for record_id in ids:
+                batch.append(record_id)
+                if len(batch) == BACKGROUND_BATCH:
+                    self._refresh_batch(batch, load)
+                    batch = []
+            self._refresh_batch(batch, load)
+            self._ready.set()
+
+        thread = threading.Thread(target=run, name="search-index", daemon=True)
+        thread.start()
+        return thread
+
+    def _refresh_batch(self, ids: List[int], load: Callable[[int], Optional[Any]]) -> None:
+        with self._lock:
+            for record_id in ids:
+                self._remove(record_id)
+                record = load(record_id)
+                if record is not None:
+                    self._add(record)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._tiers.clear()
+        self._counts.clear()
+        self._docs.clear()
+
+    def _add(self, record: Any) -> None:
+        weights: Dict[str, int] = {}
+
+        for field, weight in self.fields.items():
+            value = getattr(record, field)
+            if not value:
+                continue
+            text = value if isinstance(value, str) else " ".join(value)
+            for term in tokenize(text):
+                weights[term] = weights.get(term, 0) + weight
+
+        # Termos internados: os documentos não duplicam strings
+        doc = {sys.intern(term): weight for term, weight in weights.items()}
+
+        for term, weight in doc.items():
+            tiers = self._tiers.get(term)
+            if tiers is None:
+                tiers = self._tiers[term] = {}
+            ids = tiers.get(weight)
+            if ids is None:
+                ids = tiers[weight] = SortedIds()
+            ids.add(record.id)
+            self._counts[term] = self._counts.get(term, 0) + 1
+
+        self._docs[record.id] = doc
+
+    def _remove(self, record_id: int) -> None:
+        doc = self._docs.pop(record_id, None)
+        if doc is None:
+            return
+
+        for term, weight in doc.items():
+            tiers = self._tiers[term]
+            ids = tiers[weight]
+            ids.discard(record_id)
+            if not ids:
+                del tiers[weight]
+            if not tiers:
+                del self._tiers[term]
+                del self._counts[term]
+            else:
+                self._counts[term] -= 1
+
+    def search(
+        self,
+        query: str,
+        operator: str = "and",
+        limit: int = 10,
+        after: Optional[Tuple[int, int]] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Melhores resultados como (pontos, id), do mais relevante ao menos
+
+        - operator: "and" (todos os termos) ou "or" (qualquer termo)
+        - after: cursor (pontos, id) do último resultado da página anterior
+        """
+        if operator not in ("and", "or"):
+            raise ValueError(f"Unknown operator: {operator}")
+        if not self._ready.is_set():
+            raise IndexNotReady("Search index is still being built")
+
+        terms = [sys.intern(term) for term in dict.fromkeys(tokenize(query))]
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            if operator == "and" and not all(term in self._tiers for term in terms):
+                return []
+
+            terms = [term for term in terms if term in self._tiers]
+            if not terms:
+                return []
+
+            if len(terms) == 1:
+                return self._search_term(terms[0], limit, after)
+            return self._search_terms(terms, operator == "and", limit, after)
+
+    def _idf(self, term: str) -> float:
+        """IDF do BM25: termos raros valem mais"""
+        total, count = len(self._docs), self._counts[term]
+        return math.log(1 + (total - count + 0.5) / (count + 0.5))
+
+    @staticmethod
+    def _saturate(weight: int) -> float:
+        return weight * (K1 + 1) / (weight + K1)
+
+    def _search_term(
+        self, term: str, limit: int, after: Optional[Tuple[int, int]]
+    ) -> List[Tuple[int, int]]:
+        """
+        Um termo: todos os documentos de uma faixa têm a mesma pontuação,
+        então basta ler as faixas em ordem e parar em `limit` IDs
+        """
+        idf = self._idf(term)
+        results: List[Tuple[int, int]] = []
+
+        # Pesos próximos podem arredondar para a mesma pontuação: faixas com
+        # pontuação igual são lidas juntas, em ordem de ID
+        groups: Dict[int, List[SortedIds]] = {}
+        for weight, ids in sorted(self._tiers[term].items(), reverse=True):
+            groups.setdefault(int(idf * self._saturate(weight) * 1000), []).append(ids)
+
+        for score, group in groups.items():
+            if after is not None and score > after[0]:
+                continue
+            start = after[1] if after is not None and score == after[0] else None
+
+            for record_id in heapq.merge(*(ids.iter_from(start) for ids in group)):
+                results.append((score, record_id))
+                if len(results) == limit:
+                    return results
+
+        return results
+
+    def _search_terms(
+        self,
+        terms: List[str],
+        require_all: bool,
+        limit: int,
+        after: Optional[Tuple[int, int]]
+    ) -> List[Tuple[int, int]]:
+        """
+        Vários termos: lê as faixas da mais promissora para a menos e para
+        quando o pior dos `limit` melhores já supera o teto dos não lidos
+        (threshold algorithm de Fagin)
+        """
+        idfs = {term: self._idf(term) for term in terms}
+        tiers = {
+            term: sorted(self._tiers[term].items(), reverse=True)
+            for term in terms
+        }
+
+        # AND: todo resultado contém o termo mais raro, então só ele gera candidatos
+        if require_all:
+            sources = [min(terms, key=self._counts.__getitem__)]
+        else:
+            sources = terms
+        # Termos que não geram candidatos contribuem no máximo com a 1ª faixa
+        fixed = sum(
+            idfs[term] * self._saturate(tiers[term][0][0])
+            for term in terms if term not in sources
+        )
+
+        position = {term: 0 for term in sources}
+        cursor = None if after is None else (after[0], -after[1])
+        # Heap dos melhores como (pontos, -id): o pior fica no topo
+        best: List[Tuple[int, int]] = []
+        seen = set()
+        docs = self._docs
+
+        while True:
+            bounds = {
+                term: idfs[term] * self._saturate(tiers[term][position[term]][0])
+                for term in sources if position[term] < len(tiers[term])
+            }
+            if not bounds or (require_all and len(bounds) < len(sources)):
+                break
+
+            threshold = (fixed + sum(bounds.values())) * 1000
+            if len(best) == limit and best[0][0] > threshold:
+                break
+
+            term = max(bounds, key=bounds.__getitem__)
+            _, ids = tiers[term][position[term]]
+            position[term] += 1
+
+            for record_id in ids:
+                if record_id in seen:
+                    continue
+                seen.add(record_id)
+
+                doc = docs[record_id]
+                score = 0.0
+                for query_term in terms:
+                    weight = doc.get(query_term)
+                    if weight is None:
+                        if require_all:
+                            break
+                        continue
+                    score += idfs[query_term] * self._saturate(weight)
+                else:
+                    key = (int(score * 1000), -record_id)
+                    if cursor is not None and key >= cursor:
+                        continue
+                    if len(best) < limit:
+                        heapq.heappush(best, key)
+                    elif key > best[0]:
+                        heapq.heapreplace(best, key)
+
+        return [(score, -neg_id) for score, neg_id in sorted(best, reverse=True)]
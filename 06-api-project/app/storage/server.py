@@ -0,0 +1,229 @@
+"""
+Processo do store compartilhado entre os workers (backend "shared")
+Similar a um Redis local: os dados ficam aqui, os workers são clientes
+
+Execute (a partir de 06-api-project/):
+    python -m app.storage.server
+    python -m app.storage.server --socket ./data/store.sock
+
+Os stores por dentro são os de sempre (Settings.SHARED_STORE_BACKEND:
+memory, journal ou sqlite), criados pelos próprios services quando um
+worker abre a tabela. `python main.py` sobe este processo sozinho.
+"""
+
+import argparse
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config.settings import get_settings
+
+from .factory import registered_search_index, registered_store
+from .records import Record
+from .shared import recv_message, resolve_record_type, send_message
+
+# Métodos do store e do índice de busca aceitos pelo servidor
+STORE_METHODS = frozenset({
+    "get", "insert", "update", "delete", "insert_many", "update_many", "delete_many",
+    "counts", "clear", "version", "len", "contains", "page", "changes",
+})
+SEARCH_METHODS = frozenset({"search", "refresh", "remove", "ready"})
+
+# Alterações guardadas para changes(); quem ficar mais atrasado que isso
+# recebe None (limpa o cache inteiro)
+CHANGE_LOG_SIZE = 10_000
+
+
+class ChangeLog:
+    """
+    IDs alterados (update/delete) em ordem, numerados por uma sequência
+
+    since(seq) devolve os IDs alterados depois de `seq`, ou None quando
+    eles já foram descartados (ou houve um clear): limpar tudo.
+    """
+
+    def __init__(self, size: int = CHANGE_LOG_SIZE):
+        self.size = size
+        self.seq = 0
+        self._ids: List[int] = []
+        # Sequência do primeiro ID de _ids
+        self._first = 1
+        self._lock = threading.Lock()
+
+    def add(self, ids: Iterable[int]) -> None:
+        with self._lock:
+            for record_id in ids:
+                self._ids.append(record_id)
+                self.seq += 1
+            if len(self._ids) > 2 * self.size:
+                drop = len(self._ids) - self.size
+                del self._ids[:drop]
+                self._first += drop
+
+    def reset(self) -> None:
+        with self._lock:
+            self.seq += 1
+            self._ids = []
+            self._first = self.seq + 1
+
+    def since(self, seq: int) -> Tuple[int, Optional[List[int]]]:
+        with self._lock:
+            start = seq + 1 - self._first
+            if start < 0:
+                return self.seq, None
+            return self.seq, self._ids[start:]
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        server: StoreServer = self.server
+        while True:
+            try:
+                kind, table, method, args, kwargs = recv_message(self.request)
+            except (ConnectionError, OSError, ValueError, TypeError):
+                # Conexão fechada ou mensagem malformada: encerra a conexão
+                return
+
+            try:
+                result = (True, server.dispatch(kind, table, method, args, kwargs))
+            except Exception as error:
+                result = (False, error)
+
+            try:
+                send_message(self.request, result)
+            except OSError:
+                return
+
+
+class StoreServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Processo dono dos stores: atende os workers, uma thread por conexão
+
+    Os stores são os mesmos das rotas (thread-safe), criados pelo factory
+    quando o worker abre a tabela ("open" envia o nome da classe do
+    registro: o módulo que a define, dentro do pacote `app`, é importado
+    aqui e cria o store e o índice de busca).
+
+    O socket só aceita conexões do próprio usuário (modo 0600): qualquer
+    conexão lê e altera todos os dados.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str):
+        if os.path.exists(path):
+            os.remove(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Criado já com 0600 (umask), sem janela entre o bind e um chmod
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(umask)
+        self._changes: Dict[str, ChangeLog] = {}
+        self._changes_lock = threading.Lock()
+
+    def _log(self, table: str) -> ChangeLog:
+        log = self._changes.get(table)
+        if log is None:
+            with self._changes_lock:
+                log = self._changes.setdefault(table, ChangeLog())
+        return log
+
+    def dispatch(self, kind: str, table: str, method: str, args: tuple, kwargs: dict) -> Any:
+        if kind == "open":
+            # Importar o módulo da classe do registro cria o store e o registra
+            resolve_record_type(args[0])
+            if registered_store(table) is None:
+                raise LookupError(f"No store registered for table '{table}'")
+            return self._log(table).seq
+
+        if kind == "search":
+            if method not in SEARCH_METHODS:
+                raise AttributeError(f"Search method not allowed: {method}")
+            index = registered_search_index(table)
+            if method == "ready":
+                return index.ready
+            if method == "refresh":
+                return index.refresh(args[0], registered_store(table).get)
+            return getattr(index, method)(*args, **kwargs)
+
+        if method not in STORE_METHODS:
+            raise AttributeError(f"Store method not allowed: {method}")
+        store = registered_store(table)
+
+        if method == "len":
+            return len(store)
+        if method == "contains":
+            return args[0] in store
+        if method == "page":
+            return self._page(store, *args)
+        if method == "changes":
+            return self._log(table).since(args[0])
+
+        result = getattr(store, method)(*args, **kwargs)
+
+        # Só update/delete invalidam respostas em cache (inserts criam IDs novos)
+        if method in ("update", "delete"):
+            self._log(table).add((args[0],))
+        elif method == "update_many":
+            self._log(table).add(args[0])
+        elif method == "delete_many":
+            self._log(table).add(list(args[0]))
+        elif method == "clear":
+            self._log(table).reset()
+        return result
+
+    @staticmethod
+    def _page(store, method: str, args: tuple, kwargs: dict, limit: int) -> List[Record]:
+        return list(islice(getattr(store, method)(*args, **kwargs), limit))
+
+
+def serve(path: str) -> None:
+    """Sobe o servidor (bloqueia); SIGTERM encerra limpando o journal (atexit)"""
+    settings = get_settings()
+    if settings.SHARED_STORE_BACKEND == "shared":
+        raise ValueError("SHARED_STORE_BACKEND must be a local backend")
+    # Os stores criados neste processo são os de verdade
+    settings.STORAGE_BACKEND = settings.SHARED_STORE_BACKEND
+
+    server = StoreServer(path)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def start_server(path: str, timeout: float = 10.0) -> subprocess.Popen:
+    """Sobe o servidor em um processo filho e espera o socket aceitar conexões"""
+    process = subprocess.Popen([sys.executable, "-m", "app.storage.server", "--socket", path])
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(path)
+            return process
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f"Shared store server did not start on {path}")
+            time.sleep(0.05)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor do store compartilhado entre workers")
+    parser.add_argument("--socket", default=get_settings().SHARED_STORE_SOCKET)
+    serve(parser.parse_args().socket)
@@ -0,0 +1,397 @@
+"""
+Store compartilhado entre processos (vários workers do uvicorn): cliente
+Similar a trocar o Map de cada processo Node.js por um Redis local
+
+Com `uvicorn --workers N` cada worker é um processo com a sua própria
+memória: um usuário criado em um worker não existiria nos outros. Com o
+backend "shared" os stores (e o índice de busca) vivem em um único
+processo (server.py) e os workers falam com ele por um socket Unix:
+
+- RemoteStore / RemoteSearchIndex: a mesma interface do store e do
+  índice; cada chamada é uma ida e volta pelo socket
+- mensagens: tamanho (4 bytes) + JSON; uma conexão por thread. Nada de
+  pickle: quem conecta no socket não consegue executar código no
+  servidor (tuplas, datas, registros e erros vão marcados, ver encode)
+- iteradores (scan, find, range) buscam páginas sob demanda, com o
+  mesmo cursor por ID da paginação das rotas
+- changes(): IDs alterados por qualquer worker desde a última chamada,
+  para o cache de respostas de cada worker não servir dados antigos
+"""
+
+import importlib
+import json
+import socket
+import struct
+import threading
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from .indexes import DuplicateKeyError
+from .records import Record
+from .search import IndexNotReady
+
+_LENGTH = struct.Struct("<I")
+
+# Páginas dos iteradores remotos: começam pequenas (listagens de uma
+# página) e dobram até o limite (exportações, varreduras)
+FIRST_PAGE = 64
+MAX_PAGE = 4096
+
+
+# Erros que voltam do servidor com o próprio tipo (os demais viram RuntimeError)
+ERRORS: Dict[str, Type[Exception]] = {
+    error.__name__: error
+    for error in (
+        DuplicateKeyError, IndexNotReady, LookupError, KeyError, IndexError,
+        AttributeError, ValueError, TypeError,
+    )
+}
+
+# Tipos de registro conhecidos neste processo ("módulo.Classe" -> classe e
+# posições das colunas datetime na linha, que vão como texto ISO)
+_record_types: Dict[str, Tuple[Type[Record], Tuple[int, ...]]] = {}
+
+
+def record_type_name(record_type: Type[Record]) -> str:
+    return f"{record_type.__module__}.{record_type.__qualname__}"
+
+
+def register_record_type(record_type: Type[Record]) -> None:
+    dates = tuple(
+        position for position, kind in enumerate(record_type.columns.values(), start=1)
+        if kind is datetime
+    )
+    _record_types[record_type_name(record_type)] = (record_type, dates)
+
+
+def resolve_record_type(name: str) -> Type[Record]:
+    """
+    Classe do registro pelo nome enviado pelo worker
+
+    Só importa módulos do próprio projeto (pacote `app`) e só aceita
+    subclasses de Record: o nome não escolhe código arbitrário.
+    """
+    known = _record_types.get(name)
+    if known is not None:
+        return known[0]
+
+    module, _, qualname = name.rpartition(".")
+    if not module.startswith("app."):
+        raise ValueError(f"Record type outside the app package: {name}")
+    record_type = getattr(importlib.import_module(module), qualname, None)
+    if not (isinstance(record_type, type) and issubclass(record_type, Record)):
+        raise ValueError(f"Not a record type: {name}")
+    register_record_type(record_type)
+    return record_type
+
+
+def encode(value: Any) -> Any:
+    """
+    Valor -> estrutura JSON
+
+    Listas, textos, números e None vão como estão; o resto vira um objeto
+    de uma chave que diz o tipo: {"t": [...]} tupla, {"m": [[k, v], ...]}
+    dict (chaves de qualquer tipo), {"d": iso} datetime, {"r": [tipo,
+    linha]} registro, {"e": [tipo, args]} erro.
+
+    Registros são o grosso das mensagens (páginas de até MAX_PAGE): a
+    linha vai sem marcas, e as colunas datetime (pelo tipo do registro)
+    voltam a ser datetime do outro lado.
+    """
+    kind = type(value)
+    if kind is str or kind is int or kind is float or kind is bool or value is None:
+        return value
+    if kind is list:
+        return [encode(item) for item in value]
+    if kind is tuple:
+        return {"t": [encode(item) for item in value]}
+    if kind is dict:
+        return {"m": [[encode(key), encode(item)] for key, item in value.items()]}
+    if kind is datetime:
+        return {"d": value.isoformat()}
+    if isinstance(value, Record):
+        name = record_type_name(kind)
+        if name not in _record_types:
+            register_record_type(kind)
+        return {"r": [name, [
+            item.isoformat() if type(item) is datetime else
+            list(item) if type(item) is tuple else item
+            for item in value.to_row()
+        ]]}
+    if isinstance(value, Enum):
+        return encode(value.value)
+    if isinstance(value, DuplicateKeyError):
+        return {"e": ["DuplicateKeyError", [encode(value.field), encode(value.value)]]}
+    if isinstance(value, Exception):
+        return {"e": [kind.__name__, [str(value)]]}
+    raise TypeError(f"Cannot send value of type {kind.__name__} to the shared store")
+
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    (tag, value), = obj.items()
+    if tag == "t":
+        return tuple(value)
+    if tag == "m":
+        return {key: item for key, item in value}
+    if tag == "d":
+        return datetime.fromisoformat(value)
+    if tag == "r":
+        name, row = value
+        known = _record_types.get(name)
+        if known is None:
+            raise ValueError(f"Unknown record type: {name}")
+        record_type, dates = known
+        for position in dates:
+            if row[position] is not None:
+                row[position] = datetime.fromisoformat(row[position])
+        return record_type.from_row(row)
+    if tag == "e":
+        name, args = value
+        error = ERRORS.get(name)
+        return error(*args) if error is not None else RuntimeError(f"{name}: {args[0]}")
+    raise ValueError(f"Unknown tag in shared store message: {tag}")
+
+
+def send_message(sock: socket.socket, message: Any) -> None:
+    """Envia uma mensagem: tamanho (4 bytes) + JSON"""
+    data = json.dumps(encode(message), separators=(",", ":")).encode()
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def recv_message(sock: socket.socket) -> Any:
+    """Lê uma mensagem inteira (bloqueia até chegar)"""
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return json.loads(_recv_exact(sock, size), object_hook=_decode_object)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view, received = memoryview(buffer), 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            raise ConnectionError("Shared store connection closed")
+        received += count
+    return bytes(buffer)
+
+
+class StoreClient:
+    """Uma conexão por thread com o servidor (as rotas `def` rodam no threadpool)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def call(
+        self,
+        kind: str,
+        table: str,
+        method: str,
+        args: tuple = (),
+        kwargs: Optional[dict] = None,
+        opener: Optional[Tuple[Any, ...]] = None
+    ) -> Any:
+        """
+        Executa `method` no servidor e devolve o resultado (ou levanta o erro dele)
+
+        - opener: mensagem "open" enviada antes da primeira chamada de cada
+          tabela nesta conexão
+        """
+        local = self._local
+        sock = getattr(local, "sock", None)
+
+        try:
+            if sock is None:
+                sock = local.sock = self._connect()
+                local.opened = set()
+            if opener is not None and table not in local.opened:
+                self._request(sock, opener)
+                local.opened.add(table)
+            return self._request(sock, (kind, table, method, args, kwargs or {}))
+        except OSError:
+            # Servidor reiniciado ou conexão perdida: a próxima chamada reconecta
+            local.sock = None
+            if sock is not None:
+                sock.close()
+            raise
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError as error:
+            sock.close()
+            raise ConnectionError(
+                f"Shared store server not reachable at {self.path} "
+                "(start it with: python -m app.storage.server)"
+            ) from error
+        return sock
+
+    @staticmethod
+    def _request(sock: socket.socket, message: tuple) -> Any:
+        send_message(sock, message)
+        ok, value = recv_message(sock)
+        if not ok:
+            raise value
+        return value
+
+
+_clients: Dict[str, StoreClient] = {}
+
+
+def get_client(path: str) -> StoreClient:
+    client = _clients.get(path)
+    if client is None:
+        client = _clients.setdefault(path, StoreClient(path))
+    return client
+
+
+class RemoteStore:
+    """
+    Store de outro processo com a interface do MemoryStore
+
+    Registros chegam como cópias (imutáveis, como no MemoryStore); a
+    conexão só é aberta na primeira chamada.
+    """
+
+    # Cada operação espera o socket: rotas async usam o threadpool
+    blocking = True
+
+    def __init__(self, path: str, table: str, record_type: Type[Record]):
+        self.table = table
+        self.record_type = record_type
+        self._client = get_client(path)
+        register_record_type(record_type)
+        self._opener = ("open", table, "open", (record_type_name(record_type),), {})
+        # Última alteração vista por changes() (None: ainda não sincronizado)
+        self._seen: Optional[int] = None
+        self._seen_lock = threading.Lock()
+
+    def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        return self._client.call("store", self.table, method, args, kwargs, opener=self._opener)
+
+    def __len__(self) -> int:
+        return self._call("len")
+
+    def __contains__(self, record_id: int) -> bool:
+        return self._call("contains", record_id)
+
+    def __iter__(self) -> Iterator[Record]:
+        return self.scan()
+
+    def version(self) -> int:
+        return self._call("version")
+
+    def get(self, record_id: int) -> Optional[Record]:
+        return self._call("get", record_id)
+
+    def insert(self, data: dict) -> Record:
+        return self._call("insert", data)
+
+    def update(self, record_id: int, changes: dict) -> Optional[Record]:
+        return self._call("update", record_id, changes)
+
+    def delete(self, record_id: int) -> bool:
+        return self._call("delete", record_id)
+
+    def insert_many(self, items: Iterable[dict]) -> list:
+        return self._call("insert_many", list(items))
+
+    def update_many(self, changes: Dict[int, dict]) -> dict:
+        return self._call("update_many", changes)
+
+    def delete_many(self, record_ids: Iterable[int]) -> List[bool]:
+        return self._call("delete_many", list(record_ids))
+
+    def counts(self, field: str) -> Dict[Any, int]:
+        return self._call("counts", field)
+
+    def clear(self) -> None:
+        self._call("clear")
+
+    def _pages(
+        self, method: str, args: tuple, after: Any, cursor: Callable[[Record], Any], skip: int = 0
+    ) -> Iterator[Record]:
+        """Iterador remoto: páginas crescentes, continuando do último registro recebido"""
+        limit = FIRST_PAGE
+        while True:
+            kwargs = {"after": after, "skip": skip} if skip else {"after": after}
+            records = self._call("page", method, args, kwargs, limit)
+            yield from records
+            if len(records) < limit:
+                return
+            after, skip = cursor(records[-1]), 0
+            limit = min(limit * 2, MAX_PAGE)
+
+    def scan(self, skip: int = 0, after: Optional[int] = None) -> Iterator[Record]:
+        return self._pages("scan", (), after, lambda record: record.id, skip=skip)
+
+    def find(self, field: str, value: Any, after: Optional[int] = None) -> Iterator[Record]:
+        return self._pages("find", (field, value), after, lambda record: record.id)
+
+    def find_all(
+        self, field: str, values: Iterable[Any], after: Optional[int] = None
+    ) -> Iterator[Record]:
+        return self._pages("find_all", (field, list(values)), after, lambda record: record.id)
+
+    def range(
+        self,
+        field: str,
+        min_value: Any = None,
+        max_value: Any = None,
+        after: Optional[Tuple[Any, int]] = None
+    ) -> Iterator[Record]:
+        return self._pages(
+            "range", (field, min_value, max_value), after,
+            lambda record: (getattr(record, field), record.id)
+        )
+
+    def changes(self) -> Optional[List[int]]:
+        """
+        IDs alterados (por qualquer worker) desde a chamada anterior
+
+        None: alterações demais (ou um clear) desde então; descartar tudo.
+        A primeira chamada só marca o ponto de partida.
+        """
+        seen = self._seen
+        seq, ids = self._call("changes", -1 if seen is None else seen)
+
+        with self._seen_lock:
+            if self._seen is not None and self._seen >= seq:
+                return []
+            self._seen = seq
+        if seen is None:
+            return []
+        return ids
+
+
+class RemoteSearchIndex:
+    """Índice de busca que vive no processo do store compartilhado"""
+
+    def __init__(self, store: RemoteStore):
+        self._store = store
+
+    def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        store = self._store
+        return store._client.call("search", store.table, method, args, kwargs, opener=store._opener)
+
+    @property
+    def ready(self) -> bool:
+        return self._call("ready")
+
+    def search(
+        self,
+        query: str,
+        operator: str = "and",
+        limit: int = 10,
+        after: Optional[Tuple[int, int]] = None
+    ) -> List[Tuple[int, int]]:
+        return self._call("search", query, operator, limit=limit, after=after)
+
+    def refresh(self, record_id: int, load: Optional[Callable[[int], Any]] = None) -> None:
+        """Reindexa no servidor, lendo o registro de lá (`load` é ignorado)"""
+        self._call("refresh", record_id)
+
+    def remove(self, record_id: int) -> None:
+        self._call("remove", record_id)
@@ -0,0 +1,377 @@
+"""
+Snapshots binários de uma tabela em memória, abertos com mmap
+Similar ao RDB do Redis: uma foto do estado inteiro, gravada de uma vez
+
+Layout do arquivo (inteiros de 64 bits na ordem de bytes da máquina,
+seções alinhadas em 8 bytes):
+
+    registros   cada registro serializado (pickle da tupla de colunas)
+    ids         IDs em ordem crescente
+    offsets     início de cada registro no arquivo (+ o fim do último)
+    índices     por índice: limites dos buckets + IDs de todos os buckets
+    meta        pickle: colunas, próximo ID, segmento do journal, chaves
+                dos índices e posição de cada seção
+    trailer     posição e tamanho do meta + MAGIC
+
+Abrir o snapshot lê só o meta: o resto do arquivo é mapeado em memória
+(mmap) e o SO carrega as páginas sob demanda. Registros são decodificados
+no primeiro acesso (SnapshotRecords) e os buckets dos índices são fatias
+do próprio arquivo, sem cópia: o store atende requisições logo após abrir,
+em vez de montar milhões de objetos antes.
+"""
+
+import heapq
+import mmap
+import os
+import pickle
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from operator import itemgetter
+from typing import (
+    Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+)
+
+from .indexes import HashIndex
+from .records import Record
+
+MAGIC = b"APISNAP2"
+# Posição do meta, tamanho do meta, MAGIC (no fim do arquivo)
+TRAILER = struct.Struct("<qq8s")
+
+# (id, colunas, registro já serializado ou None)
+Row = Tuple[int, tuple, Optional[bytes]]
+
+_MISSING = object()
+
+# Registros do snapshot decodificados mantidos em memória (LRU), por tabela
+READ_CACHE_RECORDS = 100_000
+
+
+def write_snapshot(
+    path: str,
+    header: Dict[str, Any],
+    rows: Iterable[Row],
+    indexes: Iterable[HashIndex] = ()
+) -> None:
+    """
+    Grava o snapshot de forma atômica (arquivo temporário + rename)
+
+    - header: precisa de "columns"; o resto vai para o meta como está
+    - rows: registros em ordem de ID; os já serializados (vindos de outro
+      snapshot) são copiados sem passar pelo pickle de novo
+    - indexes: os buckets são montados a partir das próprias linhas
+      (keys_for), então saem consistentes com os registros gravados
+
+    Um crash no meio da gravação deixa o snapshot anterior intacto.
+    """
+    columns = list(header["columns"])
+    indexes = [(index, columns.index(index.field)) for index in indexes]
+    buckets: List[Dict[Hashable, array]] = [{} for _ in indexes]
+    ids, offsets = array("q"), array("q")
+    tmp = f"{path}.tmp"
+
+    with open(tmp, "wb") as file:
+        position = 0
+        for record_id, values, payload in rows:
+            if payload is None:
+                payload = pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+            ids.append(record_id)
+            offsets.append(position)
+            file.write(payload)
+            position += len(payload)
+
+            for (index, column), index_buckets in zip(indexes, buckets):
+                for key in index.keys_for(values[column]):
+                    bucket = index_buckets.get(key)
+                    if bucket is None:
+                        bucket = index_buckets[key] = array("q")
+                    bucket.append(record_id)
+        offsets.append(position)
+
+        def section(data: array) -> Tuple[int, int]:
+            nonlocal position
+            padding = -position % 8
+            file.write(b"\0" * padding)
+            start = position + padding
+            data.tofile(file)
+            position = start + len(data) * data.itemsize
+            return start, len(data)
+
+        meta = {**header, "columns": columns, "ids": section(ids), "offsets": section(offsets)}
+        meta["indexes"] = {}
+        for (index, _), index_buckets in zip(indexes, buckets):
+            bounds, flat = array("q", [0]), array("q")
+            for bucket in index_buckets.values():
+                flat.extend(bucket)
+                bounds.append(len(flat))
+            meta["indexes"][index.field] = {
+                "spec": index.spec,
+                "keys": list(index_buckets),
+                "bounds": section(bounds),
+                "ids": section(flat),
+            }
+
+        encoded = pickle.dumps(meta, pickle.HIGHEST_PROTOCOL)
+        file.write(encoded)
+        file.write(TRAILER.pack(position, len(encoded), MAGIC))
+
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(tmp, path)
+    fsync_dir(os.path.dirname(path))
+
+
+class Snapshot:
+    """
+    Snapshot aberto com mmap: só o meta é lido na abertura
+
+    - ids / offsets: memoryviews sobre o arquivo (sem cópia)
+    - values(pos): colunas do registro na posição `pos` (decodificadas agora)
+    - index(field): buckets gravados para o campo, para HashIndex.load
+
+    O arquivo pode ser substituído por um snapshot novo (os.replace) com
+    este aberto: o mapeamento continua apontando para o arquivo antigo.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        size = len(self._mmap)
+        if size < TRAILER.size:
+            raise ValueError(f"Truncated snapshot: {path}")
+        meta_offset, meta_size, magic = TRAILER.unpack_from(self._mmap, size - TRAILER.size)
+        if magic != MAGIC:
+            raise ValueError(f"Unsupported snapshot format: {path}")
+
+        self.meta: Dict[str, Any] = pickle.loads(self._mmap[meta_offset:meta_offset + meta_size])
+        self.columns: List[str] = self.meta["columns"]
+        self.ids = self._array(self.meta["ids"])
+        self.offsets = self._array(self.meta["offsets"])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _array(self, section: Tuple[int, int]) -> memoryview:
+        start, length = section
+        return memoryview(self._mmap)[start:start + length * 8].cast("q")
+
+    def payload(self, pos: int) -> bytes:
+        return self._mmap[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def values(self, pos: int) -> tuple:
+        return pickle.loads(self._mmap[self.offsets[pos]:self.offsets[pos + 1]])
+
+    def index(self, field: str) -> Optional[Tuple[Any, List[Hashable], memoryview, memoryview]]:
+        """(spec, chaves, limites, IDs) do índice gravado para o campo, ou None"""
+        stored = self.meta.get("indexes", {}).get(field)
+        if stored is None:
+            return None
+        return stored["spec"], stored["keys"], self._array(stored["bounds"]), self._array(stored["ids"])
+
+
+def read_snapshot(path: str) -> Optional[Snapshot]:
+    """Snapshot aberto (mmap), ou None se não existir"""
+    if not os.path.exists(path):
+        return None
+    return Snapshot(path)
+
+
+class SnapshotRecords:
+    """
+    id -> registro, com um snapshot como base (a parte da interface de
+    dict que o MemoryStore usa)
+
+    - registros do snapshot viram objetos no primeiro acesso; os mais
+      lidos ficam em um cache LRU de `cache_size` registros, os demais
+      custam só as páginas do mmap
+    - escritas (e só elas) vão para um dict por cima do snapshot
+      (overlay); remover um registro do snapshot guarda None no overlay.
+      Leituras nunca entram no overlay: o próximo snapshot regrava só o
+      que mudou
+    - get(..., cache=False) decodifica sem guardar (varreduras longas,
+      como a montagem da busca, não expulsam os registros quentes)
+    - snapshot com colunas de uma versão anterior do registro: as colunas
+      novas ficam None
+
+    Similar a um objeto com getters preguiçosos no JavaScript.
+    """
+
+    def __init__(
+        self,
+        snapshot: Optional[Snapshot],
+        record_type: Type[Record],
+        cache_size: int = READ_CACHE_RECORDS
+    ):
+        self.record_type = record_type
+        self._snapshot = snapshot
+        self._ids: Sequence[int] = snapshot.ids if snapshot is not None else ()
+        self._overlay: Dict[int, Optional[Record]] = {}
+        # Registros do snapshot já decodificados (a base não muda: nunca ficam velhos)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, Record]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._size = len(self._ids)
+        self._size_lock = threading.Lock()
+        self._convert = self._converter(snapshot)
+
+    def _converter(self, snapshot: Optional[Snapshot]) -> Optional[Callable[[tuple], tuple]]:
+        columns = list(self.record_type.columns)
+        if snapshot is None or snapshot.columns == columns:
+            return None
+
+        positions = [
+            snapshot.columns.index(name) if name in snapshot.columns else None
+            for name in columns
+        ]
+        return lambda values: tuple(None if p is None else values[p] for p in positions)
+
+    def _values(self, pos: int) -> tuple:
+        values = self._snapshot.values(pos)
+        return values if self._convert is None else self._convert(values)
+
+    def _position(self, record_id: int) -> Optional[int]:
+        ids = self._ids
+        pos = bisect_left(ids, record_id)
+        return pos if pos < len(ids) and ids[pos] == record_id else None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, record_id: int) -> bool:
+        record = self._overlay.get(record_id, _MISSING)
+        if record is _MISSING:
+            return self._position(record_id) is not None
+        return record is not None
+
+    def __iter__(self) -> Iterator[int]:
+        overlay = self._overlay
+        for record_id in self._ids:
+            if overlay.get(record_id, _MISSING) is not None:
+                yield record_id
+        for record_id, record in list(overlay.items()):
+            if record is not None and self._position(record_id) is None:
+                yield record_id
+
+    def get(self, record_id: int, default: Any = None, cache: bool = True) -> Any:
+        record = self._overlay.get(record_id, _MISSING)
+        if record is not _MISSING:
+            return default if record is None else record
+
+        # O overlay é sempre consultado antes: uma escrita vence a versão do snapshot
+        snapshot = self._snapshot
+        with self._cache_lock:
+            record = self._cache.get(record_id)
+            if record is not None:
+                self._cache.move_to_end(record_id)
+                return record
+
+        pos = self._position(record_id)
+        if pos is None:
+            return default
+        record = self.record_type.from_row((record_id, *self._values(pos)))
+
+        if cache and self.cache_size > 0:
+            with self._cache_lock:
+                # clear() concorrente: o registro é da base que acabou de sair
+                if snapshot is not self._snapshot:
+                    return record
+                self._cache[record_id] = record
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return record
+
+    def __getitem__(self, record_id: int) -> Record:
+        record = self.get(record_id)
+        if record is None:
+            raise KeyError(record_id)
+        return record
+
+    def __setitem__(self, record_id: int, record: Record) -> None:
+        # Escritas no mesmo ID são serializadas pelo lock do registro no store
+        added = record_id not in self
+        self._overlay[record_id] = record
+        if added:
+            with self._size_lock:
+                self._size += 1
+
+    def pop(self, record_id: int, default: Any = None) -> Any:
+        record = self.get(record_id, cache=False)
+        if record is None:
+            return default
+
+        if self._position(record_id) is not None:
+            self._overlay[record_id] = None
+        else:
+            self._overlay.pop(record_id, None)
+        with self._size_lock:
+            self._size -= 1
+        return record
+
+    def clear(self) -> None:
+        self._snapshot, self._ids = None, ()
+        self._overlay = {}
+        with self._cache_lock:
+            self._cache.clear()
+        self._size = 0
+
+    def sorted_ids(self) -> List[int]:
+        """IDs em ordem crescente (a ordem do store na subida)"""
+        ids = self._ids.tolist() if isinstance(self._ids, memoryview) else list(self._ids)
+        if not self._overlay:
+            return ids
+
+        removed = {i for i, record in self._overlay.items() if record is None}
+        if removed:
+            ids = [i for i in ids if i not in removed]
+        ids.extend(
+            i for i, record in self._overlay.items()
+            if record is not None and self._position(i) is None
+        )
+        ids.sort()
+        return ids
+
+    def freeze(self) -> Iterator[Row]:
+        """
+        Linhas do estado atual em ordem de ID, para write_snapshot
+
+        Chamado com as escritas paradas: só o overlay é copiado. As linhas
+        são geradas depois, com as escritas liberadas; as que vêm intactas
+        do snapshot base são copiadas sem recriar o registro.
+        """
+        return self._rows(self._snapshot, self._ids, dict(self._overlay))
+
+    def _rows(
+        self,
+        snapshot: Optional[Snapshot],
+        ids: Sequence[int],
+        overlay: Dict[int, Optional[Record]]
+    ) -> Iterator[Row]:
+        def base() -> Iterator[Row]:
+            for pos, record_id in enumerate(ids):
+                if record_id in overlay:
+                    continue
+                if self._convert is None:
+                    payload = snapshot.payload(pos)
+                    yield record_id, pickle.loads(payload), payload
+                else:
+                    yield record_id, self._convert(snapshot.values(pos)), None
+
+        def written() -> Iterator[Row]:
+            for record_id in sorted(i for i, record in overlay.items() if record is not None):
+                yield record_id, overlay[record_id].to_row()[1:], None
+
+        return heapq.merge(base(), written(), key=itemgetter(0))
+
+
+def fsync_dir(path: str) -> None:
+    """Garante que criações/renomeações de arquivos no diretório são duráveis"""
+    fd = os.open(path or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
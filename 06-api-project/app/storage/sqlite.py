@@ -0,0 +1,471 @@
+"""
+Store persistente em SQLite
+Similar a usar better-sqlite3 no Node.js: mesma interface do MemoryStore,
+mas os dados sobrevivem a reinícios e não precisam caber na RAM
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+from .indexes import DuplicateKeyError, HashIndex, MultiIndex, SortedIndex, UniqueIndex
+from .records import Record
+
+# Tipo Python -> (tipo SQL, encode, decode)
+_COLUMN_TYPES: Dict[type, Tuple[str, Callable[[Any], Any], Callable[[Any], Any]]] = {
+    int: ("INTEGER", int, int),
+    str: ("TEXT", str, str),
+    datetime: ("TEXT", datetime.isoformat, datetime.fromisoformat),
+    list: ("TEXT", json.dumps, json.loads),  # listas e tuplas (tags)
+}
+
+
+def sqlite_path(database_url: str) -> str:
+    """
+    Converte DATABASE_URL em caminho do SQLite
+
+    - sqlite:///./app.db  -> ./app.db
+    - sqlite:///:memory:  -> banco em memória compartilhado entre threads
+    """
+    prefix = "sqlite:///"
+    if not database_url.startswith(prefix):
+        raise ValueError(f"Unsupported DATABASE_URL for SQLite: {database_url}")
+
+    path = database_url[len(prefix):]
+    if path == ":memory:":
+        return "file::memory:?cache=shared"
+    return path
+
+
+class SqliteStore:
+    """
+    Tabela SQLite com a mesma interface do MemoryStore
+
+    - uma conexão por thread (sqlite3 não compartilha conexões entre threads)
+    - WAL: leitores não bloqueiam o escritor
+    - SQL montado uma vez e reaproveitado pelo cache de prepared statements
+    - índices SQL nos campos indexados (e em `sql_indexes`, ex: created_at)
+    - campos com MultiIndex (ex: tags) ganham uma tabela de junção
+      `<tabela>_<campo>` e uma de contagens, mantidas por triggers
+    - UniqueIndex vira UNIQUE INDEX (COLLATE NOCASE com ignore_case; o
+      SQLite só ignora maiúsculas em ASCII)
+    - colunas novas do record_type são adicionadas a bancos já existentes
+    - version(): contador da coleção mantido por triggers (vale entre processos)
+
+    Em Node.js seria algo como:
+    const db = new Database('app.db');
+    const getUser = db.prepare('SELECT * FROM users WHERE id = ?');
+    """
+
+    # Cada operação faz I/O: as rotas async a mandam para o threadpool
+    blocking = True
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        record_type: Type[Record],
+        indexes: Iterable[HashIndex] = (),
+        sql_indexes: Iterable[str] = (),
+    ):
+        self.path = path
+        self.table = table
+        self.record_type = record_type
+        self.columns = dict(record_type.columns)
+        self.indexes: Dict[str, HashIndex] = {index.field: index for index in indexes}
+
+        self._encoders = {name: _COLUMN_TYPES[kind][1] for name, kind in self.columns.items()}
+        self._decoders = {name: _COLUMN_TYPES[kind][2] for name, kind in self.columns.items()}
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        # SQL fixo (preparado uma vez por conexão e reutilizado)
+        names = list(self.columns)
+        select = f"SELECT id, {', '.join(names)} FROM {table}"
+        self._sql = {
+            "get": f"{select} WHERE id = ?",
+            "insert": (
+                f"INSERT INTO {table} ({', '.join(names)}) "
+                f"VALUES ({', '.join('?' for _ in names)})"
+            ),
+            "delete": f"DELETE FROM {table} WHERE id = ?",
+            "count": f"SELECT COUNT(*) FROM {table}",
+            "version": "SELECT version FROM _versions WHERE name = ?",
+            "scan": f"{select} WHERE id > ? ORDER BY id LIMIT -1 OFFSET ?",
+            "find": f"{select} WHERE {{field}} = ?{{collate}} AND id > ? ORDER BY id",
+            "find_all": f"{select} WHERE id IN ({{ids}}) ORDER BY id",
+            "range": f"{select} WHERE {{where}} ORDER BY {{field}}, id",
+        }
+
+        multi = [field for field, index in self.indexes.items() if isinstance(index, MultiIndex)]
+        self._unique = {
+            field: index for field, index in self.indexes.items()
+            if isinstance(index, UniqueIndex)
+        }
+        self._create_schema(
+            [
+                field for field in self.indexes
+                if field not in multi and field not in self._unique
+            ] + list(sql_indexes),
+            multi
+        )
+
+    # ------------------------------------------------------------------
+    # Conexões (pool por thread)
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                uri=self.path.startswith("file:"),
+                isolation_level=None,  # autocommit; transações explícitas quando preciso
+                check_same_thread=False,
+                cached_statements=256,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+
+            with self._lock:
+                self._connections.append(conn)
+
+        return conn
+
+    def close(self) -> None:
+        """Fecha as conexões de todas as threads"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Agrupa vários comandos em uma transação (um único commit)"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _create_schema(self, indexed_fields: List[str], multi_fields: List[str]) -> None:
+        columns = ", ".join(
+            f"{name} {_COLUMN_TYPES[kind][0]}" for name, kind in self.columns.items()
+        )
+
+        conn = self._connect()
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            f"(id INTEGER PRIMARY KEY AUTOINCREMENT, {columns})"
+        )
+
+        # Banco criado por uma versão anterior do record_type: adiciona as colunas novas
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+        for name, kind in self.columns.items():
+            if name not in existing:
+                conn.execute(
+                    f"ALTER TABLE {self.table} ADD COLUMN {name} {_COLUMN_TYPES[kind][0]}"
+                )
+
+        self._create_version_counter(conn)
+        for field in indexed_fields:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.table}_{field} "
+                f"ON {self.table}({field})"
+            )
+        for field, index in self._unique.items():
+            collate = " COLLATE NOCASE" if index.ignore_case else ""
+            conn.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{self.table}_{field} "
+                f"ON {self.table}({field}{collate})"
+            )
+        for field in multi_fields:
+            self._create_multi_index(conn, field)
+
+    def _create_version_counter(self, conn: sqlite3.Connection) -> None:
+        """Contador de versão da tabela, incrementado por triggers a cada escrita"""
+        table = self.table
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS _versions (
+                name TEXT PRIMARY KEY, version INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            INSERT OR IGNORE INTO _versions (name, version) VALUES ('{table}', 0);
+        """)
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} "
+                f"AFTER {event} ON {table} BEGIN "
+                f"UPDATE _versions SET version = version + 1 WHERE name = '{table}'; "
+                f"END"
+            )
+
+    def _create_multi_index(self, conn: sqlite3.Connection, field: str) -> None:
+        """
+        Tabela de junção valor -> id para um campo lista (JSON), mais a
+        contagem por valor; os triggers mantêm as duas a cada escrita
+        """
+        table, side = self.table, f"{self.table}_{field}"
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (side,)
+        ).fetchone()
+
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {side} (
+                value TEXT NOT NULL, id INTEGER NOT NULL, PRIMARY KEY (value, id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_{side}_id ON {side}(id);
+            CREATE TABLE IF NOT EXISTS {side}_counts (
+                value TEXT PRIMARY KEY, count INTEGER NOT NULL
+            ) WITHOUT ROWID;
+
+            CREATE TRIGGER IF NOT EXISTS {side}_insert AFTER INSERT ON {table} BEGIN
+                INSERT OR IGNORE INTO {side} (value, id)
+                SELECT value, NEW.id FROM json_each(NEW.{field});
+            END;
+            CREATE TRIGGER IF NOT EXISTS {side}_update AFTER UPDATE OF {field} ON {table} BEGIN
+                DELETE FROM {side} WHERE id = OLD.id;
+                INSERT OR IGNORE INTO {side} (value, id)
+                SELECT value, NEW.id FROM json_each(NEW.{field});
+            END;
+            CREATE TRIGGER IF NOT EXISTS {side}_delete AFTER DELETE ON {table} BEGIN
+                DELETE FROM {side} WHERE id = OLD.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS {side}_count_add AFTER INSERT ON {side} BEGIN
+                INSERT INTO {side}_counts (value, count) VALUES (NEW.value, 1)
+                ON CONFLICT (value) DO UPDATE SET count = count + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS {side}_count_remove AFTER DELETE ON {side} BEGIN
+                UPDATE {side}_counts SET count = count - 1 WHERE value = OLD.value;
+                DELETE FROM {side}_counts WHERE value = OLD.value AND count = 0;
+            END;
+        """)
+
+        # Banco criado antes do índice: preenche a junção com as linhas existentes
+        if not exists:
+            conn.execute(
+                f"INSERT OR IGNORE INTO {side} (value, id) "
+                f"SELECT j.value, t.id FROM {table} AS t, json_each(t.{field}) AS j"
+            )
+
+    # ------------------------------------------------------------------
+    # Conversão linha <-> registro
+    # ------------------------------------------------------------------
+
+    def _encode(self, field: str, value: Any) -> Any:
+        return None if value is None else self._encoders[field](value)
+
+    def _decode_row(self, row: Optional[tuple]) -> Optional[Record]:
+        if row is None:
+            return None
+
+        fields = {
+            name: None if value is None else decode(value)
+            for (name, decode), value in zip(self._decoders.items(), row[1:])
+        }
+        return self.record_type(id=row[0], **fields)
+
+    def _rows(self, sql: str, params: tuple) -> Iterator[Record]:
+        cursor = self._connect().execute(sql, params)
+        for row in cursor:
+            yield self._decode_row(row)
+
+    # ------------------------------------------------------------------
+    # Interface do store
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._connect().execute(self._sql["count"]).fetchone()[0]
+
+    def __contains__(self, record_id: int) -> bool:
+        return self.get(record_id) is not None
+
+    def __iter__(self) -> Iterator[Record]:
+        return self.scan()
+
+    def version(self) -> int:
+        """Versão da coleção: muda a cada insert/update/delete (de qualquer processo)"""
+        return self._connect().execute(self._sql["version"], (self.table,)).fetchone()[0]
+
+    def get(self, record_id: int) -> Optional[Record]:
+        """Busca registro por ID"""
+        row = self._connect().execute(self._sql["get"], (record_id,)).fetchone()
+        return self._decode_row(row)
+
+    def insert(self, data: dict) -> Record:
+        """Insere registro e atribui o próximo ID"""
+        return self._insert(self._connect(), data)
+
+    def update(self, record_id: int, changes: dict) -> Optional[Record]:
+        """Atualiza campos do registro (o ID nunca muda)"""
+        return self._update(self._connect(), record_id, changes)
+
+    def delete(self, record_id: int) -> bool:
+        """Remove registro por ID"""
+        return self._connect().execute(self._sql["delete"], (record_id,)).rowcount > 0
+
+    def insert_many(self, items: Iterable[dict]) -> List[Union[Record, DuplicateKeyError]]:
+        """
+        Insere vários registros em uma única transação
+
+        Itens que violam um índice único recebem o DuplicateKeyError no
+        lugar do registro (o SQLite desfaz só o comando que falhou).
+        """
+        with self._transaction() as conn:
+            return [self._try(self._insert, conn, data) for data in items]
+
+    def update_many(
+        self, changes: Dict[int, dict]
+    ) -> Dict[int, Union[Record, DuplicateKeyError, None]]:
+        """Atualiza vários registros em uma única transação"""
+        with self._transaction() as conn:
+            return {
+                record_id: self._try(self._update, conn, record_id, data)
+                for record_id, data in changes.items()
+            }
+
+    @staticmethod
+    def _try(write, *args):
+        try:
+            return write(*args)
+        except DuplicateKeyError as error:
+            return error
+
+    def _duplicate(self, error: sqlite3.IntegrityError, data: dict) -> Exception:
+        """IntegrityError de um UNIQUE INDEX -> DuplicateKeyError do campo"""
+        message = str(error)
+        for field in self._unique:
+            if f"{self.table}.{field}" in message:
+                return DuplicateKeyError(field, data.get(field))
+        return error
+
+    def delete_many(self, record_ids: Iterable[int]) -> List[bool]:
+        """Remove vários registros em uma única transação"""
+        sql = self._sql["delete"]
+        with self._transaction() as conn:
+            return [conn.execute(sql, (record_id,)).rowcount > 0 for record_id in record_ids]
+
+    def _insert(self, conn: sqlite3.Connection, data: dict) -> Record:
+        params = tuple(self._encode(name, data.get(name)) for name in self.columns)
+        try:
+            cursor = conn.execute(self._sql["insert"], params)
+        except sqlite3.IntegrityError as error:
+            raise self._duplicate(error, data) from error
+        return self.record_type(id=cursor.lastrowid, **data)
+
+    def _update(self, conn: sqlite3.Connection, record_id: int, changes: dict) -> Optional[Record]:
+        fields = [name for name in self.columns if name in changes]
+
+        if not fields:
+            return self._decode_row(conn.execute(self._sql["get"], (record_id,)).fetchone())
+
+        sql = (
+            f"UPDATE {self.table} SET {', '.join(f'{name} = ?' for name in fields)} "
+            f"WHERE id = ? RETURNING id, {', '.join(self.columns)}"
+        )
+        params = tuple(self._encode(name, changes[name]) for name in fields)
+        # fetchall: o statement precisa terminar para o autocommit efetivar
+        try:
+            rows = conn.execute(sql, params + (record_id,)).fetchall()
+        except sqlite3.IntegrityError as error:
+            raise self._duplicate(error, changes) from error
+        return self._decode_row(rows[0]) if rows else None
+
+    def scan(self, skip: int = 0, after: Optional[int] = None) -> Iterator[Record]:
+        """Percorre os registros em ordem de ID (lazy: lê só o que for consumido)"""
+        return self._rows(self._sql["scan"], (after or 0, skip))
+
+    def find(self, field: str, value: Any, after: Optional[int] = None) -> Iterator[Record]:
+        """Registros com field == value, em ordem de ID (usa o índice SQL)"""
+        index = self._check_index(field)
+        if isinstance(index, MultiIndex):
+            return self.find_all(field, [value], after)
+
+        # Mesma collation do índice único, para que ele seja usado
+        nocase = isinstance(index, UniqueIndex) and index.ignore_case
+        sql = self._sql["find"].format(field=field, collate=" COLLATE NOCASE" if nocase else "")
+        return self._rows(sql, (self._encode(field, value), after or 0))
+
+    def find_all(
+        self, field: str, values: Iterable[Any], after: Optional[int] = None
+    ) -> Iterator[Record]:
+        """Registros cujo campo lista (ex: tags) contém todos os valores"""
+        if not isinstance(self._check_index(field), MultiIndex):
+            raise TypeError(f"Field '{field}' has no multi-value index")
+
+        values = list(dict.fromkeys(values))
+        if not values:
+            return iter(())
+
+        # Interseção na tabela de junção (um SELECT por valor)
+        side = f"{self.table}_{field}"
+        ids = " INTERSECT ".join(
+            f"SELECT id FROM {side} WHERE value = ? AND id > ?" for _ in values
+        )
+        sql = self._sql["find_all"].format(ids=ids)
+        params = tuple(part for value in values for part in (value, after or 0))
+        return self._rows(sql, params)
+
+    def counts(self, field: str) -> Dict[Any, int]:
+        """Quantidade de registros por valor do campo"""
+        if isinstance(self._check_index(field), MultiIndex):
+            # Contagens mantidas pelos triggers: O(valores distintos)
+            sql = f"SELECT value, count FROM {self.table}_{field}_counts"
+            return dict(self._connect().execute(sql).fetchall())
+
+        decode = self._decoders[field]
+        sql = (
+            f"SELECT {field}, COUNT(*) FROM {self.table} "
+            f"WHERE {field} IS NOT NULL GROUP BY {field}"
+        )
+        return {decode(value): count for value, count in self._connect().execute(sql)}
+
+    def range(
+        self,
+        field: str,
+        min_value: Any = None,
+        max_value: Any = None,
+        after: Optional[Tuple[Any, int]] = None
+    ) -> Iterator[Record]:
+        """Registros com min_value <= field <= max_value, em ordem de (field, id)"""
+        if not isinstance(self._check_index(field), SortedIndex):
+            raise TypeError(f"Field '{field}' has no sorted index")
+
+        # Poucas combinações possíveis: cada uma vira um statement em cache
+        where, params = [f"{field} IS NOT NULL"], []
+        if min_value is not None:
+            where.append(f"{field} >= ?")
+            params.append(self._encode(field, min_value))
+        if max_value is not None:
+            where.append(f"{field} <= ?")
+            params.append(self._encode(field, max_value))
+        if after is not None:
+            where.append(f"({field}, id) > (?, ?)")
+            params.extend((self._encode(field, after[0]), after[1]))
+
+        sql = self._sql["range"].format(field=field, where=" AND ".join(where))
+        return self._rows(sql, tuple(params))
+
+    def clear(self) -> None:
+        """Remove todos os registros e reinicia a sequência de IDs"""
+        conn = self._connect()
+        conn.execute(f"DELETE FROM {self.table}")
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (self.table,))
+
+    def _check_index(self, field: str) -> HashIndex:
+        index = self.indexes.get(field)
+        if index is None:
+            raise KeyError(f"Field '{field}' is not indexed")
+        return index
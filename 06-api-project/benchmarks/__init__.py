@@ -0,0 +1 @@
+"""Benchmarks do projeto (execute a partir de 06-api-project/)"""
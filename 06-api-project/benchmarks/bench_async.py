@@ -0,0 +1,103 @@
+"""
+Benchmark: rotas síncronas (threadpool) vs async (event loop)
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_async
+    python -m benchmarks.bench_async --concurrency 1 64 --requests 5000
+
+Sobe o app em processo (httpx.ASGITransport, sem rede) em cada modo de
+Settings.ASYNC_ROUTES e dispara GET /api/posts/{id} e GET /api/posts com
+vários níveis de concorrência.
+"""
+
+import argparse
+import asyncio
+import importlib
+import random
+import statistics
+import time
+from datetime import datetime
+
+import httpx
+
+from app.config.settings import get_settings
+from app.services.post_service import fake_posts_db
+
+
+def load_app(async_routes: bool):
+    """Importa (ou reimporta) main.py com o modo pedido"""
+    get_settings().ASYNC_ROUTES = async_routes
+    import main
+    return importlib.reload(main).app
+
+
+def seed_posts(count: int) -> None:
+    fake_posts_db.clear()
+    now = datetime.now()
+    fake_posts_db.insert_many(
+        {
+            "title": f"Post {i}",
+            "content": "Conteúdo de exemplo para benchmark",
+            "author_id": i % 100 + 1,
+            "tags": ["bench"],
+            "created_at": now,
+            "updated_at": None
+        }
+        for i in range(count)
+    )
+
+
+async def run_load(app, concurrency: int, requests: int, posts: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    paths = [
+        f"/api/posts/{random.randint(1, posts)}" if i % 2 else "/api/posts?limit=10"
+        for i in range(requests)
+    ]
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = iter(paths)
+
+        async def worker():
+            for path in queue:
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--requests", type=int, default=3_000)
+    parser.add_argument("--posts", type=int, default=10_000)
+    args = parser.parse_args()
+
+    seed_posts(args.posts)
+
+    print(f"{'modo':>6} {'concorrência':>13} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for mode, async_routes in (("sync", False), ("async", True)):
+        app = load_app(async_routes)
+        for concurrency in args.concurrency:
+            result = asyncio.run(run_load(app, concurrency, args.requests, args.posts))
+            print(
+                f"{mode:>6} {concurrency:>13} {result['rps']:>10.0f} "
+                f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+            )
+
+    fake_posts_db.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: GET /{id} com e sem o cache de respostas (backend SQLite)
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_cache
+    python -m benchmarks.bench_cache --size 100000 --ops 50000
+
+Popula um SQLite temporário e lê posts com distribuição Zipf (poucos
+posts quentes, muitos frios), medindo PostService.get_json_by_id com o
+cache desligado e ligado. Depois roda threads lendo e atualizando os
+mesmos posts e confere que nenhuma entrada do cache ficou desatualizada.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from itertools import accumulate
+
+from app.config.settings import get_settings
+
+# O store é criado na importação do service: escolher o backend antes
+_path = os.path.join(tempfile.mkdtemp(), "bench_cache.db")
+get_settings().STORAGE_BACKEND = "sqlite"
+get_settings().DATABASE_URL = f"sqlite:///{_path}"
+
+from app.models.post import PostUpdate  # noqa: E402
+from app.services.post_service import PostService, fake_posts_db, post_cache  # noqa: E402
+
+
+def populate(size: int) -> None:
+    now = datetime.now()
+    fake_posts_db.insert_many(
+        {
+            "title": f"Post {i}",
+            "content": "Conteúdo de exemplo para benchmark",
+            "author_id": i % 1000 + 1,
+            "tags": ["bench"],
+            "created_at": now,
+            "updated_at": None
+        }
+        for i in range(size)
+    )
+
+
+def zipf_ids(size: int, ops: int, seed: int = 42) -> list:
+    """IDs com frequência ~ 1/posição (posts quentes aparecem muito mais)"""
+    cum_weights = list(accumulate(1 / rank for rank in range(1, size + 1)))
+    rng = random.Random(seed)
+    ids = list(range(1, size + 1))
+    rng.shuffle(ids)
+    return rng.choices(ids, cum_weights=cum_weights, k=ops)
+
+
+def time_reads(service: PostService, ids: list) -> float:
+    start = time.perf_counter()
+    for post_id in ids:
+        service.get_json_by_id(post_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def check_fresh(service: PostService, size: int, threads: int, ops: int) -> int:
+    """Threads lendo e atualizando; devolve quantas entradas ficaram velhas"""
+    hot = list(range(1, min(size, 50) + 1))
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        for i in range(ops):
+            post_id = rng.choice(hot)
+            if rng.random() < 0.2:
+                service.update(post_id, PostUpdate(title=f"Título {seed}-{i}"))
+            else:
+                service.get_json_by_id(post_id)
+
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    stale = 0
+    for post_id in hot:
+        cached = post_cache.get(post_id)
+        if cached is not None and cached.body != service._to_json(fake_posts_db.get(post_id)):
+            stale += 1
+    return stale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=50_000)
+    parser.add_argument("--cache-size", type=int, default=get_settings().CACHE_MAX_ENTRIES)
+    args = parser.parse_args()
+
+    populate(args.size)
+    service = PostService()
+    ids = zipf_ids(args.size, args.ops)
+
+    post_cache.max_entries = 0
+    without = time_reads(service, ids)
+
+    post_cache.max_entries = args.cache_size
+    with_cache = time_reads(service, ids)
+    stats = post_cache.stats()
+    hit_ratio = stats["hits"] / max(1, stats["hits"] + stats["misses"])
+
+    print(f"GET post por ID ({args.size} posts, {args.ops} leituras Zipf, µs/op):")
+    print(f"  sem cache   {without:>8.2f}")
+    print(f"  com cache   {with_cache:>8.2f}  ({without / with_cache:.1f}x, {hit_ratio:.0%} hits)")
+    print(f"  contadores  {stats}")
+
+    stale = check_fresh(service, args.size, threads=8, ops=2_000)
+    print(f"entradas desatualizadas após leituras + updates concorrentes: {stale}")
+
+    fake_posts_db.close()
+    shutil.rmtree(os.path.dirname(_path), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Benchmark: subida da API com snapshot em mmap (backend journal)
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_coldstart
+    python -m benchmarks.bench_coldstart --posts 100000 --users 10000
+
+Grava snapshots de `--posts` posts e `--users` usuários (mais um trecho
+de journal) em uma pasta temporária e sobe a API em um processo novo,
+medindo:
+- importação da app (stores abertos: snapshot + replay do journal)
+- primeira resposta de cada rota (registros e índices lidos sob demanda)
+- quando a busca textual (montada em segundo plano) fica pronta
+- memória residente logo após as primeiras respostas e no fim
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROUTES = [
+    "/api/posts/{middle}",
+    "/api/posts?limit=20",
+    "/api/posts?tag=tag7&tag=bench&limit=20",
+    "/api/posts?author_id=42&limit=20",
+    "/api/posts/tags",
+    "/api/users/by-email/user{middle_user}@example.com",
+    "/api/users?role=admin&limit=20",
+    "/api/users?min_age=30&max_age=31&limit=20",
+    "/api/posts/search?q=post",
+]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def populate(directory: str, posts: int, users: int, tail: int) -> None:
+    """Snapshots gravados direto (como os da compactação) + `tail` escritas no journal"""
+    from app.services.post_service import PostRecord
+    from app.services.user_service import UserRecord
+    from app.storage import HashIndex, JournaledStore, MultiIndex, SortedIndex, UniqueIndex
+    from app.storage.snapshot import write_snapshot
+
+    now = datetime.now()
+    post_rows = (
+        (i, (f"Post {i}", "Conteúdo de exemplo para benchmark", i % 1000 + 1,
+             ["bench", f"tag{i % 50}"], now, None), None)
+        for i in range(1, posts + 1)
+    )
+    user_rows = (
+        (i, (f"User {i}", f"user{i}@example.com", 18 + i % 60,
+             "admin" if i % 10 == 0 else "user", now, None), None)
+        for i in range(1, users + 1)
+    )
+
+    for table, record_type, indexes, rows, size in (
+        ("posts", PostRecord, [HashIndex("author_id"), MultiIndex("tags")], post_rows, posts),
+        ("users", UserRecord,
+         [HashIndex("role"), SortedIndex("age"), UniqueIndex("email", ignore_case=True)],
+         user_rows, users),
+    ):
+        header = {
+            "table": table,
+            "columns": list(record_type.columns),
+            "next_id": size + 1,
+            "segment": 0,
+        }
+        write_snapshot(os.path.join(directory, f"{table}.snapshot"), header, rows, indexes)
+
+    # Escritas depois do snapshot: a subida também reaplica o journal
+    store = JournaledStore(
+        directory, "posts", PostRecord, indexes=[HashIndex("author_id"), MultiIndex("tags")],
+        fsync="off"
+    )
+    for i in range(tail):
+        store.update(i * 7 % posts + 1, {"title": f"Novo {i}", "updated_at": now})
+    store.close()
+
+
+def child(directory: str) -> None:
+    """Roda no processo novo: sobe a app e imprime as medições em JSON"""
+    start = time.perf_counter()
+
+    from app.config.settings import get_settings
+    get_settings().STORAGE_BACKEND = "journal"
+    get_settings().JOURNAL_DIR = directory
+
+    from fastapi.testclient import TestClient
+    from main import app
+    from app.services.post_service import fake_posts_db, post_search
+    from app.services.user_service import fake_users_db
+
+    result = {"import": time.perf_counter() - start, "routes": {}}
+    result["recovery"] = {
+        "posts": fake_posts_db.recovery["seconds"],
+        "users": fake_users_db.recovery["seconds"],
+        "journal_entries": fake_posts_db.recovery["journal_entries"],
+    }
+
+    client = TestClient(app)
+    for route in ROUTES:
+        path = route.format(middle=len(fake_posts_db) // 2, middle_user=len(fake_users_db) // 2)
+        route_start = time.perf_counter()
+        response = client.get(path)
+        result["routes"][route] = (response.status_code, (time.perf_counter() - route_start) * 1000)
+    result["first_responses"] = time.perf_counter() - start
+    result["rss_serving"] = rss_mb()
+
+    while not post_search.ready:
+        time.sleep(0.05)
+    result["search_ready"] = time.perf_counter() - start
+    result["search_status"] = client.get("/api/posts/search?q=post").status_code
+    result["rss_end"] = rss_mb()
+
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--tail", type=int, default=10_000)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    directory = tempfile.mkdtemp()
+    start = time.perf_counter()
+    populate(directory, args.posts, args.users, args.tail)
+    size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+    print(
+        f"Dados: {args.posts} posts + {args.users} usuários + {args.tail} escritas no journal "
+        f"({size / 1e6:.0f} MB, gravados em {time.perf_counter() - start:.1f}s)"
+    )
+
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_coldstart", "--child", directory],
+        check=True, stdout=subprocess.PIPE, text=True
+    ).stdout
+    result = json.loads(output.splitlines()[-1])
+    shutil.rmtree(directory, ignore_errors=True)
+
+    recovery = result["recovery"]
+    print(
+        f"Importação da app:       {result['import']:.2f}s "
+        f"(stores: posts {recovery['posts']:.2f}s com {recovery['journal_entries']} "
+        f"entradas do journal, usuários {recovery['users']:.2f}s)"
+    )
+    for route, (status, ms) in result["routes"].items():
+        print(f"  {status}  {ms:7.1f} ms  {route}")
+    print(f"Primeiras respostas:     {result['first_responses']:.2f}s após o início do processo "
+          f"(RSS {result['rss_serving']:.0f} MB)")
+    print(f"Busca textual pronta:    {result['search_ready']:.2f}s "
+          f"(status {result['search_status']}, RSS {result['rss_end']:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
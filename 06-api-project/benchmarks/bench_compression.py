@@ -0,0 +1,131 @@
+"""
+Benchmark: compressão das respostas (CPU x bytes na rede)
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_compression
+    python -m benchmarks.bench_compression --content-size 4000 --ops 200
+
+Monta a resposta real de GET /api/posts?limit=100 (posts com conteúdo
+longo) e a passa pelo CompressionMiddleware com gzip e deflate em vários
+níveis. Para cada combinação mostra os bytes enviados, o tempo de CPU do
+middleware por resposta e o tempo total estimado (CPU + transferência)
+em algumas larguras de banda.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api.compression import CompressionMiddleware
+from app.models.post import PostCreate
+from app.services.post_service import post_service
+from main import app
+
+# Larguras de banda para estimar o tempo na rede (Mbit/s)
+BANDWIDTHS = [10, 100, 1000]
+
+WORDS = """
+    python fastapi pydantic store índice cache busca resposta servidor cliente
+    registro consulta página cursor banco memória thread processo latência rede
+    compressão benchmark desempenho código função classe módulo teste dados
+""".split()
+
+
+def populate(count: int, content_size: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        words = []
+        size = 0
+        while size < content_size:
+            word = rng.choice(WORDS)
+            words.append(word)
+            size += len(word) + 1
+        items.append(PostCreate(
+            title=f"Post {i} sobre {rng.choice(WORDS)}",
+            content=" ".join(words),
+            author_id=rng.randint(1, 100),
+            tags=rng.sample(WORDS, 3)
+        ))
+    post_service.bulk_create(items)
+
+
+def list_body() -> bytes:
+    """JSON de uma página de 100 posts, sem compressão"""
+    response = TestClient(app).get(
+        "/api/posts", params={"limit": 100}, headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in response.headers
+    return response.content
+
+
+def time_middleware(body: bytes, encoding: str, level: int, ops: int) -> tuple:
+    """(bytes enviados, µs de CPU por resposta) passando `body` pelo middleware"""
+
+    async def endpoint(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    middleware = CompressionMiddleware(endpoint, minimum_size=1024, level=level)
+    scope = {
+        "type": "http",
+        "headers": [(b"accept-encoding", encoding.encode())],
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            sent.append(len(message.get("body", b"")))
+
+    async def run():
+        start = time.perf_counter()
+        for _ in range(ops):
+            await middleware(scope, receive, send)
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    return sum(sent) // ops, elapsed / ops * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--content-size", type=int, default=2000)
+    parser.add_argument("--ops", type=int, default=300)
+    args = parser.parse_args()
+
+    populate(args.posts, args.content_size)
+    body = list_body()
+
+    print(f"GET /api/posts?limit=100: {len(body)} bytes sem compressão "
+          f"(conteúdo ~{args.content_size} caracteres por post)")
+    header = " ".join(f"{f'{bw} Mbit/s':>12}" for bw in BANDWIDTHS)
+    print(f"{'formato':>10} {'nível':>5} {'bytes':>9} {'razão':>6} {'CPU µs':>9}  {header}  (µs: CPU + rede)")
+
+    cases = [("identity", 0)] + [
+        (encoding, level) for encoding in ("gzip", "deflate") for level in (1, 6, 9)
+    ]
+    for encoding, level in cases:
+        if encoding == "identity":
+            size, cpu = len(body), 0.0
+        else:
+            size, cpu = time_middleware(body, encoding, level, args.ops)
+        totals = " ".join(f"{cpu + size * 8 / bw:>12.0f}" for bw in BANDWIDTHS)
+        print(f"{encoding:>10} {level:>5} {size:>9} {size / len(body):>6.1%} {cpu:>9.0f}  {totals}")
+
+
+if __name__ == "__main__":
+    main()
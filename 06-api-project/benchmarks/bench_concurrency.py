@@ -0,0 +1,142 @@
+"""
+Stress test: várias threads fazendo create/update/delete ao mesmo tempo
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_concurrency
+    python -m benchmarks.bench_concurrency --threads 1 4 16 --ops 20000
+
+Mede a vazão (ops/s) e confere a consistência no final:
+- nenhum ID duplicado entre os creates
+- tamanho do store == creates - deletes bem-sucedidos
+- índices (role, age, email) batendo com os registros
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from app.models.user import UserCreate, UserUpdate, UserRole
+from app.services.user_service import UserService, fake_users_db
+
+ROLES = list(UserRole)
+
+
+def worker(service: UserService, ops: int, seed: int, results: dict) -> None:
+    rng = random.Random(seed)
+    created, deleted = [], 0
+    payloads = [
+        UserCreate(
+            name=f"User {seed}-{i}",
+            email=f"user{seed}-{i}@example.com",
+            age=rng.randint(18, 90),
+            password="password123",
+            role=rng.choice(ROLES)
+        )
+        for i in range(64)
+    ]
+
+    for i in range(ops):
+        op = rng.random()
+        if op < 0.5 or not created:
+            # Email único por create (o índice de email recusa repetidos)
+            payload = payloads[i % len(payloads)].model_copy(
+                update={"email": f"user{seed}-{i}@example.com"}
+            )
+            created.append(service.create(payload).id)
+        elif op < 0.8:
+            patch = UserUpdate(age=rng.randint(18, 90))
+            service.update(rng.choice(created), patch)
+            # Também altera usuários de outras threads
+            service.update(rng.randint(1, max(1, len(fake_users_db))), patch)
+        else:
+            user_id = created.pop(rng.randrange(len(created)))
+            deleted += service.delete(user_id)
+
+    results[seed] = {"created": created, "deleted": deleted}
+
+
+def check_consistency(results: dict) -> list:
+    """Lista de problemas encontrados (vazia = tudo certo)"""
+    problems = []
+    alive = [user_id for result in results.values() for user_id in result["created"]]
+
+    if len(alive) != len(set(alive)):
+        problems.append("IDs duplicados entre os creates")
+    if len(fake_users_db) != len(alive):
+        problems.append(f"store tem {len(fake_users_db)} registros, esperado {len(alive)}")
+
+    users = {user.id: user for user in fake_users_db.scan()}
+    if set(users) != set(alive):
+        problems.append("registros do store diferentes dos criados e não deletados")
+
+    for role in ROLES:
+        indexed = {user.id for user in fake_users_db.find("role", role.value)}
+        expected = {i for i, user in users.items() if user.role == role.value}
+        if indexed != expected or fake_users_db.indexes["role"].count(role.value) != len(expected):
+            problems.append(f"índice de role '{role.value}' inconsistente")
+
+    by_age = [user.id for user in fake_users_db.range("age")]
+    if sorted(by_age) != sorted(users) or len(by_age) != len(users):
+        problems.append("índice de idade inconsistente")
+
+    emails = fake_users_db.indexes["email"]
+    if len(emails.counts()) != len(users) or any(
+        emails.get(user.email) != user_id for user_id, user in users.items()
+    ):
+        problems.append("índice de email inconsistente")
+
+    return problems
+
+
+def run(threads: int, ops: int) -> dict:
+    fake_users_db.clear()
+    service = UserService()
+    results: dict = {}
+
+    pool = [
+        threading.Thread(target=worker, args=(service, ops // threads, seed, results))
+        for seed in range(threads)
+    ]
+
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "threads": threads,
+        "ops_per_sec": ops / elapsed,
+        "problems": check_consistency(results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--ops", type=int, default=40_000, help="total de operações por rodada")
+    parser.add_argument(
+        "--switch-interval", type=float, default=1e-6,
+        help="sys.setswitchinterval: valores baixos forçam mais trocas de thread"
+    )
+    args = parser.parse_args()
+
+    sys.setswitchinterval(args.switch_interval)
+
+    print(f"{'threads':>8} {'ops/s':>12}  consistência")
+    failed = False
+    for threads in args.threads:
+        result = run(threads, args.ops)
+        status = "ok" if not result["problems"] else "; ".join(result["problems"])
+        failed |= bool(result["problems"])
+        print(f"{result['threads']:>8} {result['ops_per_sec']:>12.0f}  {status}")
+
+    fake_users_db.clear()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""
+Benchmark: todas as rotas de usuários e posts, com baseline e limites de regressão
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_http
+    python -m benchmarks.bench_http --scenario posts.get --concurrency 1 64
+    python -m benchmarks.bench_http --update-baseline
+
+Sobe o app de main.py em processo (httpx.ASGITransport, sem rede), gera
+`--users` usuários e `--posts` posts com uma semente fixa (mesmos dados a
+cada execução) e roda cada cenário (uma rota, com parâmetros realistas)
+em cada nível de `--concurrency`, `--rounds` vezes (vale a melhor rodada).
+
+O resultado é comparado com o baseline (benchmarks/http_baseline.json):
+a execução falha (código 1) se algum cenário ficar abaixo do req/s ou
+acima da latência permitidos pelos limites do arquivo ("thresholds",
+globais ou por cenário), ou se alguma resposta vier com status
+inesperado. Os valores esperados são escalados por uma calibração de CPU
+(medida na gravação e de novo a cada execução), então uma máquina mais
+lenta não vira regressão; ainda assim, o baseline é mais confiável na
+máquina onde foi gravado (em outra, grave um novo com --update-baseline).
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from app.services.post_service import fake_posts_db, post_search
+from app.services.user_service import fake_users_db
+from main import app
+
+BASELINE = os.path.join(os.path.dirname(__file__), "http_baseline.json")
+
+# Limites padrão de um baseline novo: piora tolerada em relação a ele
+THRESHOLDS = {"rps_drop": 0.30, "p50_increase": 0.50, "p99_increase": 1.00}
+
+WORDS = (
+    "python fastapi react node async cache index store journal snapshot "
+    "busca rota api json http worker thread banco memória teste dados"
+).split()
+TAGS = [f"tag{i}" for i in range(50)]
+
+# (método, caminho, corpo JSON ou bytes)
+Request = Tuple[str, str, Any]
+
+
+class Scenario(NamedTuple):
+    """
+    Uma rota com parâmetros realistas
+
+    - request(i, rng, state): a i-ésima requisição do cenário
+    - setup(rng): estado preparado fora da medição (ex: IDs para deletar)
+    - status: status esperado
+    """
+    name: str
+    request: Callable[[int, random.Random, Any], Request]
+    status: int = 200
+    setup: Optional[Callable[[random.Random, int], Any]] = None
+
+
+def seed_data(users: int, posts: int, seed: int) -> None:
+    """Gera os dados direto nos stores (sempre os mesmos para a mesma semente)"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    fake_users_db.clear()
+    fake_posts_db.clear()
+
+    fake_users_db.insert_many(
+        {
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "age": 18 + i % 60,
+            "role": "admin" if i % 10 == 0 else "user",
+            "created_at": start + timedelta(minutes=i),
+            "updated_at": None
+        }
+        for i in range(1, users + 1)
+    )
+    for offset in range(0, posts, 10_000):
+        fake_posts_db.insert_many(
+            {
+                "title": " ".join(rng.choices(WORDS, k=4)),
+                "content": " ".join(rng.choices(WORDS, k=30)),
+                "author_id": rng.randint(1, users),
+                "tags": rng.sample(TAGS, 3),
+                "created_at": start + timedelta(minutes=i),
+                "updated_at": None
+            }
+            for i in range(offset, min(posts, offset + 10_000))
+        )
+    post_search.rebuild(fake_posts_db.scan())
+
+
+def _new_user(i: int, rng: random.Random) -> dict:
+    return {
+        "name": f"Bench {i}",
+        "email": f"bench-{rng.getrandbits(64):x}@example.com",
+        "age": rng.randint(18, 80),
+        "password": "12345678",
+    }
+
+
+def _new_post(rng: random.Random, users: int) -> dict:
+    return {
+        "title": " ".join(rng.choices(WORDS, k=4)),
+        "content": " ".join(rng.choices(WORDS, k=30)),
+        "author_id": rng.randint(1, users),
+        "tags": rng.sample(TAGS, 3),
+    }
+
+
+def _created_ids(store, items: Callable[[int], dict]) -> Callable[[random.Random, int], List[int]]:
+    """setup de cenários de delete: registros novos, um por requisição"""
+    def setup(rng: random.Random, count: int) -> List[int]:
+        now = datetime.now()
+        records = store.insert_many([{**items(i), "created_at": now, "updated_at": None}
+                                     for i in range(count)])
+        return [record.id for record in records]
+    return setup
+
+
+def scenarios(users: int, posts: int) -> List[Scenario]:
+    def user_id(rng: random.Random) -> int:
+        return rng.randint(1, users)
+
+    def post_id(rng: random.Random) -> int:
+        return rng.randint(1, posts)
+
+    def extra_user(i: int) -> dict:
+        return {"name": f"Del {i}", "email": f"del-{time.time_ns()}-{i}@example.com",
+                "age": 30, "role": "user"}
+
+    def extra_post(i: int) -> dict:
+        return {"title": f"Del {i}", "content": "post para deletar no benchmark",
+                "author_id": 1, "tags": ["del"]}
+
+    return [
+        # users.py
+        Scenario("users.list", lambda i, rng, _: (
+            "GET", f"/api/users?limit=20&skip={rng.randint(0, 100)}", None)),
+        Scenario("users.list_filtered", lambda i, rng, _: (
+            "GET", f"/api/users?role=admin&min_age={rng.randint(18, 60)}&max_age=70&limit=20", None)),
+        Scenario("users.export", lambda i, rng, _: (
+            "GET", f"/api/users/export?role=admin&min_age={rng.randint(70, 77)}", None)),
+        Scenario("users.bulk", lambda i, rng, _: (
+            "POST", "/api/users/bulk",
+            {"create": [_new_user(i, rng) for _ in range(5)],
+             "update": {str(user_id(rng)): {"age": rng.randint(18, 80)} for _ in range(5)}})),
+        Scenario("users.by_email", lambda i, rng, _: (
+            "GET", f"/api/users/by-email/user{user_id(rng)}@example.com", None)),
+        Scenario("users.get", lambda i, rng, _: ("GET", f"/api/users/{user_id(rng)}", None)),
+        Scenario("users.create", lambda i, rng, _: ("POST", "/api/users", _new_user(i, rng)),
+                 status=201),
+        Scenario("users.update", lambda i, rng, _: (
+            "PUT", f"/api/users/{user_id(rng)}", {"age": rng.randint(18, 80)})),
+        Scenario("users.delete", lambda i, rng, ids: ("DELETE", f"/api/users/{ids[i]}", None),
+                 status=204, setup=_created_ids(fake_users_db, extra_user)),
+        # posts.py
+        Scenario("posts.list", lambda i, rng, _: (
+            "GET", f"/api/posts?limit=20&skip={rng.randint(0, 100)}", None)),
+        Scenario("posts.list_filtered", lambda i, rng, _: (
+            "GET", f"/api/posts?tag={rng.choice(TAGS)}&tag={rng.choice(TAGS)}&limit=20", None)),
+        Scenario("posts.tags", lambda i, rng, _: ("GET", "/api/posts/tags", None)),
+        Scenario("posts.search", lambda i, rng, _: (
+            "GET", f"/api/posts/search?q={'+'.join(rng.sample(WORDS, 2))}&limit=20", None)),
+        Scenario("posts.export", lambda i, rng, _: (
+            "GET", f"/api/posts/export?author_id={user_id(rng)}", None)),
+        Scenario("posts.import", lambda i, rng, _: (
+            "POST", "/api/posts/import",
+            "\n".join(json.dumps(_new_post(rng, users)) for _ in range(50)).encode())),
+        Scenario("posts.bulk", lambda i, rng, _: (
+            "POST", "/api/posts/bulk",
+            {"create": [_new_post(rng, users) for _ in range(5)],
+             "update": {str(post_id(rng)): {"title": "Editado no bulk"} for _ in range(5)}})),
+        Scenario("posts.get", lambda i, rng, _: ("GET", f"/api/posts/{post_id(rng)}", None)),
+        Scenario("posts.create", lambda i, rng, _: ("POST", "/api/posts", _new_post(rng, users)),
+                 status=201),
+        Scenario("posts.update", lambda i, rng, _: (
+            "PUT", f"/api/posts/{post_id(rng)}", {"title": " ".join(rng.choices(WORDS, k=3))})),
+        Scenario("posts.delete", lambda i, rng, ids: ("DELETE", f"/api/posts/{ids[i]}", None),
+                 status=204, setup=_created_ids(fake_posts_db, extra_post)),
+    ]
+
+
+async def run_scenario(
+    scenario: Scenario, concurrency: int, requests: int, seed: int
+) -> Dict[str, float]:
+    rng = random.Random(f"{seed}-{scenario.name}-{concurrency}")
+    state = scenario.setup(rng, requests) if scenario.setup else None
+    planned = [scenario.request(i, rng, state) for i in range(requests)]
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = iter(planned)
+
+        async def worker() -> None:
+            for method, path, body in queue:
+                if isinstance(body, bytes):
+                    kwargs = {"content": body, "headers": {"Content-Type": "application/x-ndjson"}}
+                else:
+                    kwargs = {"json": body} if body is not None else {}
+                start = time.perf_counter()
+                response = await client.request(method, path, **kwargs)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != scenario.status:
+                    errors.append(f"{method} {path}: {response.status_code}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1e3,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1e3,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def best_of(rounds: List[Dict[str, float]]) -> Dict[str, float]:
+    """Melhor rodada de cada métrica (o ruído da máquina só piora os números)"""
+    best = dict(max(rounds, key=lambda result: result["rps"]))
+    for metric in ("p50_ms", "p95_ms", "p99_ms"):
+        best[metric] = min(result[metric] for result in rounds)
+    best["errors"] = sum(result["errors"] for result in rounds)
+    best["first_error"] = next((r["first_error"] for r in rounds if r["first_error"]), None)
+    return best
+
+
+def calibrate(repeats: int = 7) -> float:
+    """
+    Segundos de uma carga fixa de CPU (JSON + sort, o que as rotas fazem)
+
+    A comparação escala o baseline pela razão entre esta medida e a da
+    gravação: uma máquina mais lenta (ou ocupada) não vira regressão.
+    """
+    data = [{"id": i, "title": f"post {i}", "tags": ["a", "b"]} for i in range(2000)]
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(10):
+            json.loads(json.dumps(data))
+            sorted(data, key=lambda item: item["title"])
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(results: Dict[str, Dict], baseline: Dict, speed: float = 1.0) -> List[str]:
+    """
+    Regressões em relação ao baseline (vazio: tudo dentro dos limites)
+
+    - speed: quanto esta máquina está mais lenta que a do baseline
+      (calibrate() agora / na gravação); escala req/s e latências esperados
+    """
+    defaults = {**THRESHOLDS, **baseline.get("thresholds", {})}
+    regressions = []
+
+    for key, result in results.items():
+        expected = baseline.get("results", {}).get(key)
+        if expected is None:
+            continue
+        limits = {**defaults, **expected.get("thresholds", {})}
+
+        min_rps = expected["rps"] / speed * (1 - limits["rps_drop"])
+        if result["rps"] < min_rps:
+            regressions.append(
+                f"{key}: {result['rps']:.0f} req/s < {min_rps:.0f} (baseline {expected['rps']:.0f})"
+            )
+        for metric, limit in (("p50_ms", "p50_increase"), ("p99_ms", "p99_increase")):
+            max_ms = expected[metric] * speed * (1 + limits[limit])
+            if result[metric] > max_ms:
+                regressions.append(
+                    f"{key}: {metric} {result[metric]:.2f} > {max_ms:.2f} "
+                    f"(baseline {expected[metric]:.2f})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="Rodadas por cenário (vale a melhor)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", nargs="*", help="Só os cenários com estes prefixos")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Grava os resultados como novo baseline (mantém os limites)")
+    parser.add_argument("--output", help="Grava os resultados desta execução em JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed_data(args.users, args.posts, args.seed)
+    # Os dados gerados não entram nas coletas do GC: sem isso, uma coleta
+    # completa no meio de um cenário vira o p99 dele
+    gc.collect()
+    gc.freeze()
+    print(f"Dados: {args.users} usuários, {args.posts} posts (semente {args.seed}, "
+          f"{time.perf_counter() - start:.1f}s)")
+
+    selected = [
+        scenario for scenario in scenarios(args.users, args.posts)
+        if not args.scenario or scenario.name.startswith(tuple(args.scenario))
+    ]
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    calibration = calibrate()
+    print(f"Calibração: {calibration * 1e3:.1f} ms")
+
+    print(f"{'cenário':<22} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'base req/s':>11}")
+    results: Dict[str, Dict] = {}
+    failed = []
+    for scenario in selected:
+        for concurrency in args.concurrency:
+            key = f"{scenario.name}@{concurrency}"
+            result = best_of([
+                asyncio.run(run_scenario(scenario, concurrency, args.requests, args.seed + n))
+                for n in range(args.rounds)
+            ])
+            results[key] = result
+            expected = baseline.get("results", {}).get(key, {}).get("rps")
+            expected = "-" if expected is None else f"{expected:.0f}"
+            print(
+                f"{scenario.name:<22} {concurrency:>5} {result['rps']:>9.0f} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                f"{expected:>11}"
+            )
+            if result["errors"]:
+                failed.append(f"{key}: {result['errors']} erros (ex: {result['first_error']})")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.update_baseline:
+        baseline = {
+            "config": {
+                "users": args.users, "posts": args.posts, "requests": args.requests,
+                "rounds": args.rounds, "seed": args.seed, "python": sys.version.split()[0],
+                "cpus": os.cpu_count(), "calibration_s": round(calibration, 5),
+            },
+            "thresholds": baseline.get("thresholds", THRESHOLDS),
+            "results": {
+                **baseline.get("results", {}),
+                **{
+                    key: {
+                        **{metric: round(value, 3) for metric, value in result.items()
+                           if metric in ("rps", "p50_ms", "p95_ms", "p99_ms")},
+                        # Limites por cenário definidos à mão continuam valendo
+                        **({"thresholds": baseline["results"][key]["thresholds"]}
+                           if "thresholds" in baseline.get("results", {}).get(key, {}) else {}),
+                    }
+                    for key, result in results.items()
+                },
+            },
+        }
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2)
+            file.write("\n")
+        print(f"Baseline gravado em {args.baseline}")
+    elif baseline:
+        config = baseline.get("config", {})
+        if (config.get("users"), config.get("posts")) != (args.users, args.posts):
+            print(f"Aviso: baseline gravado com {config.get('users')} usuários e "
+                  f"{config.get('posts')} posts")
+        speed = calibration / config.get("calibration_s", calibration)
+        print(f"Máquina {speed:.2f}x o tempo da calibração do baseline")
+        failed.extend(compare(results, baseline, speed))
+
+    if failed:
+        print("\nFALHOU:")
+        for line in failed:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: store em memória com journal (durabilidade e recuperação)
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_journal
+    python -m benchmarks.bench_journal --size 100000 --writes 2000
+
+1. Escritas por modo de fsync ("commit", "batch", "off"), com 1 e 8
+   threads: µs por escrita e quantos fsyncs foram feitos (no "commit",
+   escritas concorrentes dividem o mesmo fsync: group commit)
+2. Recuperação de `--size` posts:
+   - só journal (todos os inserts reaplicados)
+   - snapshot + journal com `--tail` escritas depois do snapshot
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from app.services.post_service import PostRecord
+from app.storage import HashIndex, JournaledStore, MultiIndex
+
+INDEXES = lambda: [HashIndex("author_id"), MultiIndex("tags")]  # noqa: E731
+
+
+def make_post(i: int, now: datetime) -> dict:
+    return {
+        "title": f"Post {i}",
+        "content": "Conteúdo de exemplo para benchmark",
+        "author_id": i % 1000 + 1,
+        "tags": ["bench", f"tag{i % 50}"],
+        "created_at": now,
+        "updated_at": None
+    }
+
+
+def open_store(directory: str, fsync: str = "off") -> JournaledStore:
+    # Snapshots só quando o benchmark pedir
+    return JournaledStore(
+        directory, "posts", PostRecord, indexes=INDEXES(),
+        fsync=fsync, snapshot_bytes=1 << 62
+    )
+
+
+def bench_writes(writes: int, threads: int, fsync: str) -> tuple:
+    """(µs por escrita, fsyncs, entradas) com `threads` threads inserindo"""
+    directory = tempfile.mkdtemp()
+    store = open_store(directory, fsync)
+    now = datetime.now()
+    per_thread = writes // threads
+
+    def worker(offset: int) -> None:
+        for i in range(per_thread):
+            store.insert(make_post(offset + i, now))
+
+    pool = [threading.Thread(target=worker, args=(t * per_thread,)) for t in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    store.close()
+    journal = store._journal
+    shutil.rmtree(directory, ignore_errors=True)
+    return elapsed / (per_thread * threads) * 1e6, journal.fsyncs, journal.entries
+
+
+def bench_recovery(size: int, tail: int) -> None:
+    directory = tempfile.mkdtemp()
+    now = datetime.now()
+
+    start = time.perf_counter()
+    store = open_store(directory)
+    for offset in range(0, size, 10_000):
+        store.insert_many(make_post(i, now) for i in range(offset, min(size, offset + 10_000)))
+    store.close()
+    print(f"  carga: {size} inserts em {time.perf_counter() - start:.1f}s")
+
+    store = open_store(directory)
+    report("só journal", store, directory)
+
+    start = time.perf_counter()
+    store.snapshot()
+    print(f"  snapshot: {time.perf_counter() - start:.1f}s")
+
+    for i in range(tail):
+        post_id = i * 7 % size + 1
+        if i % 10 == 0:
+            store.delete(post_id)
+        else:
+            store.update(post_id, {"title": f"Novo {i}", "updated_at": now})
+    store.close()
+
+    store = open_store(directory)
+    report(f"snapshot + {tail} no journal", store, directory)
+    store.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def report(label: str, store: JournaledStore, directory: str) -> None:
+    stats = store.recovery
+    files = sum(
+        os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+    )
+    print(
+        f"  {label:<28} {stats['seconds']:>6.2f}s "
+        f"(snapshot {stats['snapshot_seconds']:.2f}s: {stats['snapshot_records']} registros; "
+        f"journal: {stats['journal_entries']} entradas) "
+        f"{len(store)} posts, {files / 1e6:.0f} MB em disco"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--tail", type=int, default=100_000)
+    parser.add_argument("--writes", type=int, default=4_000)
+    args = parser.parse_args()
+
+    print(f"Escritas ({args.writes} inserts):")
+    print(f"{'fsync':>8} {'threads':>8} {'µs/escrita':>11} {'fsyncs':>8} {'entradas':>9}")
+    for fsync in ("commit", "batch", "off"):
+        for threads in (1, 8):
+            us, fsyncs, entries = bench_writes(args.writes, threads, fsync)
+            print(f"{fsync:>8} {threads:>8} {us:>11.1f} {fsyncs:>8} {entries:>9}")
+
+    print(f"Recuperação ({args.size} posts):")
+    bench_recovery(args.size, args.tail)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: memória por post (dicts vs registros com __slots__)
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --size 100000
+
+Mede com tracemalloc os bytes alocados por post guardado:
+- antes: um dict por post, com as tags em uma lista
+- depois: MemoryStore com PostRecord (__slots__, tags internadas)
+
+As tags são montadas com join para serem strings novas, como as que
+chegam do JSON de cada requisição (literais já seriam compartilhadas).
+"""
+
+import argparse
+import gc
+import tracemalloc
+from datetime import datetime
+
+from app.services.post_service import PostRecord
+from app.storage import MemoryStore
+
+TAGS = [["pyt", "hon"], ["fast", "api"], ["bench", "mark"]]
+
+
+def make_post(i: int, now: datetime) -> dict:
+    return {
+        "title": f"Post {i}",
+        "content": "Conteúdo de exemplo para benchmark",
+        "author_id": i % 1000 + 1,
+        "tags": ["".join(part) for part in TAGS[: i % 3 + 1]],
+        "created_at": now,
+        "updated_at": None
+    }
+
+
+def measure(build, size: int) -> float:
+    """Bytes por post retidos por build(size)"""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = build(size)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return (after - before) / size
+
+
+def build_dicts(size: int) -> dict:
+    """Layout antigo: id -> dict"""
+    now = datetime.now()
+    rows = {}
+    for i in range(1, size + 1):
+        row = make_post(i, now)
+        row["id"] = i
+        rows[i] = row
+    return rows
+
+
+def build_records(size: int) -> MemoryStore:
+    """Layout atual: MemoryStore com PostRecord"""
+    now = datetime.now()
+    store = MemoryStore(PostRecord)
+    for i in range(1, size + 1):
+        store.insert(make_post(i, now))
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    dicts = measure(build_dicts, args.size)
+    records = measure(build_records, args.size)
+
+    print(f"memória por post ({args.size} posts, bytes):")
+    print(f"  dicts       {dicts:>8.0f}  ({dicts * args.size / 2**20:.0f} MiB)")
+    print(f"  registros   {records:>8.0f}  ({records * args.size / 2**20:.0f} MiB)")
+    print(f"  economia    {1 - records / dicts:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: busca textual (índice invertido vs varredura de substring)
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --size 100000
+
+Gera posts com vocabulário de distribuição Zipf (poucos termos muito
+comuns, muitos raros), indexa e mede a latência de buscas AND/OR com
+termos raros e comuns. A varredura é o que a busca custaria sem índice.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime
+from itertools import accumulate
+
+from app.services.post_service import PostService, fake_posts_db, post_search
+
+VOCABULARY = [f"termo{i}" for i in range(20_000)]
+# Zipf: o termo de posição r aparece com frequência ~ 1/r (pesos acumulados)
+CUM_WEIGHTS = list(accumulate(1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+TAGS = ["python", "fastapi", "react", "node", "sql", "cache", "async", "api"]
+
+QUERIES = [
+    ("raro", "termo15000", "and"),
+    ("médio", "termo500", "and"),
+    ("comum", "termo1", "and"),
+    ("AND comum+médio", "termo1 termo500", "and"),
+    ("AND médio+raro", "termo500 termo15000", "and"),
+    ("OR médio+raro", "termo500 termo15000", "or"),
+    ("AND comum+comum", "termo1 termo2", "and"),
+    ("OR comum+comum", "termo1 termo2", "or"),
+]
+
+
+def populate(size: int, seed: int = 42) -> None:
+    """Preenche o store direto e reconstrói o índice uma vez"""
+    rng = random.Random(seed)
+    fake_posts_db.clear()
+    now = datetime.now()
+
+    for i in range(size):
+        words = rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=12)
+        fake_posts_db.insert({
+            "title": " ".join(words[:3]),
+            "content": " ".join(words[3:]),
+            "author_id": i % 1000 + 1,
+            "tags": rng.sample(TAGS, 2),
+            "created_at": now,
+            "updated_at": None
+        })
+
+
+def median_ms(func, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(samples)
+
+
+def scan(term: str) -> list:
+    """Sem índice: substring em todos os posts (ranquear exige ver todos)"""
+    return [
+        post for post in fake_posts_db.scan()
+        if term in post.title.lower() or term in post.content.lower() or term in post.tags
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"gerando {args.size} posts...")
+    populate(args.size)
+
+    start = time.perf_counter()
+    post_search.rebuild(fake_posts_db.scan())
+    print(f"indexação: {time.perf_counter() - start:.1f} s")
+
+    service = PostService()
+    print(f"{'busca (10 resultados)':<24} {'índice (ms)':>12}")
+    for label, query, operator in QUERIES:
+        elapsed = median_ms(lambda: service.search(query, operator, limit=10), args.runs)
+        print(f"{label:<24} {elapsed:>12.2f}")
+
+    elapsed = median_ms(lambda: scan("termo15000"), 3)
+    print(f"{'varredura (sem índice)':<24} {elapsed:>12.2f}")
+
+    fake_posts_db.clear()
+    post_search.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: serialização das listas com 100 linhas
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --requests 2000
+
+1. Só a serialização, comparando os dois caminhos:
+   - antes: Model(**registro) por linha + revalidação do response_model
+     + json.dumps
+   - depois: uma validação em lote + TypeAdapter.dump_json direto em bytes
+2. Requisição completa (httpx.ASGITransport, sem rede) para
+   GET /api/users?limit=100 e GET /api/posts?limit=100
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime
+from typing import List
+
+import httpx
+from pydantic import TypeAdapter
+
+from app.models.post import PostResponse
+from app.services.post_service import fake_posts_db, PostService
+from app.services.user_service import fake_users_db
+
+ROWS = 100
+
+
+def seed(count: int) -> None:
+    fake_users_db.clear()
+    fake_posts_db.clear()
+    now = datetime.now()
+    fake_users_db.insert_many(
+        {
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "age": 18 + i % 60,
+            "role": "user",
+            "created_at": now
+        }
+        for i in range(count)
+    )
+    fake_posts_db.insert_many(
+        {
+            "title": f"Post {i}",
+            "content": "Conteúdo de exemplo para benchmark " * 10,
+            "author_id": i % 100 + 1,
+            "tags": ["python", "fastapi", "bench"],
+            "created_at": now,
+            "updated_at": now
+        }
+        for i in range(count)
+    )
+
+
+def time_us(func, repeat: int) -> float:
+    """Melhor de 5 rodadas, em microssegundos por chamada"""
+    rounds = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        rounds.append((time.perf_counter() - start) / repeat * 1e6)
+    return min(rounds)
+
+
+def serialization_only(repeat: int) -> dict:
+    records = [post for _, post in zip(range(ROWS), fake_posts_db.scan())]
+    # Antes os registros eram dicts no store
+    dicts = [post.to_dict() for post in records]
+    adapter = TypeAdapter(List[PostResponse])
+    service = PostService()
+
+    def before():
+        # O que acontecia: validar ao criar, revalidar no response_model, json.dumps
+        models = [PostResponse(**post) for post in dicts]
+        validated = adapter.validate_python(models)
+        return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+    def after():
+        return adapter.dump_json(service._to_responses(records))
+
+    assert json.loads(before()) == json.loads(after())
+    return {"antes": time_us(before, repeat), "depois": time_us(after, repeat)}
+
+
+async def end_to_end(path: str, requests: int) -> float:
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200 and len(response.json()) == ROWS
+
+    return statistics.median(latencies) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1_000)
+    args = parser.parse_args()
+
+    seed(1_000)
+
+    result = serialization_only(args.requests)
+    print(f"serialização de {ROWS} posts (µs):")
+    print(f"  antes  {result['antes']:>10.1f}")
+    print(f"  depois {result['depois']:>10.1f}  ({result['antes'] / result['depois']:.1f}x)")
+
+    print("requisição completa, mediana (µs):")
+    for path in (f"/api/users?limit={ROWS}", f"/api/posts?limit={ROWS}"):
+        print(f"  {path:<24} {asyncio.run(end_to_end(path, args.requests)):>10.1f}")
+
+    fake_users_db.clear()
+    fake_posts_db.clear()
+
+
+if __name__ == "__main__":
+    main()
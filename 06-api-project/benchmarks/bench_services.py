@@ -0,0 +1,284 @@
+"""
+Benchmark: métodos de UserService e PostService por tamanho do store
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_services
+    python -m benchmarks.bench_services --sizes 1000 100000 --ops 500
+    python -m benchmarks.bench_services --compare benchmarks/results/services-1.0.0.json
+
+Sem HTTP: chama os services direto, com `--sizes` usuários e posts
+gerados a partir de uma semente fixa. Para cada método (get_all com e
+sem filtros, get_all com cursor, get_by_id, update e delete):
+
+- us_per_op: tempo por operação (passada sem tracemalloc)
+- alloc_bytes_per_op: memória alocada durante a operação (pico do
+  tracemalloc acima do início, em uma segunda passada)
+- retained_bytes_per_op: o que continua alocado depois dela
+- traced_peak_kb: maior pico de uma operação
+
+Por tamanho, também o pico de RSS do processo (peak_rss_mb, inclui os
+dados gerados). Tudo vai para `--output` em JSON (com a versão da API e
+o commit; por padrão benchmarks/results/services-<versão>-<commit>.json),
+para comparar as curvas de crescimento entre versões com `--compare`
+(que não pode apontar para o próprio `--output`).
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple
+
+from app.config.settings import get_settings
+from app.models.post import PostUpdate
+from app.models.user import UserRole, UserUpdate
+from app.services.post_service import PostService, fake_posts_db
+from app.services.user_service import UserService, fake_users_db
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+RESULTS = os.path.join(os.path.dirname(__file__), "results")
+TAGS = [f"tag{i}" for i in range(50)]
+
+
+class Operation(NamedTuple):
+    """Um método do service; call(i, record_id) faz a i-ésima chamada"""
+    name: str
+    call: Callable[[int, int], object]
+
+
+def populate(size: int, seed: int) -> None:
+    """Preenche os stores direto (sem passar pelos services, para ser rápido)"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    fake_users_db.clear()
+    fake_posts_db.clear()
+
+    for offset in range(0, size, 10_000):
+        batch = range(offset, min(size, offset + 10_000))
+        fake_users_db.insert_many(
+            {
+                "name": f"User {i}",
+                "email": f"user{i}@example.com",
+                "age": 18 + i % 60,
+                "role": "admin" if i % 10 == 0 else "user",
+                "created_at": start + timedelta(seconds=i),
+                "updated_at": None
+            }
+            for i in batch
+        )
+        fake_posts_db.insert_many(
+            {
+                "title": f"Post {i}",
+                "content": "Conteúdo de exemplo para benchmark",
+                "author_id": rng.randint(1, max(1, size // 10)),
+                "tags": rng.sample(TAGS, 3),
+                "created_at": start + timedelta(seconds=i),
+                "updated_at": None
+            }
+            for i in batch
+        )
+
+
+def operations(size: int) -> Dict[str, List[Operation]]:
+    users, posts = UserService(), PostService()
+    user_patch = UserUpdate(age=42)
+    post_patch = PostUpdate(title="Título atualizado")
+    middle = (size // 2,)
+
+    return {
+        "users": [
+            Operation("get_all", lambda i, _: users.get_all(skip=i % 100, limit=20)),
+            Operation("get_all_after", lambda i, _: users.get_all(limit=20, after=middle)),
+            Operation("get_all_filtered", lambda i, _: users.get_all(
+                limit=20, role=UserRole.ADMIN, min_age=18 + i % 40, max_age=70)),
+            Operation("get_by_id", lambda i, record_id: users.get_by_id(record_id)),
+            Operation("update", lambda i, record_id: users.update(record_id, user_patch)),
+            Operation("delete", lambda i, record_id: users.delete(record_id)),
+        ],
+        "posts": [
+            Operation("get_all", lambda i, _: posts.get_all(skip=i % 100, limit=20)),
+            Operation("get_all_after", lambda i, _: posts.get_all(limit=20, after=middle)),
+            Operation("get_all_filtered", lambda i, _: posts.get_all(
+                limit=20, tags=[TAGS[i % len(TAGS)]])),
+            Operation("get_all_by_author", lambda i, record_id: posts.get_all(
+                limit=20, author_id=record_id % max(1, size // 10) + 1)),
+            Operation("get_by_id", lambda i, record_id: posts.get_by_id(record_id)),
+            Operation("update", lambda i, record_id: posts.update(record_id, post_patch)),
+            Operation("delete", lambda i, record_id: posts.delete(record_id)),
+        ],
+    }
+
+
+def measure(operation: Operation, timed_ids: List[int], traced_ids: List[int]) -> Dict[str, float]:
+    """Tempo numa passada e alocações em outra (o tracemalloc deixa tudo mais lento)"""
+    call = operation.call
+    gc.collect()
+
+    start = time.perf_counter()
+    for i, record_id in enumerate(timed_ids):
+        call(i, record_id)
+    elapsed = time.perf_counter() - start
+
+    allocated = retained = peak = 0
+    tracemalloc.start()
+    try:
+        for i, record_id in enumerate(traced_ids):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            call(i, record_id)
+            current, top = tracemalloc.get_traced_memory()
+            allocated += top - before
+            retained += current - before
+            peak = max(peak, top - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "us_per_op": elapsed / len(timed_ids) * 1e6,
+        "alloc_bytes_per_op": allocated / len(traced_ids),
+        "retained_bytes_per_op": retained / len(traced_ids),
+        "traced_peak_kb": peak / 1024,
+    }
+
+
+def run(size: int, ops: int, seed: int) -> Dict:
+    populate(size, seed)
+    rng = random.Random(seed)
+    result: Dict = {"size": size, "services": {}}
+
+    for service, service_operations in operations(size).items():
+        # Metade dos IDs para a passada cronometrada, metade para a do
+        # tracemalloc (delete consome o registro: cada passada tem os seus)
+        ids = rng.sample(range(1, size + 1), min(2 * ops, size))
+        half = len(ids) // 2
+        timed_ids, traced_ids = ids[:half], ids[half:]
+
+        result["services"][service] = {
+            operation.name: measure(operation, timed_ids, traced_ids)
+            for operation in service_operations
+        }
+
+    # ru_maxrss: KB no Linux, bytes no macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mb"] = peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return result
+
+
+def git_commit() -> str:
+    """Commit do código medido ("-dirty" se há alterações ainda não commitadas)"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        changed = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no", "--", "."],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return f"{commit}-dirty" if changed else commit
+
+
+def print_results(results: List[Dict]) -> None:
+    print(f"{'service':<7} {'método':<18} {'registros':>10} {'µs/op':>10} "
+          f"{'bytes/op':>10} {'retidos/op':>11} {'pico KB':>9}")
+    for result in results:
+        for service, measured in result["services"].items():
+            for name, values in measured.items():
+                print(
+                    f"{service:<7} {name:<18} {result['size']:>10} {values['us_per_op']:>10.2f} "
+                    f"{values['alloc_bytes_per_op']:>10.0f} {values['retained_bytes_per_op']:>11.0f} "
+                    f"{values['traced_peak_kb']:>9.1f}"
+                )
+        print(f"pico de RSS com {result['size']} registros: {result['peak_rss_mb']:.0f} MB")
+
+
+def print_comparison(results: List[Dict], previous: Dict) -> None:
+    """µs/op e bytes/op desta execução divididos pelos da anterior (>1: piorou)"""
+    before = {
+        (result["size"], service, name): values
+        for result in previous["results"]
+        for service, measured in result["services"].items()
+        for name, values in measured.items()
+    }
+    print(f"\nComparação com {previous.get('version')} ({previous.get('commit') or '?'}): "
+          "atual / anterior")
+    print(f"{'service':<7} {'método':<18} {'registros':>10} {'µs/op':>8} {'bytes/op':>9}")
+    for result in results:
+        for service, measured in result["services"].items():
+            for name, values in measured.items():
+                old = before.get((result["size"], service, name))
+                if old is None:
+                    continue
+                time_ratio = values["us_per_op"] / old["us_per_op"]
+                alloc_ratio = (values["alloc_bytes_per_op"] / old["alloc_bytes_per_op"]
+                               if old["alloc_bytes_per_op"] else float("nan"))
+                print(f"{service:<7} {name:<18} {result['size']:>10} {time_ratio:>7.2f}x "
+                      f"{alloc_ratio:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--ops", type=int, default=1_000,
+                        help="Operações por método em cada passada")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON dos resultados "
+                        "(padrão: benchmarks/results/services-<versão>-<commit>.json)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    version = get_settings().API_VERSION
+    commit = git_commit()
+    label = commit or datetime.now().strftime("%Y%m%d-%H%M%S")
+    output = args.output or os.path.join(RESULTS, f"services-{version}-{label}.json")
+
+    # Lido antes de medir: a execução não pode sobrescrever a referência
+    previous = None
+    if args.compare:
+        if os.path.realpath(args.compare) == os.path.realpath(output):
+            parser.error(f"--output e --compare são o mesmo arquivo ({output})")
+        with open(args.compare) as file:
+            previous = json.load(file)
+
+    results = []
+    for size in args.sizes:
+        start = time.perf_counter()
+        results.append(run(size, args.ops, args.seed))
+        print(f"{size} registros: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    fake_users_db.clear()
+    fake_posts_db.clear()
+
+    print_results(results)
+
+    report = {
+        "version": version,
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": get_settings().STORAGE_BACKEND,
+        "ops": args.ops,
+        "seed": args.seed,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
+    print(f"\nResultados gravados em {output}")
+
+    if previous is not None:
+        print_comparison(results, previous)
+
+
+if __name__ == "__main__":
+    main()
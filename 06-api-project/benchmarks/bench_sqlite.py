@@ -0,0 +1,98 @@
+"""
+Benchmark: MemoryStore vs SqliteStore
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_sqlite
+    python -m benchmarks.bench_sqlite --sizes 10000 --ops 2000
+
+Mede, por operação: insert, get, update, delete, página de 10 por cursor
+e página de 10 filtrada por author_id (índice).
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from itertools import islice
+
+from app.services.post_service import PostRecord
+from app.storage import HashIndex, MemoryStore, SqliteStore
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+
+def make_post(i: int, now: datetime) -> dict:
+    return {
+        "title": f"Post {i}",
+        "content": "Conteúdo de exemplo para benchmark",
+        "author_id": i % 1000 + 1,
+        "tags": ["bench"],
+        "created_at": now,
+        "updated_at": None
+    }
+
+
+def time_per_op(func, args) -> float:
+    """Executa func(arg) para cada arg e retorna microssegundos por operação"""
+    start = time.perf_counter()
+    for arg in args:
+        func(arg)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def run(store, size: int, ops: int) -> dict:
+    now = datetime.now()
+
+    start = time.perf_counter()
+    for i in range(size):
+        store.insert(make_post(i, now))
+    insert_us = (time.perf_counter() - start) / size * 1e6
+
+    ids = random.sample(range(1, size + 1), min(ops, size))
+    authors = [random.randint(1, 1000) for _ in ids]
+
+    return {
+        "insert": insert_us,
+        "get": time_per_op(store.get, ids),
+        "page": time_per_op(lambda i: list(islice(store.scan(after=i), 10)), ids),
+        "by_author": time_per_op(
+            lambda a: list(islice(store.find("author_id", a), 10)), authors
+        ),
+        "update": time_per_op(lambda i: store.update(i, {"title": "Novo título"}), ids),
+        "delete": time_per_op(store.delete, ids),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--ops", type=int, default=1_000)
+    args = parser.parse_args()
+
+    columns = ["insert", "get", "page", "by_author", "update", "delete"]
+    print(f"{'backend':>8} {'registros':>10} " + " ".join(f"{c:>10}" for c in columns) + "  (µs/op)")
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            stores = {
+                "memory": MemoryStore(PostRecord, indexes=[HashIndex("author_id")]),
+                "sqlite": SqliteStore(
+                    os.path.join(tmp, "bench.db"),
+                    "posts",
+                    PostRecord,
+                    indexes=[HashIndex("author_id")],
+                    sql_indexes=["created_at"]
+                ),
+            }
+
+            for name, store in stores.items():
+                result = run(store, size, args.ops)
+                print(f"{name:>8} {size:>10} " + " ".join(f"{result[c]:>10.2f}" for c in columns))
+
+            stores["sqlite"].close()
+
+
+if __name__ == "__main__":
+    main()
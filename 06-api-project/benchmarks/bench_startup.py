@@ -0,0 +1,142 @@
+"""
+Benchmark: subida da API com routers sob demanda e schema OpenAPI do build
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10
+
+Cada modo sobe em `--runs` processos novos (mediana), medindo:
+- importação: `import fastapi` e depois `import main`
+- primeira resposta de /health, /openapi.json, /api/posts e /api/users
+  (no modo sob demanda, a primeira requisição a um prefixo importa o
+  router, os models e os services)
+- /openapi.json de novo, e com If-None-Match (304)
+- processo: do início do processo até a primeira resposta de /health
+
+Modos:
+- eager: todos os routers na subida (padrão)
+- lazy: Settings.LAZY_ROUTERS com o schema gerado no build
+  (python -m app.api.openapi)
+- lazy sem build: LAZY_ROUTERS sem o arquivo (schema montado no primeiro
+  GET /openapi.json, depois de importar todos os routers)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODE_ENV = "BENCH_STARTUP_MODE"
+SCHEMA_ENV = "BENCH_STARTUP_SCHEMA"
+START_ENV = "BENCH_STARTUP_T0"
+
+MODES = {"eager": "eager", "lazy": "lazy", "lazy sem build": "lazy-nobuild"}
+STEPS = [
+    ("import_fastapi", "import fastapi"),
+    ("import_main", "import main"),
+    ("/health", "1ª /health"),
+    ("/openapi.json", "1ª /openapi.json"),
+    ("/api/posts", "1ª /api/posts"),
+    ("/api/users", "1ª /api/users"),
+    ("/openapi.json again", "2ª /openapi.json"),
+    ("/openapi.json 304", "/openapi.json 304"),
+    ("process_to_health", "processo até /health"),
+]
+
+
+def child() -> None:
+    """Processo medido: importa a app no modo pedido e faz as primeiras requisições"""
+    started = float(os.environ[START_ENV])
+    mode = os.environ[MODE_ENV]
+    timings = {}
+
+    start = time.perf_counter()
+    import fastapi  # noqa: F401
+    timings["import_fastapi"] = time.perf_counter() - start
+
+    from app.config.settings import get_settings
+    settings = get_settings()
+    settings.LAZY_ROUTERS = mode != "eager"
+    settings.OPENAPI_SCHEMA_FILE = os.environ.get(SCHEMA_ENV, "") if mode == "lazy" else ""
+
+    start = time.perf_counter()
+    import main
+    timings["import_main"] = time.perf_counter() - start
+
+    import asyncio
+    import httpx
+
+    async def requests():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def timed(key, path, **kwargs):
+                start = time.perf_counter()
+                response = await client.get(path, **kwargs)
+                timings[key] = time.perf_counter() - start
+                return response
+
+            await timed("/health", "/health")
+            # Relógio do sistema: comparável com o do processo que iniciou este
+            timings["process_to_health"] = time.time() - started
+            first = await timed("/openapi.json", "/openapi.json")
+            await timed("/api/posts", "/api/posts?limit=20")
+            await timed("/api/users", "/api/users?limit=20")
+            await timed("/openapi.json again", "/openapi.json")
+            not_modified = await timed(
+                "/openapi.json 304", "/openapi.json",
+                headers={"If-None-Match": first.headers["etag"]}
+            )
+            assert not_modified.status_code == 304, not_modified.status_code
+
+    asyncio.run(requests())
+    print(json.dumps(timings))
+
+
+def run(mode: str, schema: str) -> dict:
+    env = {**os.environ, MODE_ENV: mode, SCHEMA_ENV: schema, START_ENV: repr(time.time())}
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        schema = os.path.join(directory, "openapi.json")
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "app.api.openapi", "--output", schema],
+            check=True, capture_output=True
+        )
+        print(f"Build do schema: {(time.perf_counter() - start) * 1e3:.0f} ms "
+              f"({os.path.getsize(schema)} bytes)")
+
+        medians = {}
+        for label, mode in MODES.items():
+            # Rodada de aquecimento descartada (.pyc e cache de disco)
+            run(mode, schema)
+            runs = [run(mode, schema) for _ in range(args.runs)]
+            medians[label] = {key: statistics.median(r[key] for r in runs) for key, _ in STEPS}
+
+    print(f"\nmediana de {args.runs} processos (ms)")
+    print(f"{'etapa':<24}" + "".join(f"{label:>16}" for label in MODES))
+    for key, name in STEPS:
+        print(f"{name:<24}" + "".join(f"{medians[label][key] * 1e3:>16.2f}" for label in MODES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: latência de get_by_id/update/delete por tamanho do store
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_store
+    python -m benchmarks.bench_store --sizes 1000 100000 --ops 2000
+
+Com o store indexado por ID a latência deve ficar estável de 1k a 1M
+registros (O(1)); com a lista antiga ela crescia linearmente.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+
+from app.models.post import PostUpdate
+from app.services.post_service import PostService, fake_posts_db
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def populate(size: int) -> None:
+    """Preenche o store direto (sem passar pelo service, para ser rápido)"""
+    fake_posts_db.clear()
+    now = datetime.now()
+    for i in range(size):
+        fake_posts_db.insert({
+            "title": f"Post {i}",
+            "content": "Conteúdo de exemplo para benchmark",
+            "author_id": i % 1000 + 1,
+            "tags": ["bench"],
+            "created_at": now,
+            "updated_at": None
+        })
+
+
+def time_per_op(func, ids) -> float:
+    """Executa func(id) para cada id e retorna microssegundos por operação"""
+    start = time.perf_counter()
+    for record_id in ids:
+        func(record_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def run(size: int, ops: int) -> dict:
+    service = PostService()
+    populate(size)
+
+    ids = random.sample(range(1, size + 1), min(ops, size))
+    patch = PostUpdate(title="Título atualizado")
+
+    return {
+        "size": size,
+        "get_by_id_us": time_per_op(service.get_by_id, ids),
+        "update_us": time_per_op(lambda i: service.update(i, patch), ids),
+        "delete_us": time_per_op(service.delete, ids),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--ops", type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(f"{'registros':>10} {'get_by_id':>12} {'update':>12} {'delete':>12}  (µs/op)")
+    for size in args.sizes:
+        result = run(size, args.ops)
+        print(
+            f"{result['size']:>10} {result['get_by_id_us']:>12.2f} "
+            f"{result['update_us']:>12.2f} {result['delete_us']:>12.2f}"
+        )
+
+    fake_posts_db.clear()
+
+
+if __name__ == "__main__":
+    main()
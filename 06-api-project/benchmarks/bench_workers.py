@@ -0,0 +1,242 @@
+"""
+Benchmark: vários workers do uvicorn com o store compartilhado
+
+Execute (a partir de 06-api-project/):
+    python -m benchmarks.bench_workers
+    python -m benchmarks.bench_workers --workers 1 2 4 8 --clients 16 --seconds 10
+
+Sobe o processo do store (app.storage.server) e N workers do uvicorn de
+verdade (main.run_workers, HTTP em localhost), carrega `--posts` posts
+pelo import NDJSON e dispara a mesma mistura de requisições de
+`--clients` processos clientes (conexões keep-alive): 80% GET /api/posts/{id}, 10% GET /api/posts e
+10% PUT /api/posts/{id}. A primeira linha é o backend "memory" em um
+worker só (sem o socket), como referência.
+
+Depois de cada carga, um PUT em um worker é conferido lendo o post por
+conexões novas (que caem em workers diferentes): todas precisam ver o
+valor novo, inclusive pelo cache de GET /{id}.
+
+A vazão só cresce com workers até o número de núcleos da máquina (e o
+processo do store também disputa CPU com eles).
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_ENV = "BENCH_WORKERS_BACKEND"
+SOCKET_ENV = "BENCH_WORKERS_SOCKET"
+
+# Importado pelos workers do uvicorn (benchmarks.bench_workers:app)
+if os.environ.get(BACKEND_ENV):
+    from app.config.settings import get_settings
+    get_settings().STORAGE_BACKEND = os.environ[BACKEND_ENV]
+    get_settings().SHARED_STORE_SOCKET = os.environ.get(SOCKET_ENV, "")
+    get_settings().COMPRESSION_LEVEL = 0
+    from main import app  # noqa: F401
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        if process.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("uvicorn did not start")
+        time.sleep(0.1)
+
+
+def seed(port: int, posts: int) -> None:
+    """Carga pelo import NDJSON (passa pelos services, como em produção)"""
+    body = "\n".join(
+        json.dumps({
+            "title": f"Post {i}",
+            "content": "Conteúdo de exemplo para benchmark",
+            "author_id": i % 100 + 1,
+            "tags": ["bench", f"tag{i % 20}"],
+        })
+        for i in range(posts)
+    ).encode()
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+    connection.request("POST", "/api/posts/import", body, {"Content-Type": "application/x-ndjson"})
+    response = connection.getresponse()
+    summary = json.loads(response.read())
+    if response.status != 200 or summary.get("created") != posts:
+        raise RuntimeError(f"Seed failed: {response.status} {summary}")
+
+
+def client(port: int, posts: int, seconds: float, seed_value: int, results) -> None:
+    """Um processo cliente: requisições em sequência por uma conexão keep-alive"""
+    rng = random.Random(seed_value)
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    while True:
+        start = time.perf_counter()
+        if start >= deadline:
+            break
+
+        kind = rng.random()
+        post_id = rng.randint(1, posts)
+        if kind < 0.8:
+            connection.request("GET", f"/api/posts/{post_id}")
+        elif kind < 0.9:
+            connection.request("GET", f"/api/posts?limit=20&after={post_id}")
+        else:
+            body = json.dumps({"title": f"Editado {rng.random():.6f}"})
+            connection.request(
+                "PUT", f"/api/posts/{post_id}", body, {"Content-Type": "application/json"}
+            )
+
+        response = connection.getresponse()
+        response.read()
+        if response.status >= 400:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    connection.close()
+    results.put((latencies, errors))
+
+
+def run_load(port: int, posts: int, clients: int, seconds: float) -> dict:
+    results = multiprocessing.Queue()
+    pool = [
+        multiprocessing.Process(target=client, args=(port, posts, seconds, n, results))
+        for n in range(clients)
+    ]
+    for process in pool:
+        process.start()
+    collected = [results.get() for _ in pool]
+    for process in pool:
+        process.join()
+
+    latencies = sorted(latency for chunk, _ in collected for latency in chunk)
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in collected),
+        "rps": len(latencies) / seconds,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def check_consistency(port: int, workers: int) -> bool:
+    """Um PUT em um worker aparece no GET de todos (conexões novas, cache incluso)"""
+    readers = 4 * workers
+    # Lê antes em todas as conexões: a resposta antiga fica no cache de cada worker
+    for _ in range(readers):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        connection.request("GET", "/api/posts/1")
+        connection.getresponse().read()
+        connection.close()
+
+    title = f"Consistência {time.time_ns()}"
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.request(
+        "PUT", "/api/posts/1", json.dumps({"title": title}), {"Content-Type": "application/json"}
+    )
+    connection.getresponse().read()
+    connection.close()
+
+    for _ in range(readers):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        connection.request("GET", "/api/posts/1")
+        seen = json.loads(connection.getresponse().read())["title"]
+        connection.close()
+        if seen != title:
+            return False
+    return True
+
+
+def bench(backend: str, workers: int, args: argparse.Namespace, directory: str) -> None:
+    env = {**os.environ, BACKEND_ENV: backend}
+    store_server = None
+
+    if backend == "shared":
+        from app.storage.server import start_server
+        path = os.path.join(directory, f"store-{workers}.sock")
+        env[SOCKET_ENV] = path
+        store_server = start_server(path)
+
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_workers", "--serve", str(port),
+         "--workers", str(workers)],
+        env=env
+    )
+
+    try:
+        wait_ready(port, process)
+        seed(port, args.posts)
+        result = run_load(port, args.posts, args.clients, args.seconds)
+        consistent = check_consistency(port, workers) if backend == "shared" else None
+    finally:
+        process.terminate()
+        process.wait()
+        if store_server is not None:
+            store_server.terminate()
+            store_server.wait()
+
+    label = f"{backend}, {workers} worker{'s' if workers > 1 else ''}"
+    print(
+        f"{label:<20} {result['rps']:>9.0f} {result['p50']:>8.2f} {result['p99']:>8.2f} "
+        f"{result['errors']:>7} {'-' if consistent is None else 'ok' if consistent else 'FALHOU':>12}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        # Processo do uvicorn: os workers importam benchmarks.bench_workers:app
+        from main import run_workers
+        run_workers(
+            "benchmarks.bench_workers:app", "127.0.0.1", args.serve, args.workers[0],
+            log_level="warning", access_log=False
+        )
+        return
+
+    print(
+        f"{args.clients} clientes, {args.seconds:.0f}s por configuração, {args.posts} posts "
+        f"({os.cpu_count()} núcleos)"
+    )
+    print(f"{'configuração':<20} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'erros':>7} {'consistência':>12}")
+
+    directory = tempfile.mkdtemp()
+    try:
+        bench("memory", 1, args, directory)
+        for workers in args.workers:
+            bench("shared", workers, args, directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
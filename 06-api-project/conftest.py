@@ -0,0 +1,9 @@
+"""
+Configuração do pytest (similar ao jest.config.js)
+
+Estar na raiz do projeto faz o pytest colocar este diretório no sys.path:
+os testes importam `app` como a aplicação.
+
+Execute (a partir de 06-api-project/):
+    python -m pytest
+"""
@@ -5,16 +5,27 @@ Entry point da aplicação (similar a App.js no React)
 Execute: uvicorn main:app --reload
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-# Importar routers (similar a importar rotas no React Router)
-from app.api import users, posts
+from app.api import metrics, openapi
+from app.api.compression import CompressionMiddleware
+from app.api.profiling import ProfilingMiddleware
+from app.api.routing import LazyRouters, LazyRoutersMiddleware
 from app.config.settings import get_settings
 
 # Obter configurações
 settings = get_settings()
 
+# Importar routers (similar a importar rotas no React Router); no modo
+# LAZY_ROUTERS eles (e os services) só são importados no primeiro acesso
+if not settings.LAZY_ROUTERS:
+    from app.api import users, posts
+
+    # Modo async: rotas CRUD com `async def` (ver Settings.ASYNC_ROUTES)
+    if settings.ASYNC_ROUTES:
+        from app.api import users_async as users, posts_async as posts
+
 # Criar aplicação FastAPI (similar a criar app React)
 app = FastAPI(
     title="Learning API Project",
@@ -24,6 +35,21 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Routers importados no primeiro acesso ao prefixo (similar a React.lazy):
+# adicionado primeiro, fica mais perto do roteamento que os outros middlewares
+lazy_routers = LazyRouters(app)
+if settings.LAZY_ROUTERS:
+    app.add_middleware(LazyRoutersMiddleware, routers=lazy_routers)
+
+# /openapi.json em bytes prontos com ETag; no modo LAZY_ROUTERS, lido do
+# arquivo gerado no build (python -m app.api.openapi)
+openapi_schema = openapi.OpenAPISchema(
+    app,
+    path=settings.OPENAPI_SCHEMA_FILE if settings.LAZY_ROUTERS else None,
+    prepare=lazy_routers.load_all
+)
+openapi.install(app, openapi_schema)
+
 # CORS (similar a configurar CORS no Express/Next.js)
 app.add_middleware(
     CORSMiddleware,
@@ -31,8 +57,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Profile-Id"],  # Cursor de paginação, ETag e id do profile visíveis no browser
 )
 
+# Compressão (similar a app.use(compression()) no Express)
+if settings.COMPRESSION_LEVEL > 0:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        level=settings.COMPRESSION_LEVEL
+    )
+
+# Profiling sob demanda (cabeçalho ou amostragem): por fora da compressão,
+# que entra na fase de encoding
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        header=settings.PROFILING_HEADER,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        interval=settings.PROFILING_INTERVAL,
+        directory=settings.PROFILING_DIR
+    )
+
+# Métricas (similar a prom-client + express-prom-bundle): adicionado por
+# último, envolve os outros middlewares e mede a requisição inteira
+request_metrics = metrics.Metrics(window=settings.METRICS_WINDOW)
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware, metrics=request_metrics)
+
 # Health check (similar a /api/health em Next.js)
 @app.get("/health")
 def health_check():
@@ -42,18 +94,58 @@ def health_check():
         "version": "1.0.0"
     }
 
-# Incluir routers (similar a <Route> no React Router)
-app.include_router(
-    users.router,
-    prefix="/api/users",
-    tags=["users"]
-)
+# Contadores dos caches de GET /{id} (similar a expor stats do lru-cache)
+@app.get("/cache/stats")
+def cache_stats():
+    """Hits, misses, evictions e ocupação dos caches de respostas"""
+    # Importados aqui: no modo LAZY_ROUTERS os services carregam sob demanda
+    from app.services.post_service import post_cache
+    from app.services.user_service import user_cache
+    return {
+        "users": user_cache.stats(),
+        "posts": post_cache.stats()
+    }
 
-app.include_router(
-    posts.router,
-    prefix="/api/posts",
-    tags=["posts"]
-)
+# Métricas no formato do Prometheus (similar ao GET /metrics do prom-client)
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Requisições por rota, latências, stores e caches (texto do Prometheus)"""
+    from app.services.post_service import fake_posts_db, post_cache
+    from app.services.user_service import fake_users_db, user_cache
+    caches = (("users", user_cache.stats()), ("posts", post_cache.stats()))
+    families = request_metrics.families() + [
+        metrics.gauge("store_records", "Registros em cada store", [
+            ({"table": "users"}, len(fake_users_db)),
+            ({"table": "posts"}, len(fake_posts_db)),
+        ]),
+        metrics.gauge("response_cache_entries", "Entradas nos caches de GET /{id}", [
+            ({"cache": name}, stats["size"]) for name, stats in caches
+        ]),
+    ]
+    for counter in ("hits", "misses", "evictions", "expirations"):
+        families.append(metrics.counter(
+            f"response_cache_{counter}_total", f"Cache de GET /{{id}}: {counter}",
+            [({"cache": name}, stats[counter]) for name, stats in caches]
+        ))
+    return Response(metrics.render(families), media_type=metrics.CONTENT_TYPE)
+
+# Incluir routers (similar a <Route> no React Router)
+if settings.LAZY_ROUTERS:
+    suffix = "_async" if settings.ASYNC_ROUTES else ""
+    lazy_routers.add("/api/users", f"app.api.users{suffix}", tags=["users"])
+    lazy_routers.add("/api/posts", f"app.api.posts{suffix}", tags=["posts"])
+else:
+    app.include_router(
+        users.router,
+        prefix="/api/users",
+        tags=["users"]
+    )
+
+    app.include_router(
+        posts.router,
+        prefix="/api/posts",
+        tags=["posts"]
+    )
 
 # ============================================================================
 # COMPARAÇÃO COM REACT/EXPRESS
@@ -86,7 +178,43 @@ FASTAPI (ESTE PROJETO):
 - Tags são para organização na documentação
 """
 
+def run_workers(app_path: str, host: str, port: int, workers: int, **options) -> None:
+    """
+    Sobe o uvicorn com `workers` processos (similar ao cluster mode do PM2)
+
+    Cada worker importa `app_path` (ex: "main:app") e aceita conexões do
+    mesmo socket. O socket que o uvicorn cria para os workers não liga
+    TCP_NODELAY (o asyncio só liga nos que ele mesmo cria): sem isso, cada
+    resposta gravada em duas partes espera o ACK atrasado do cliente
+    (~40 ms por requisição). Ligado no socket de escuta, vale para todas
+    as conexões aceitas.
+
+    - options: demais opções do uvicorn.Config (ex: log_level)
+    """
+    import socket
+    import uvicorn
+    from uvicorn.supervisors import Multiprocess
+
+    config = uvicorn.Config(app_path, host=host, port=port, workers=workers, **options)
+    sock = config.bind_socket()
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    Multiprocess(config, sockets=[sock]).run()
+
 if __name__ == "__main__":
+    import atexit
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    if settings.STORAGE_BACKEND == "shared":
+        # Processo do store (dados e busca), dividido por todos os workers
+        from app.storage.server import start_server
+        store_server = start_server(settings.SHARED_STORE_SOCKET)
+        atexit.register(store_server.terminate)
+    elif settings.WORKERS > 1:
+        # Cada worker teria os próprios dados (e caches que os outros não invalidam)
+        raise SystemExit('WORKERS > 1 requires STORAGE_BACKEND = "shared"')
+
+    if settings.WORKERS > 1:
+        run_workers("main:app", "0.0.0.0", 8000, settings.WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
 
@@ -0,0 +1,255 @@
+"""
+Testes do JournaledStore: replay do journal, group commit, compactação e fsync
+Similar a testes de recuperação de um banco (mata o processo no meio e reabre)
+
+Os "crashes" são simulados: o store é fechado (ou a etapa seguinte é
+interrompida) e os arquivos em disco são reabertos por um store novo.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.storage import journal as journal_module
+from app.storage.indexes import HashIndex
+from app.storage.journal import JournaledStore, list_segments, read_segment, segment_path
+from app.storage.records import Record
+
+CREATED = datetime(2024, 1, 1, 12, 30)
+
+
+class NoteRecord(Record):
+    columns = {"title": str, "author": int, "created_at": datetime}
+    __slots__ = tuple(columns)
+
+
+def note(i: int) -> dict:
+    return {"title": f"Nota {i}", "author": i % 3, "created_at": CREATED}
+
+
+@pytest.fixture
+def open_store(tmp_path):
+    """Abre stores no mesmo diretório (um por "processo") e fecha todos no fim"""
+    stores = []
+
+    def open_store(**kwargs) -> JournaledStore:
+        options = {"fsync": "commit", "snapshot_bytes": 1 << 40, **kwargs}
+        store = JournaledStore(str(tmp_path), "notes", NoteRecord, indexes=[HashIndex("author")], **options)
+        stores.append(store)
+        return store
+
+    yield open_store
+    for store in stores:
+        store.close()
+
+
+def rows(store: JournaledStore) -> list:
+    return [record.to_row() for record in store.scan()]
+
+
+def last_segment(store: JournaledStore) -> str:
+    seq = list_segments(store.directory, store.table)[-1]
+    return segment_path(store.directory, store.table, seq)
+
+
+def test_replays_inserts_updates_and_deletes(open_store):
+    store = open_store()
+    store.insert_many(note(i) for i in range(5))
+    store.update(2, {"title": "Editada"})
+    store.delete(4)
+    expected = rows(store)
+    store.close()
+
+    reopened = open_store()
+    assert rows(reopened) == expected
+    assert reopened.get(2).title == "Editada"
+    assert reopened.get(1).created_at == CREATED
+    assert reopened.recovery["journal_entries"] == 7
+    assert [record.id for record in reopened.find("author", 1)] == [2, 5]
+    # IDs não são reaproveitados depois de reabrir
+    assert reopened.insert(note(9)).id == 6
+
+
+def test_truncated_last_record_is_ignored(open_store):
+    store = open_store()
+    store.insert_many(note(i) for i in range(3))
+    expected = rows(store)
+    path = last_segment(store)
+    store.close()
+
+    # Crash no meio da escrita da última linha (sem o \n)
+    with open(path, "ab") as file:
+        file.write(b'["i",4,{"title":"Nota inc')
+
+    reopened = open_store()
+    assert rows(reopened) == expected
+    assert reopened.recovery["journal_entries"] == 3
+
+    # A linha cortada fica no segmento antigo; as escritas novas vão para outro
+    assert reopened.insert(note(3)).id == 4
+    expected = rows(reopened)
+    reopened.close()
+
+    assert rows(open_store()) == expected
+
+
+def test_replay_stops_at_first_invalid_line(tmp_path):
+    path = tmp_path / "notes.00000000.journal"
+    path.write_bytes(b'["d",1]\n{corrompida\n["d",2]\n')
+
+    assert list(read_segment(str(path))) == [["d", 1]]
+
+
+def test_concurrent_commits_are_all_recovered(open_store):
+    store = open_store()
+    threads = [
+        threading.Thread(target=lambda: [store.insert(note(i)) for i in range(50)])
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Group commit: um fsync leva as entradas de várias threads (nunca mais fsyncs que entradas)
+    journal = store._journal
+    assert journal.entries == 400
+    assert 0 < journal.fsyncs <= journal.entries
+    expected = rows(store)
+    store.close()
+
+    assert rows(open_store()) == expected
+
+
+def test_snapshot_replaces_old_segments(open_store):
+    store = open_store()
+    store.insert_many(note(i) for i in range(10))
+    store.snapshot()
+    store.update(1, {"title": "Depois do snapshot"})
+    expected = rows(store)
+    store.close()
+
+    assert len(list_segments(store.directory, store.table)) == 1
+    reopened = open_store()
+    assert rows(reopened) == expected
+    assert reopened.recovery["snapshot_records"] == 10
+    assert reopened.recovery["journal_entries"] == 1
+
+
+def test_crash_between_snapshot_and_segment_removal(open_store, monkeypatch):
+    store = open_store()
+    store.insert_many(note(i) for i in range(10))
+    store.delete(3)
+
+    def crash(self, before):
+        raise RuntimeError("crash antes de apagar os segmentos")
+
+    monkeypatch.setattr(journal_module.Journal, "remove_segments", crash)
+    with pytest.raises(RuntimeError):
+        store.snapshot()
+    monkeypatch.undo()
+
+    store.update(5, {"title": "Depois do snapshot"})
+    expected = rows(store)
+    store.close()
+
+    # O snapshot novo e os segmentos que ele já cobre convivem no disco
+    assert os.path.exists(store.snapshot_path)
+    assert len(list_segments(store.directory, store.table)) == 2
+
+    reopened = open_store()
+    assert rows(reopened) == expected
+    # Os segmentos cobertos pelo snapshot não são reaplicados
+    assert reopened.recovery["snapshot_records"] == 9
+    assert reopened.recovery["journal_entries"] == 1
+
+    # O próximo snapshot apaga o que ficou para trás
+    reopened.snapshot()
+    assert len(list_segments(store.directory, store.table)) == 1
+    reopened.close()
+    assert rows(open_store()) == expected
+
+
+def test_crash_while_writing_snapshot_keeps_the_previous_one(open_store, monkeypatch):
+    store = open_store()
+    store.insert_many(note(i) for i in range(5))
+    store.snapshot()
+    store.insert_many(note(i) for i in range(5, 8))
+    store.update(1, {"title": "Antes do crash"})
+    expected = rows(store)
+
+    def crash(path, header, rows, indexes=()):
+        with open(f"{path}.tmp", "wb") as file:
+            file.write(b"snapshot pela metade")
+        raise RuntimeError("crash no meio do snapshot")
+
+    monkeypatch.setattr(journal_module, "write_snapshot", crash)
+    with pytest.raises(RuntimeError):
+        store.snapshot()
+    monkeypatch.undo()
+    store.close()
+
+    # Snapshot anterior + todos os segmentos desde ele (o .tmp é ignorado)
+    reopened = open_store()
+    assert rows(reopened) == expected
+    assert reopened.recovery["snapshot_records"] == 5
+    assert reopened.recovery["journal_entries"] == 4
+
+
+def test_failed_fsync_is_never_reported_as_durable(open_store, monkeypatch):
+    store = open_store()
+    store.insert(note(0))
+
+    def failing_fsync(fd):
+        raise OSError(5, "Input/output error")
+
+    monkeypatch.setattr(journal_module.os, "fsync", failing_fsync)
+    with pytest.raises(OSError):
+        store.insert(note(1))
+    monkeypatch.undo()
+
+    # Com o disco "de volta", nada mais é confirmado: o SO pode ter
+    # descartado as páginas que o fsync não gravou
+    with pytest.raises(OSError, match="no longer durable"):
+        store.insert(note(2))
+    with pytest.raises(OSError, match="no longer durable"):
+        store.snapshot()
+    assert store._journal.failed is not None
+
+
+def test_failed_background_fsync_fails_later_writes(open_store, monkeypatch):
+    store = open_store(fsync="batch", fsync_interval=0.01)
+
+    def failing_fsync(fd):
+        raise OSError(5, "Input/output error")
+
+    # O fsync que falha é o da thread de fundo (a exceção dela não chega às rotas)
+    monkeypatch.setattr(threading, "excepthook", lambda args: None)
+    monkeypatch.setattr(journal_module.os, "fsync", failing_fsync)
+    store.insert(note(0))
+
+    deadline = time.monotonic() + 5
+    while store._journal.failed is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    with pytest.raises(OSError, match="no longer durable"):
+        store.insert(note(1))
+
+
+def test_version_is_never_reused_after_a_restart(open_store):
+    # ETag das listagens: mesma versão depois de reiniciar = 304 com dados velhos
+    store = open_store()
+    store.insert_many(note(i) for i in range(3))
+    issued = {store.version()}
+    store.close()
+
+    reopened = open_store()
+    assert reopened.version() not in issued
+    reopened.delete(1)
+    reopened.insert(note(3))
+    reopened.insert(note(4))
+    assert reopened.version() not in issued
+    assert reopened.version() > max(issued)
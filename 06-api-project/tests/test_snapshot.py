@@ -0,0 +1,138 @@
+"""
+Testes do snapshot em mmap e do SnapshotRecords (base do snapshot + escritas)
+Similar a testar um formato de arquivo: grava, reabre e confere byte a byte o que importa
+"""
+
+import os
+from datetime import datetime
+
+import pytest
+
+from app.storage.indexes import HashIndex, MultiIndex
+from app.storage.journal import JournaledStore
+from app.storage.records import Record
+from app.storage.snapshot import SnapshotRecords, read_snapshot, write_snapshot
+
+CREATED = datetime(2024, 1, 1, 12, 30)
+
+
+class PageRecord(Record):
+    columns = {"title": str, "author": int, "tags": list, "created_at": datetime}
+    __slots__ = tuple(columns)
+
+
+def page(i: int) -> PageRecord:
+    return PageRecord(id=i, title=f"Página {i}", author=i % 2, tags=["a", f"t{i % 3}"], created_at=CREATED)
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    """Snapshot com os registros 1, 3, 5, 7 e 9 (IDs com buracos, como depois de deletes)"""
+    path = str(tmp_path / "pages.snapshot")
+    rows = [(record.id, record.to_row()[1:], None) for record in map(page, range(1, 10, 2))]
+    header = {"table": "pages", "columns": list(PageRecord.columns), "next_id": 10, "segment": 3}
+    write_snapshot(path, header, rows, [HashIndex("author")])
+    return path
+
+
+def test_snapshot_round_trip(snapshot_path):
+    snapshot = read_snapshot(snapshot_path)
+
+    assert len(snapshot) == 5
+    assert list(snapshot.ids) == [1, 3, 5, 7, 9]
+    assert snapshot.meta["next_id"] == 10
+    assert snapshot.meta["segment"] == 3
+    assert snapshot.values(1) == page(3).to_row()[1:]
+
+    spec, keys, bounds, ids = snapshot.index("author")
+    assert spec == HashIndex("author").spec
+    buckets = {key: list(ids[bounds[i]:bounds[i + 1]]) for i, key in enumerate(keys)}
+    assert buckets == {1: [1, 3, 5, 7, 9]}
+    assert snapshot.index("tags") is None
+
+
+def test_missing_and_truncated_snapshots(tmp_path, snapshot_path):
+    assert read_snapshot(str(tmp_path / "nenhum.snapshot")) is None
+
+    truncated = tmp_path / "truncated.snapshot"
+    with open(snapshot_path, "rb") as file:
+        truncated.write_bytes(file.read()[:-4])
+    with pytest.raises(ValueError):
+        read_snapshot(str(truncated))
+
+
+def test_open_snapshot_survives_replacement(tmp_path, snapshot_path):
+    snapshot = read_snapshot(snapshot_path)
+    header = {"table": "pages", "columns": list(PageRecord.columns), "next_id": 2, "segment": 4}
+    write_snapshot(snapshot_path, header, [(1, page(1).to_row()[1:], None)])
+
+    # O mmap continua no arquivo antigo; quem reabre vê o novo
+    assert list(snapshot.ids) == [1, 3, 5, 7, 9]
+    assert snapshot.values(4) == page(9).to_row()[1:]
+    assert list(read_snapshot(snapshot_path).ids) == [1]
+
+
+def test_reads_stay_out_of_the_overlay(snapshot_path):
+    records = SnapshotRecords(read_snapshot(snapshot_path), PageRecord, cache_size=2)
+
+    assert records.get(3).title == "Página 3"
+    assert records.get(3) is records.get(3)
+    assert records.get(2) is None
+    assert 5 in records and 4 not in records
+    for record_id in (1, 5, 7, 9):
+        records.get(record_id)
+
+    # Leituras não viram "escritas": o próximo snapshot não as regrava
+    assert records._overlay == {}
+    assert list(records._cache) == [7, 9]
+
+    # cache=False decodifica sem guardar (montagem da busca, índices novos)
+    assert records.get(1, cache=False).title == "Página 1"
+    assert list(records._cache) == [7, 9]
+
+
+def test_writes_shadow_the_snapshot(snapshot_path):
+    records = SnapshotRecords(read_snapshot(snapshot_path), PageRecord)
+    records.get(3)
+
+    records[3] = page(3).replace({"title": "Editada"})
+    records[10] = page(10)
+    assert records.pop(5).title == "Página 5"
+
+    assert records.get(3).title == "Editada"
+    assert records.get(5) is None and 5 not in records
+    assert len(records) == 5
+    assert list(records) == [1, 3, 7, 9, 10]
+    assert records.sorted_ids() == [1, 3, 7, 9, 10]
+
+    # freeze: só as escritas saem do overlay; o resto vem do snapshot base
+    frozen = list(records.freeze())
+    assert [row[0] for row in frozen] == [1, 3, 7, 9, 10]
+    assert frozen[1][1][0] == "Editada"
+    assert frozen[0][2] is not None and frozen[1][2] is None
+    assert set(records._overlay) == {3, 5, 10}
+
+
+def test_journaled_store_rebuilds_new_indexes_without_caching(tmp_path, snapshot_path):
+    os.replace(snapshot_path, tmp_path / "pages.snapshot")
+
+    # Índice "tags" não existe no snapshot: refeito lendo todos os registros
+    store = JournaledStore(
+        str(tmp_path), "pages", PageRecord,
+        indexes=[HashIndex("author"), MultiIndex("tags")], snapshot_bytes=1 << 40
+    )
+    try:
+        assert store.recovery["snapshot_records"] == 5
+        # Montar o índice não enche o cache: só o que as rotas leem entra nele
+        assert list(store._records._cache) == []
+        assert [record.id for record in store.find("tags", "t0")] == [3, 9]
+        assert list(store._records._cache) == [3, 9]
+        assert store.peek(7).title == "Página 7"
+        assert list(store._records._cache) == [3, 9]
+
+        assert [record.id for record in store.find("author", 1)] == [1, 3, 5, 7, 9]
+        assert list(store.ids()) == [1, 3, 5, 7, 9]
+        assert store._records._overlay == {}
+        assert store.insert({"title": "Nova", "author": 0, "tags": []}).id == 10
+    finally:
+        store.close()